@@ -3,7 +3,7 @@ from models import db, Manual, ErrorCode, PartReference
 from services.manual_finder import search_manuals as search_manuals_service
 from services.manual_finder import download_manual as download_manual_service
 from services.manual_finder import verify_manual_contains_model, get_pdf_page_count
-from services.manual_parser import extract_text_from_pdf, extract_information, extract_components
+from services.manual_parser import analyze_manual, analyze_manual_components
 from services.pdf_preview_generator import PDFPreviewGenerator
 from services.pdf_two_page_preview import PDFTwoPagePreview
 import os
@@ -326,14 +326,10 @@ def process_manual(manual_id):
             manual.local_path = local_path
             db.session.commit()
         
-        # Extract text from the PDF
-        logger.info(f"Extracting text from manual ID {manual_id} PDF")
-        text = extract_text_from_pdf(manual.local_path)
-        
-        # Extract information from the text (pass manual_id for better logging)
+        # Extract information from the PDF (reused if identical content was analyzed before)
         logger.info(f"Performing AI analysis on manual ID {manual_id}")
         start_time = time.time()
-        extracted_info = extract_information(text, manual_id)
+        extracted_info = analyze_manual(manual.local_path, manual_id)
         duration = time.time() - start_time
         logger.info(f"Manual ID {manual_id} processing completed in {duration:.2f} seconds")
         
@@ -390,7 +386,8 @@ def process_manual(manual_id):
             'part_numbers': extracted_info['part_numbers'],  # Include the actual part numbers
             'common_problems': extracted_info.get('common_problems', []),
             'maintenance_procedures': extracted_info.get('maintenance_procedures', []),
-            'safety_warnings': extracted_info.get('safety_warnings', [])
+            'safety_warnings': extracted_info.get('safety_warnings', []),
+            'coverage': extracted_info.get('coverage')
         })
         
     except Exception as e:
@@ -678,13 +675,10 @@ def process_manual_content(manual, app):
             logger.error(f"Manual file not found at {manual_path} for manual ID {manual_id}")
             return None
             
-        # Extract text from the PDF - doesn't need app context
-        logger.info(f"Extracting text from manual ID {manual_id}")
-        text = extract_text_from_pdf(manual_path)
-        
-        # Extract information from the text (pass manual_id for better logging)
-        logger.info(f"Extracting information from manual ID {manual_id} text")
-        extracted_info = extract_information(text, manual_id)
+        # Extract information from the PDF - doesn't need app context
+        # (reused if identical content was analyzed before)
+        logger.info(f"Extracting information from manual ID {manual_id}")
+        extracted_info = analyze_manual(manual_path, manual_id)
         
         # Prepare results
         result_data = {
@@ -694,7 +688,8 @@ def process_manual_content(manual, app):
             'part_numbers': extracted_info['part_numbers'],
             'common_problems': extracted_info.get('common_problems', []),
             'maintenance_procedures': extracted_info.get('maintenance_procedures', []),
-            'safety_warnings': extracted_info.get('safety_warnings', [])
+            'safety_warnings': extracted_info.get('safety_warnings', []),
+            'coverage': extracted_info.get('coverage')
         }
         
         # Get fresh manual object within app context
@@ -985,12 +980,9 @@ def get_manual_components(manual_id):
             manual.local_path = local_path
             db.session.commit()
         
-        # Extract text from the PDF
-        text = extract_text_from_pdf(manual.local_path)
-        
-        # Extract components from the text
+        # Extract components from the PDF (reused if identical content was analyzed before)
         default_prompt = "Analyze this technical manual and identify key structural components with page ranges"
-        extracted_components = extract_components(text, default_prompt)
+        extracted_components = analyze_manual_components(manual.local_path, default_prompt)
         
         # Return components results
         result = {
@@ -1024,15 +1016,13 @@ def process_manual_components(manual_id):
             manual.local_path = local_path
             db.session.commit()
         
-        # Extract text from the PDF
-        text = extract_text_from_pdf(manual.local_path)
-        
         # Log if using a custom prompt
         if custom_prompt:
             logger.info(f"Using custom prompt for manual {manual_id}: {custom_prompt[:100]}...")
         
-        # Extract components from the text with optional custom prompt
-        extracted_components = extract_components(text, custom_prompt)
+        # Extract components from the PDF with optional custom prompt
+        # (reused if identical content was analyzed with the same prompt before)
+        extracted_components = analyze_manual_components(manual.local_path, custom_prompt)
         
         # Update manual as processed
         manual.processed = True
@@ -199,6 +199,13 @@ def clear_cache():
     except Exception as e:
         logger.error(f"Error clearing temporary files: {e}")
     
+    # 3. Clear cached manual texts and analysis results
+    try:
+        from services import manual_text_cache
+        manual_text_cache.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing manual text cache: {e}")
+    
     # Log completion
     logger.info("Cache clearing completed")
 
@@ -24,4 +24,32 @@ class Config:
     
     # File storage settings
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
-    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
+    
+    # Manual text extraction: PDFs with at least PDF_PARALLEL_MIN_PAGES pages are split
+    # into ranges of PDF_PAGES_PER_TASK pages and extracted on a pool of worker processes.
+    # At most PDF_EXTRACT_MAX_POOLS web processes on the host start a pool (the others extract
+    # in process); an extraction that takes longer than PDF_EXTRACT_TIMEOUT seconds fails
+    PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', min(4, os.cpu_count() or 1)))
+    PDF_EXTRACT_MAX_POOLS = int(os.environ.get('PDF_EXTRACT_MAX_POOLS', 1))
+    PDF_EXTRACT_TIMEOUT = float(os.environ.get('PDF_EXTRACT_TIMEOUT', 120))
+    PDF_PAGES_PER_TASK = int(os.environ.get('PDF_PAGES_PER_TASK', 50))
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 100))
+    
+    # Extracted manual text, page index and analysis results, keyed by the SHA-256 of the PDF;
+    # analysis results are recomputed after MANUAL_RESULT_TTL seconds (default 30 days)
+    MANUAL_CACHE_DIR = os.environ.get('MANUAL_CACHE_DIR', 'manual_cache')
+    MANUAL_RESULT_TTL = int(os.environ.get('MANUAL_RESULT_TTL', 30 * 24 * 3600))
+    
+    # Chunked GPT extraction of part numbers and error codes: chunk size in characters,
+    # most chunks sent per manual, and most chunk calls in flight per process
+    MANUAL_CHUNK_CHARS = int(os.environ.get('MANUAL_CHUNK_CHARS', 8000))
+    MANUAL_MAX_CHUNKS = int(os.environ.get('MANUAL_MAX_CHUNKS', 200))
+    MANUAL_LLM_CONCURRENCY = int(os.environ.get('MANUAL_LLM_CONCURRENCY', 8))
+    
+    # Page pre-filter: pages scoring below MANUAL_PAGE_MIN_SCORE are not sent to chunk
+    # extraction; longer manuals send only their lead pages and best scoring pages,
+    # up to MANUAL_LLM_MAX_PAGES, to the comprehensive analysis
+    MANUAL_PAGE_MIN_SCORE = int(os.environ.get('MANUAL_PAGE_MIN_SCORE', 4))
+    MANUAL_LLM_MAX_PAGES = int(os.environ.get('MANUAL_LLM_MAX_PAGES', 40))
+    MANUAL_LEAD_PAGES = int(os.environ.get('MANUAL_LEAD_PAGES', 2))
@@ -2,9 +2,15 @@ import fitz  # PyMuPDF
 import re
 import json
 import logging
+import multiprocessing
 import os
+import threading
 import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from config import Config
+from services import manual_text_cache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -42,33 +48,200 @@ ERROR_CODE_PATTERNS = [
     r'\b[A-Z]\d{2,4}\b'                 # Format: A123
 ]
 
-def extract_text_from_pdf(pdf_path):
+try:
+    import fcntl
+except ImportError:  # Windows: no limit on pools across processes
+    fcntl = None
+
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
+_extract_slot = None
+
+def _acquire_extract_slot():
     """
-    Extract text content from a PDF file using PyMuPDF
-    
+    Take one of the PDF_EXTRACT_MAX_POOLS host-wide pool slots for this process
+
+    A slot is an exclusive lock on a file in MANUAL_CACHE_DIR, held until the
+    process exits, so the number of web processes running an extraction pool
+    stays bounded however many workers the server starts.
+
+    Returns:
+        bool: True if this process holds a slot
+    """
+    global _extract_slot
+    if _extract_slot is not None or fcntl is None:
+        return True
+    lock_dir = os.path.join(Config.MANUAL_CACHE_DIR, "locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    for slot in range(max(0, Config.PDF_EXTRACT_MAX_POOLS)):
+        handle = open(os.path.join(lock_dir, f"extract-pool-{slot}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _extract_slot = handle
+        return True
+    return False
+
+def get_extract_pool():
+    """
+    Get the process pool used to extract text from large PDFs
+
+    Returns:
+        ProcessPoolExecutor: The pool, or None if other processes already hold
+            all PDF_EXTRACT_MAX_POOLS pool slots
+    """
+    global _extract_pool
+    if _extract_pool is None:
+        with _extract_pool_lock:
+            if _extract_pool is None:
+                if not _acquire_extract_slot():
+                    return None
+                # Spawn rather than fork: forking a threaded web worker can deadlock the child
+                _extract_pool = ProcessPoolExecutor(
+                    max_workers=max(1, Config.PDF_EXTRACT_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Started PDF extraction pool with {max(1, Config.PDF_EXTRACT_WORKERS)} workers")
+    return _extract_pool
+
+def _reset_extract_pool():
+    """
+    Drop the extraction pool after a timeout or crash, terminating its workers
+
+    shutdown only cancels queued tasks; a worker stuck on a page would keep
+    running next to the replacement pool, so it is terminated first.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is not None:
+            # ProcessPoolExecutor has no public way to stop running workers
+            for process in list((getattr(_extract_pool, "_processes", None) or {}).values()):
+                process.terminate()
+            _extract_pool.shutdown(wait=False, cancel_futures=True)
+        _extract_pool = None
+
+def _page_layout(page):
+    """Count images, vector drawings and text blocks on a page, used to score it"""
+    # get_cdrawings skips building Python path objects where this PyMuPDF has it
+    get_drawings = getattr(page, "get_cdrawings", page.get_drawings)
+    return {
+        "images": len(page.get_images()),
+        "drawings": len(get_drawings()),
+        "blocks": len(page.get_text("blocks"))
+    }
+
+def _extract_page_range(pdf_path, start, end):
+    """
+    Extract the text and layout counts of pages [start, end) of a PDF
+
+    Runs in a pool worker, so it opens its own copy of the document.
+
+    Returns:
+        list: (text, layout) of each page
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        pages = []
+        for page_num in range(start, end):
+            page = doc.load_page(page_num)
+            pages.append((page.get_text(), _page_layout(page)))
+        return pages
+    finally:
+        doc.close()
+
+def extract_pages_from_pdf(pdf_path):
+    """
+    Extract the text of a PDF together with the offset where each page starts
+    and the layout counts of each page
+
+    Large PDFs are split into page ranges that are extracted in parallel on the
+    extraction process pool; small ones, and large ones when this process has no
+    pool or the pool broke, are extracted in the calling thread.
+
     Args:
         pdf_path (str): Path to the PDF file
-        
+
     Returns:
-        str: Extracted text from the PDF
+        tuple: (text, page_offsets, page_layouts) where page_offsets[i] is the character
+            offset in text at which page i + 1 starts and page_layouts[i] its image,
+            drawing and text block counts
+
+    Raises:
+        TimeoutError: If the pool does not finish within PDF_EXTRACT_TIMEOUT; its
+            workers are terminated and the extraction is not redone in process
     """
     logger.info(f"Extracting text from PDF: {pdf_path}")
-    
+    start_time = time.time()
+
     try:
         doc = fitz.open(pdf_path)
-        text = ""
-        
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text += page.get_text()
-        
+        page_count = len(doc)
         doc.close()
-        return text
-    
+
+        pages = None
+        if page_count >= Config.PDF_PARALLEL_MIN_PAGES and Config.PDF_EXTRACT_WORKERS > 1:
+            step = max(1, Config.PDF_PAGES_PER_TASK)
+            ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+            try:
+                pool = get_extract_pool()
+                if pool is None:
+                    logger.info("All PDF extraction pool slots are taken, extracting in process")
+                else:
+                    futures = [pool.submit(_extract_page_range, pdf_path, start, end) for start, end in ranges]
+                    _, not_done = wait(futures, timeout=Config.PDF_EXTRACT_TIMEOUT)
+                    if not_done:
+                        _reset_extract_pool()
+                        raise TimeoutError(f"PDF extraction of {page_count} pages did not finish within {Config.PDF_EXTRACT_TIMEOUT}s")
+                    pages = [page for future in futures for page in future.result()]
+            except BrokenProcessPool as e:
+                logger.error(f"PDF extraction pool failed, extracting in process: {e}")
+                _reset_extract_pool()
+
+        if pages is None:
+            pages = _extract_page_range(pdf_path, 0, page_count)
+
+        page_offsets = []
+        offset = 0
+        for page_text, _ in pages:
+            page_offsets.append(offset)
+            offset += len(page_text)
+        text = "".join(page_text for page_text, _ in pages)
+
+        logger.info(f"Extracted {page_count} pages ({len(text)} characters) in {time.time() - start_time:.2f} seconds")
+        return text, page_offsets, [layout for _, layout in pages]
+
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
         raise
 
+def page_for_offset(page_offsets, offset):
+    """
+    Get the page number (1-based) that a character offset of the extracted text falls on
+
+    Args:
+        page_offsets (list): Page start offsets from extract_pages_from_pdf
+        offset (int): Character offset in the extracted text
+
+    Returns:
+        int: Page number, or 1 if there are no page offsets
+    """
+    return max(1, bisect_right(page_offsets, offset))
+
+def extract_text_from_pdf(pdf_path):
+    """
+    Extract text content from a PDF file using PyMuPDF
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        
+    Returns:
+        str: Extracted text from the PDF
+    """
+    text, _, _ = extract_pages_from_pdf(pdf_path)
+    return text
+
 def extract_patterns_with_regex(text, patterns):
     """
     Extract patterns from text using regex
@@ -111,97 +284,418 @@ def extract_context_for_match(text, match, context_size=100):
     
     return text[start_pos:end_pos]
 
-def extract_with_gpt(text, extraction_type):
+# Words that mark the sections the LLM needs to see
+ERROR_CODE_KEYWORDS = re.compile(r'\b(error codes?|fault codes?|alarm|troubleshoot\w*|diagnos\w*|fault|remedy|cause)\b', re.IGNORECASE)
+PARTS_LIST_KEYWORDS = re.compile(r'\b(parts? list|replacement parts|part (?:no|number)s?|qty|quantity|item|description)\b', re.IGNORECASE)
+EXPLODED_VIEW_KEYWORDS = re.compile(r'\b(exploded|view|assembly|diagram|fig(?:ure)?|breakdown)\b', re.IGNORECASE)
+# A line holding only a short number, like the item callouts of an exploded view
+CALLOUT_LINE = re.compile(r'^\s*\d{1,3}\s*$', re.MULTILINE)
+
+def _count_matches(text, patterns, cap=20):
+    return min(cap, len(extract_patterns_with_regex(text, patterns)))
+
+def score_page(page_text, layout=None):
     """
-    Use GPT-4.1 Nano to extract part numbers or error codes from text
-    
+    Score how likely a page is to hold an error code table, a parts list or an exploded view
+
+    Uses the regex patterns, section keywords, short tabular lines and, if available,
+    the page's image, drawing and text block counts from PyMuPDF.
+
     Args:
-        text (str): Text to analyze
-        extraction_type (str): Type of extraction ("part numbers" or "error codes")
-        
+        page_text (str): Text of the page
+        layout (dict, optional): Layout counts from extract_pages_from_pdf
+
     Returns:
-        dict: Extraction results
+        dict: Score per kind ("error_codes", "parts_list", "exploded_view") and their "score" total
     """
-    # Chunk the text to fit within token limits
-    chunk_size = 5000
-    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
-    all_results = []
-    
-    for i, chunk in enumerate(chunks[:5]):  # Limit to first 5 chunks to save API calls
-        logger.info(f"Processing {extraction_type} extraction for chunk {i+1}/{min(5, len(chunks))}")
-        
-        prompt = f"""
-        Extract all {extraction_type} from the following text from a technical manual.
+    layout = layout or {}
+    lines = [line for line in page_text.splitlines() if line.strip()]
+    short_lines = sum(1 for line in lines if len(line.strip()) <= 30)
+    tabular = lines and short_lines / len(lines) >= 0.6 and len(lines) >= 10
+    callouts = len(CALLOUT_LINE.findall(page_text))
+
+    error_codes = _count_matches(page_text, ERROR_CODE_PATTERNS) + 3 * min(5, len(ERROR_CODE_KEYWORDS.findall(page_text)))
+    parts_list = _count_matches(page_text, PART_NUMBER_PATTERNS) + 3 * min(5, len(PARTS_LIST_KEYWORDS.findall(page_text)))
+    exploded_view = 3 * min(3, len(EXPLODED_VIEW_KEYWORDS.findall(page_text))) + min(10, callouts)
+
+    if tabular:
+        error_codes += 3 if error_codes else 0
+        parts_list += 3 if parts_list else 0
+    if layout.get("blocks", 0) >= 30:
+        parts_list += 2
+    if layout.get("images", 0) or layout.get("drawings", 0) >= 50:
+        exploded_view += 5
+
+    return {
+        "error_codes": error_codes,
+        "parts_list": parts_list,
+        "exploded_view": exploded_view,
+        "score": error_codes + parts_list + exploded_view
+    }
+
+def score_pages(text, page_offsets, page_layouts=None):
+    """
+    Score every page of a manual with score_page
+
+    Returns:
+        list: Scores of page i + 1 at index i
+    """
+    bounds = list(page_offsets) + [len(text)]
+    return [
+        score_page(text[bounds[i]:bounds[i + 1]], page_layouts[i] if page_layouts else None)
+        for i in range(len(page_offsets))
+    ]
+
+def select_pages(page_scores, max_pages=None, min_score=None):
+    """
+    Pick the pages worth sending to the LLM
+
+    Args:
+        page_scores (list): Scores from score_pages
+        max_pages (int, optional): Keep only the best scoring pages; all pages that
+            reach min_score if None
+        min_score (int, optional): Defaults to MANUAL_PAGE_MIN_SCORE
+
+    Returns:
+        list: Selected page numbers (1-based) in page order
+    """
+    min_score = Config.MANUAL_PAGE_MIN_SCORE if min_score is None else min_score
+    pages = [i + 1 for i, scores in enumerate(page_scores) if scores["score"] >= min_score]
+    if max_pages is not None and len(pages) > max_pages:
+        pages = sorted(sorted(pages, key=lambda page: page_scores[page - 1]["score"], reverse=True)[:max_pages])
+    return pages
+
+def pages_text(text, page_offsets, pages, markers=False):
+    """
+    Join the text of some pages of a manual
+
+    Args:
+        text (str): Manual text
+        page_offsets (list): Page start offsets
+        pages (list): Page numbers (1-based) in page order
+        markers (bool): Start each page with a "--- Page N ---" line
+
+    Returns:
+        tuple: (joined text, offsets at which each selected page starts in it)
+    """
+    bounds = list(page_offsets) + [len(text)]
+    parts = []
+    offsets = []
+    length = 0
+    for page in pages:
+        part = text[bounds[page - 1]:bounds[page]]
+        if markers:
+            part = f"\n--- Page {page} ---\n{part}"
+        offsets.append(length)
+        parts.append(part)
+        length += len(part)
+    return "".join(parts), offsets
+
+def prescan_text(text, page_offsets=None, page_layouts=None):
+    """
+    Run the regex patterns over a manual's text and score its pages
+
+    Returns:
+        dict: Candidate "part_numbers" and "error_codes" found by the regex patterns,
+            and "page_scores" from score_pages if page offsets are given
+    """
+    return {
+        "part_numbers": sorted(extract_patterns_with_regex(text, PART_NUMBER_PATTERNS)),
+        "error_codes": sorted(extract_patterns_with_regex(text, ERROR_CODE_PATTERNS)),
+        "page_scores": score_pages(text, page_offsets, page_layouts) if page_offsets else None
+    }
+
+def load_manual_text(pdf_path, content_hash=None):
+    """
+    Get the text, page offsets and regex pre-scan results of a manual
+
+    They are read from the manual text cache when a PDF with the same content was
+    extracted before, otherwise extracted and stored.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        content_hash (str, optional): SHA-256 of the PDF, if already known
+
+    Returns:
+        dict: content_hash, text, page_offsets, prescan and from_cache
+    """
+    content_hash = content_hash or manual_text_cache.content_hash(pdf_path)
+    index = manual_text_cache.get_index(content_hash)
+    if index is not None:
+        logger.info(f"Using cached text of {pdf_path} ({index['page_count']} pages)")
+        text = manual_text_cache.read_text(content_hash)
+        prescan = index["prescan"]
+        if not prescan.get("page_scores") and index["page_offsets"]:
+            # Entries stored before page scoring: score on text alone
+            prescan["page_scores"] = score_pages(text, index["page_offsets"])
+        return {
+            "content_hash": content_hash,
+            "text": text,
+            "page_offsets": index["page_offsets"],
+            "prescan": prescan,
+            "from_cache": True
+        }
+
+    text, page_offsets, page_layouts = extract_pages_from_pdf(pdf_path)
+    prescan = prescan_text(text, page_offsets, page_layouts)
+    manual_text_cache.store(content_hash, text, page_offsets, prescan)
+    return {
+        "content_hash": content_hash,
+        "text": text,
+        "page_offsets": page_offsets,
+        "prescan": prescan,
+        "from_cache": False
+    }
+
+_llm_pool = None
+_llm_pool_lock = threading.Lock()
+
+# Result key and regex patterns of each extraction type
+EXTRACTION_TYPES = {
+    "part numbers": ("part_numbers", PART_NUMBER_PATTERNS),
+    "error codes": ("error_codes", ERROR_CODE_PATTERNS)
+}
+
+def get_llm_pool():
+    """
+    Get the thread pool that runs chunk extraction calls
+
+    Its size is MANUAL_LLM_CONCURRENCY, so it also caps how many chunk calls
+    run at once across all manuals processed by this process.
+    """
+    global _llm_pool
+    if _llm_pool is None:
+        with _llm_pool_lock:
+            if _llm_pool is None:
+                _llm_pool = ThreadPoolExecutor(max_workers=max(1, Config.MANUAL_LLM_CONCURRENCY), thread_name_prefix="manual-llm")
+    return _llm_pool
+
+def split_into_chunks(text, page_offsets=None, chunk_size=None):
+    """
+    Split manual text into chunks of at most chunk_size characters
+
+    With page offsets, chunks are made of whole pages so a table is not cut in
+    the middle of a line; a page longer than chunk_size is split on its own.
+
+    Args:
+        text (str): Manual text
+        page_offsets (list, optional): Page start offsets from extract_pages_from_pdf
+        chunk_size (int, optional): Defaults to MANUAL_CHUNK_CHARS
+
+    Returns:
+        list: (first_page, last_page, chunk_text) tuples; pages are None without page offsets
+    """
+    chunk_size = chunk_size or Config.MANUAL_CHUNK_CHARS
+    if not page_offsets:
+        return [(None, None, text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+
+    chunks = []
+    bounds = list(page_offsets) + [len(text)]
+    first_page = None
+    chunk_start = None
+    for page_num in range(1, len(page_offsets) + 1):
+        page_start, page_end = bounds[page_num - 1], bounds[page_num]
+        if chunk_start is not None and page_end - chunk_start > chunk_size:
+            chunks.append((first_page, page_num - 1, text[chunk_start:page_start]))
+            chunk_start = None
+        if chunk_start is None:
+            first_page, chunk_start = page_num, page_start
+        while page_end - chunk_start > chunk_size:
+            chunks.append((page_num, page_num, text[chunk_start:chunk_start + chunk_size]))
+            chunk_start += chunk_size
+    if chunk_start is not None and chunk_start < len(text):
+        chunks.append((first_page, len(page_offsets), text[chunk_start:]))
+    return chunks
+
+def _extract_chunk(chunk, extraction_types):
+    """
+    Extract the given types of codes from one chunk with GPT-4.1 Nano
+
+    Returns:
+        dict: Result key (e.g. "error_codes") -> list of {"code", "description"}
+    """
+    keys = [EXTRACTION_TYPES[extraction_type][0] for extraction_type in extraction_types]
+    prompt = f"""
+        Extract all {' and '.join(extraction_types)} from the following text from a technical manual.
         If it's a part number, include any descriptive text immediately before or after it.
         If it's an error code, include any description or resolution steps associated with it.
         
-        Format the output as a JSON array of objects where each object has:
-        - 'code': the {extraction_type} itself
+        Format the output as a JSON object with the keys {', '.join(repr(key) for key in keys)}.
+        Each key holds an array of objects where each object has:
+        - 'code': the part number or error code itself, exactly as it appears in the text
         - 'description': any associated description text
         
         TEXT:
         {chunk}
         """
-        
+
+    if USING_NEW_OPENAI_CLIENT:
+        response = client.chat.completions.create(
+            model="gpt-4.1-nano",
+            messages=[
+                {"role": "system", "content": "You are a technical manual parser. Using GPT-4.1-Nano for comprehensive analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        content = response.choices[0].message.content
+    else:
+        import openai
+        response = openai.ChatCompletion.create(
+            model="gpt-4.1-nano",
+            messages=[
+                {"role": "system", "content": "You are a technical manual parser. Using GPT-4.1-Nano for comprehensive analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        content = response.choices[0].message['content']
+
+    result = json.loads(content)
+    return {key: [item for item in result.get(key, []) if isinstance(item, dict)] for key in keys}
+
+def merge_code_results(result_lists):
+    """
+    Merge extracted codes, dropping duplicates
+
+    Codes are compared ignoring case and whitespace; of duplicates the longest
+    description is kept, in order of first appearance.
+
+    Args:
+        result_lists (list): Lists of {"code", "description"} objects
+
+    Returns:
+        list: Deduplicated {"code", "description"} objects
+    """
+    merged = {}
+    for results in result_lists:
+        for item in results:
+            code = str(item.get("code") or "").strip()
+            if not code:
+                continue
+            key = re.sub(r'\s+', '', code).upper()
+            description = str(item.get("description") or "").strip()
+            if key not in merged:
+                merged[key] = {"code": code, "description": description}
+            elif len(description) > len(merged[key]["description"]):
+                merged[key]["description"] = description
+    return list(merged.values())
+
+def map_reduce_extract(text, extraction_types, page_offsets=None, page_scores=None):
+    """
+    Extract codes from a whole manual by sending its chunks to GPT concurrently
+
+    With page scores, only pages reaching MANUAL_PAGE_MIN_SCORE are chunked.
+    Chunks without any regex candidate for the requested types (blank pages,
+    diagrams, prose) are not sent. If more than MANUAL_MAX_CHUNKS remain, the ones
+    with the most candidates are sent. Chunk calls run on the shared LLM pool and
+    their results are merged and deduplicated per type.
+
+    Args:
+        text (str): Manual text
+        extraction_types (list): Types to extract ("part numbers", "error codes")
+        page_offsets (list, optional): Page start offsets, to align chunks with pages
+        page_scores (list, optional): Page scores from score_pages, to skip unlikely pages
+
+    Returns:
+        dict: Result key -> merged list of {"code", "description"}, plus "coverage"
+            with the number of chunks analysed, relevant, total and failed, and
+            the pages the chunks were taken from
+    """
+    start_time = time.time()
+    total_chunks = len(split_into_chunks(text, page_offsets))
+    paged = bool(page_offsets)
+    pages = list(range(1, len(page_offsets) + 1)) if paged else []
+    if paged and page_scores:
+        pages = select_pages(page_scores)
+        text, page_offsets = pages_text(text, page_offsets, pages)
+        logger.info(f"Routing {len(pages)}/{len(page_scores)} pages to chunk extraction")
+    chunks = split_into_chunks(text, page_offsets)
+    if paged:
+        # Map page numbers within the selected text back to manual pages
+        chunks = [(pages[first - 1], pages[last - 1], chunk) for first, last, chunk in chunks]
+    patterns = [pattern for extraction_type in extraction_types for pattern in EXTRACTION_TYPES[extraction_type][1]]
+
+    candidates = [len(extract_patterns_with_regex(chunk, patterns)) for _, _, chunk in chunks]
+    relevant = [i for i, count in enumerate(candidates) if count > 0]
+    selected = relevant
+    if len(selected) > Config.MANUAL_MAX_CHUNKS:
+        selected = sorted(sorted(relevant, key=lambda i: candidates[i], reverse=True)[:Config.MANUAL_MAX_CHUNKS])
+        logger.warning(f"Sending {len(selected)} of {len(relevant)} relevant chunks (MANUAL_MAX_CHUNKS)")
+
+    logger.info(f"Extracting {' and '.join(extraction_types)} from {len(selected)}/{total_chunks} chunks")
+    pool = get_llm_pool()
+    futures = {i: pool.submit(_extract_chunk, chunks[i][2], extraction_types) for i in selected}
+
+    keys = [EXTRACTION_TYPES[extraction_type][0] for extraction_type in extraction_types]
+    collected = {key: [] for key in keys}
+    failed = 0
+    for i, future in futures.items():
         try:
-            if USING_NEW_OPENAI_CLIENT:
-                response = client.chat.completions.create(
-                    model="gpt-4.1-nano",
-                    messages=[
-                        {"role": "system", "content": "You are a technical manual parser. Using GPT-4.1-Nano for comprehensive analysis."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
-            else:
-                import openai
-                response = openai.ChatCompletion.create(
-                    model="gpt-4.1-nano",
-                    messages=[
-                        {"role": "system", "content": "You are a technical manual parser. Using GPT-4.1-Nano for comprehensive analysis."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
-            
-            # Parse the results - handle both client versions
-            if USING_NEW_OPENAI_CLIENT:
-                content = response.choices[0].message.content
-            else:
-                content = response.choices[0].message['content']
-                
-            result = json.loads(content)
-            if "results" in result:
-                all_results.extend(result["results"])
-        
+            chunk_result = future.result()
         except Exception as e:
-            logger.error(f"Error using GPT for extraction: {e}")
-            # Continue with other chunks
+            failed += 1
+            first_page, last_page, _ = chunks[i]
+            page_range = f" (pages {first_page}-{last_page})" if first_page else ""
+            logger.error(f"Error using GPT for extraction of chunk {i + 1}{page_range}: {e}")
+            continue
+        for key in keys:
+            collected[key].append(chunk_result[key])
+
+    result = {key: merge_code_results(collected[key]) for key in keys}
+    result["coverage"] = {
+        "chunks_analyzed": len(selected) - failed,
+        "chunks_relevant": len(relevant),
+        "chunks_total": total_chunks,
+        "chunks_failed": failed,
+        "analyzed_pages": sorted({page for i in selected for page in range(chunks[i][0], chunks[i][1] + 1)}) if paged else None
+    }
+    logger.info(f"Chunk extraction completed in {time.time() - start_time:.2f} seconds: "
+                f"{', '.join(f'{len(result[key])} {key}' for key in keys)}, coverage {result['coverage']}")
+    return result
+
+def extract_with_gpt(text, extraction_type, page_offsets=None):
+    """
+    Use GPT-4.1 Nano to extract part numbers or error codes from text
+    
+    Args:
+        text (str): Text to analyze
+        extraction_type (str): Type of extraction ("part numbers" or "error codes")
+        page_offsets (list, optional): Page start offsets, to align chunks with pages
+        
+    Returns:
+        dict: Extraction results and chunk coverage
+    """
+    result = map_reduce_extract(text, [extraction_type], page_offsets)
+    all_results = result[EXTRACTION_TYPES[extraction_type][0]]
     
     # If GPT extraction failed or found nothing, fallback to regex
     if not all_results:
         logger.info(f"Falling back to regex for {extraction_type}")
-        if extraction_type == "part numbers":
-            codes = extract_patterns_with_regex(text, PART_NUMBER_PATTERNS)
-        else:
-            codes = extract_patterns_with_regex(text, ERROR_CODE_PATTERNS)
+        codes = extract_patterns_with_regex(text, EXTRACTION_TYPES[extraction_type][1])
         
         # Add context for each code
         for code in codes:
             context = extract_context_for_match(text, code)
             all_results.append({"code": code, "description": context})
     
-    return {"results": all_results}
+    return {"results": all_results, "coverage": result["coverage"]}
 
-def comprehensive_gpt_analysis(text, manual_id=None):
+def comprehensive_gpt_analysis(text, manual_id=None, page_offsets=None, page_scores=None):
     """
     Perform a comprehensive analysis of the manual text using GPT-4.1-Nano
     
+    With page scores, a manual longer than MANUAL_LLM_MAX_PAGES pages is cut down to
+    its first MANUAL_LEAD_PAGES pages (for the manual subject) and its best scoring
+    pages; the pages sent are recorded in "analyzed_pages".
+    
     Args:
         text (str): The full text of the manual
         manual_id (int, optional): ID of the manual being processed (for logging)
+        page_offsets (list, optional): Page start offsets
+        page_scores (list, optional): Page scores from score_pages
         
     Returns:
         dict: Comprehensive analysis including common problems, maintenance tips, etc.
@@ -210,6 +704,14 @@ def comprehensive_gpt_analysis(text, manual_id=None):
     logger.info(f"{manual_info}Starting comprehensive GPT analysis of full manual")
     logger.info(f"{manual_info}Total text length: {len(text)} characters")
     
+    analyzed_pages = None
+    if page_offsets and page_scores and len(page_offsets) > Config.MANUAL_LLM_MAX_PAGES:
+        lead_pages = list(range(1, min(Config.MANUAL_LEAD_PAGES, len(page_offsets)) + 1))
+        top_pages = select_pages(page_scores[len(lead_pages):], max_pages=Config.MANUAL_LLM_MAX_PAGES - len(lead_pages))
+        analyzed_pages = lead_pages + [page + len(lead_pages) for page in top_pages]
+        text, _ = pages_text(text, page_offsets, analyzed_pages, markers=True)
+        logger.info(f"{manual_info}Sending {len(analyzed_pages)}/{len(page_offsets)} pages ({len(text)} characters): {analyzed_pages}")
+    
     # More focused prompt that emphasizes the three key areas and ensures proper extraction
     prompt = f"""
     You are analyzing a technical manual for a specific device or equipment. This is VERY IMPORTANT technical work.
@@ -246,13 +748,19 @@ def comprehensive_gpt_analysis(text, manual_id=None):
     
     I am providing the COMPLETE TEXT of the manual without any omissions. Extract ALL error codes and part numbers.
     """
+    if analyzed_pages:
+        prompt = prompt.replace(
+            "I am providing the COMPLETE TEXT of the manual without any omissions.",
+            "I am providing the first pages of the manual and the pages most likely to hold error code tables, "
+            "parts lists and exploded views; each page starts with a '--- Page N ---' line."
+        )
     
     try:
         logger.info("Sending request to GPT-4.1-Nano for comprehensive analysis")
         start_time = time.time()
         
         # Log the text size
-        logger.info(f"Using complete text of {len(text)} characters (GPT-4.1-Nano can handle up to 1 million tokens)")
+        logger.info(f"Using {'selected pages' if analyzed_pages else 'complete text'} of {len(text)} characters (GPT-4.1-Nano can handle up to 1 million tokens)")
         
         # Combine prompt with full text
         full_prompt = prompt + "\n\nMANUAL TEXT:\n" + text
@@ -312,11 +820,13 @@ def comprehensive_gpt_analysis(text, manual_id=None):
             sample_problems = result['common_problems'][:2]
             logger.info(f"Sample common problems: {json.dumps(sample_problems)}")
         
+        result["analyzed_pages"] = analyzed_pages
         return result
     
     except Exception as e:
         logger.error(f"Error during comprehensive GPT analysis: {e}")
         return {
+            "analysis_failed": True,
             "manual_subject": "Unknown",
             "part_numbers": [],
             "error_codes": [],
@@ -518,13 +1028,19 @@ def extract_components(pdf_text, custom_prompt=None):
         }
     }
 
-def extract_information(pdf_text, manual_id=None):
+def extract_information(pdf_text, manual_id=None, page_offsets=None, page_scores=None):
     """
     Extract part numbers and error codes from PDF text using AI analysis
     
+    The comprehensive analysis runs alongside a chunked extraction of part numbers
+    and error codes that covers the whole manual; their results are merged. With
+    page scores, both only see the pages likely to matter.
+    
     Args:
         pdf_text (str): Text extracted from a PDF
         manual_id (int, optional): ID of the manual being processed for logging
+        page_offsets (list, optional): Page start offsets, to align chunks with pages
+        page_scores (list, optional): Page scores from score_pages
         
     Returns:
         dict: Extracted information
@@ -536,17 +1052,23 @@ def extract_information(pdf_text, manual_id=None):
     # Skip regex extraction and rely entirely on AI analysis
     logger.info(f"{manual_info}Performing AI analysis with GPT-4.1-Nano")
     
-    # Perform comprehensive GPT analysis of entire text - our primary method
-    manual_info = f"Manual ID: {manual_id} " if manual_id else ""
-    logger.info(f"{manual_info}Starting comprehensive GPT analysis")
-    comprehensive_results = comprehensive_gpt_analysis(pdf_text, manual_id)
+    # Run the comprehensive analysis and the chunked code extraction at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        comprehensive_future = executor.submit(comprehensive_gpt_analysis, pdf_text, manual_id, page_offsets, page_scores)
+        chunked_future = executor.submit(map_reduce_extract, pdf_text, ["part numbers", "error codes"], page_offsets, page_scores)
+        comprehensive_results = comprehensive_future.result()
+        try:
+            chunked_results = chunked_future.result()
+        except Exception as e:
+            logger.error(f"{manual_info}Error during chunked extraction: {e}")
+            chunked_results = {"part_numbers": [], "error_codes": [], "coverage": None}
     
-    # Use results directly from the comprehensive analysis
-    part_number_results = {"results": comprehensive_results.get("part_numbers", [])}
-    error_code_results = {"results": comprehensive_results.get("error_codes", [])}
+    # Use the chunked extraction results, which cover the whole manual
+    part_number_results = {"results": chunked_results["part_numbers"]}
+    error_code_results = {"results": chunked_results["error_codes"]}
     
-    logger.info(f"{manual_info}GPT analysis found {len(part_number_results['results'])} part numbers")
-    logger.info(f"{manual_info}GPT analysis found {len(error_code_results['results'])} error codes")
+    logger.info(f"{manual_info}Chunked GPT extraction found {len(part_number_results['results'])} part numbers")
+    logger.info(f"{manual_info}Chunked GPT extraction found {len(error_code_results['results'])} error codes")
     
     # Create dictionaries to track unique codes (to avoid duplicates)
     part_dict = {}
@@ -658,5 +1180,64 @@ def extract_information(pdf_text, manual_id=None):
         "manual_subject": comprehensive_results.get("manual_subject", "Unknown"),
         "common_problems": comprehensive_results.get("common_problems", []),
         "maintenance_procedures": comprehensive_results.get("maintenance_procedures", []),
-        "safety_warnings": comprehensive_results.get("safety_warnings", [])
-    }
\ No newline at end of file
+        "safety_warnings": comprehensive_results.get("safety_warnings", []),
+        "coverage": dict(chunked_results["coverage"] or {},
+                         comprehensive_pages=comprehensive_results.get("analyzed_pages"),
+                         comprehensive_failed=bool(comprehensive_results.get("analysis_failed")))
+    }
+
+def analyze_manual(pdf_path, manual_id=None):
+    """
+    Run extract_information on a manual PDF, reusing the stored result when a PDF
+    with the same content was analyzed before
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        manual_id (int, optional): ID of the manual being processed for logging
+
+    Returns:
+        dict: Extracted information, as returned by extract_information
+    """
+    content_hash = manual_text_cache.content_hash(pdf_path)
+    cached = manual_text_cache.get_result(content_hash, "information")
+    if cached is not None:
+        manual_info = f"Manual ID: {manual_id} " if manual_id else ""
+        logger.info(f"{manual_info}Using stored analysis of identical manual {content_hash[:12]}")
+        return cached
+
+    document = load_manual_text(pdf_path, content_hash)
+    extracted_info = extract_information(document["text"], manual_id, document["page_offsets"], document["prescan"].get("page_scores"))
+
+    # Keep only complete analyses: a failed comprehensive call or failed chunks are retried on the next run
+    coverage = extracted_info.get("coverage") or {}
+    if coverage.get("chunks_failed") == 0 and not coverage.get("comprehensive_failed"):
+        manual_text_cache.put_result(content_hash, "information", extracted_info)
+    else:
+        logger.warning(f"Not storing incomplete analysis of manual {content_hash[:12]}: coverage {coverage}")
+    return extracted_info
+
+def analyze_manual_components(pdf_path, custom_prompt=None):
+    """
+    Run extract_components on a manual PDF, reusing the stored result when a PDF
+    with the same content was analyzed with the same prompt before
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        custom_prompt (str, optional): Custom prompt for component extraction
+
+    Returns:
+        dict: Components, as returned by extract_components
+    """
+    content_hash = manual_text_cache.content_hash(pdf_path)
+    kind = f"components:{custom_prompt or ''}"
+    cached = manual_text_cache.get_result(content_hash, kind)
+    if cached is not None:
+        logger.info(f"Using stored components of identical manual {content_hash[:12]}")
+        return cached
+
+    document = load_manual_text(pdf_path, content_hash)
+    components = extract_components(document["text"], custom_prompt)
+
+    if components and "error_processing" not in components:
+        manual_text_cache.put_result(content_hash, kind, components)
+    return components
@@ -0,0 +1,190 @@
+"""
+On-disk cache of extracted manual text, keyed by the SHA-256 of the PDF bytes
+
+Each manual is stored as a plain UTF-8 text file, a JSON index with the page
+offsets and regex pre-scan results, and one JSON file per analysis result
+(information extraction, components per prompt). The same PDF attached to
+several manuals, or processed again, reuses all of them.
+
+Analysis results carry RESULT_VERSION and expire after MANUAL_RESULT_TTL
+seconds; results of another version are ignored and computed again.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from config import Config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when the analysis (prompts, page selection, merging) changes, so stored results are recomputed
+RESULT_VERSION = 2
+
+_hashes = {}
+_hashes_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stored": 0, "result_hits": 0, "result_misses": 0, "results_stored": 0}
+_stats_lock = threading.Lock()
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def content_hash(pdf_path):
+    """
+    SHA-256 of a PDF's bytes
+
+    The hash is remembered per path, size and modification time, so asking again
+    for an unchanged file does not read it again.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+
+    Returns:
+        str: Hex digest
+    """
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime_ns)
+    with _hashes_lock:
+        if key in _hashes:
+            return _hashes[key]
+
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    with _hashes_lock:
+        _hashes[key] = digest.hexdigest()
+    return digest.hexdigest()
+
+def _entry_path(content_hash, suffix):
+    return os.path.join(Config.MANUAL_CACHE_DIR, content_hash[:2], content_hash + suffix)
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading manual cache file {path}: {e}")
+        return None
+
+def get_index(content_hash):
+    """
+    Look up the page index and pre-scan results of a cached manual
+
+    Returns:
+        dict: The index (page_offsets, prescan, ...), or None
+    """
+    index = _read_json(_entry_path(content_hash, ".json"))
+    if index is None or not os.path.exists(_entry_path(content_hash, ".txt")):
+        _record("misses")
+        return None
+    _record("hits")
+    return index
+
+def read_text(content_hash):
+    """Read the full cached text of a manual"""
+    # newline="" keeps \r characters, so the stored page offsets still line up
+    with open(_entry_path(content_hash, ".txt"), "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+def store(content_hash, text, page_offsets, prescan):
+    """
+    Store the extracted text, page offsets and pre-scan results of a manual
+
+    Args:
+        content_hash (str): Content hash of the PDF
+        text (str): Extracted text
+        page_offsets (list): Character offset at which each page starts
+        prescan (dict): Regex pre-scan results
+
+    Returns:
+        dict: The stored index
+    """
+    encoded = text.encode("utf-8")
+    index = {
+        "content_hash": content_hash,
+        "page_count": len(page_offsets),
+        "chars": len(text),
+        "page_offsets": page_offsets,
+        "prescan": prescan,
+        "created_at": time.time()
+    }
+    try:
+        _write_atomic(_entry_path(content_hash, ".txt"), encoded)
+        _write_atomic(_entry_path(content_hash, ".json"), json.dumps(index).encode("utf-8"))
+        _record("stored")
+    except OSError as e:
+        logger.error(f"Error storing manual text {content_hash}: {e}")
+    return index
+
+def _result_suffix(kind):
+    return f".{hashlib.sha256(kind.encode('utf-8')).hexdigest()[:16]}.result.json"
+
+def get_result(content_hash, kind):
+    """
+    Look up a stored analysis result of a manual
+
+    Args:
+        content_hash (str): Content hash of the PDF
+        kind (str): Result kind, e.g. "information" or "components:<prompt>"
+
+    Returns:
+        The stored result, or None if there is none of the current RESULT_VERSION
+        within MANUAL_RESULT_TTL
+    """
+    stored = _read_json(_entry_path(content_hash, _result_suffix(kind)))
+    if (stored is None or stored.get("kind") != kind or stored.get("version") != RESULT_VERSION
+            or time.time() - stored.get("created_at", 0) > Config.MANUAL_RESULT_TTL):
+        _record("result_misses")
+        return None
+    _record("result_hits")
+    return stored["result"]
+
+def put_result(content_hash, kind, result):
+    """Store an analysis result of a manual"""
+    try:
+        payload = json.dumps({"kind": kind, "version": RESULT_VERSION, "result": result, "created_at": time.time()})
+        _write_atomic(_entry_path(content_hash, _result_suffix(kind)), payload.encode("utf-8"))
+        _record("results_stored")
+    except (OSError, TypeError, ValueError) as e:
+        logger.error(f"Error storing {kind} result for manual {content_hash}: {e}")
+
+def get_cache_stats():
+    """
+    Get manual cache counters
+
+    Returns:
+        dict: Hit/miss/store counters for texts and analysis results, and the number of cached manuals
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    manuals = 0
+    if os.path.isdir(Config.MANUAL_CACHE_DIR):
+        for _, _, names in os.walk(Config.MANUAL_CACHE_DIR):
+            manuals += sum(1 for name in names if name.endswith(".txt"))
+    stats["manuals"] = manuals
+    return stats
+
+def clear_cache():
+    """Remove all cached manual texts and analysis results"""
+    if os.path.isdir(Config.MANUAL_CACHE_DIR):
+        shutil.rmtree(Config.MANUAL_CACHE_DIR, ignore_errors=True)
+    with _hashes_lock:
+        _hashes.clear()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import unittest
+from unittest import mock
+from services import manual_parser
+from services.manual_parser import split_into_chunks, merge_code_results, map_reduce_extract
+
+class TestSplitIntoChunks(unittest.TestCase):
+    """Test how manual text is split into chunks for code extraction"""
+
+    def test_without_page_offsets(self):
+        """Without page offsets the text is cut every chunk_size characters"""
+        self.assertEqual(
+            split_into_chunks("abcdefghij", chunk_size=4),
+            [(None, None, "abcd"), (None, None, "efgh"), (None, None, "ij")]
+        )
+
+    def test_whole_pages(self):
+        """Pages are grouped into chunks without being cut"""
+        text = "aaaa" + "bbbbbb" + "cc"
+        self.assertEqual(
+            split_into_chunks(text, [0, 4, 10], chunk_size=8),
+            [(1, 1, "aaaa"), (2, 3, "bbbbbbcc")]
+        )
+
+    def test_long_page_is_split_on_its_own(self):
+        """A page longer than chunk_size is split, and every chunk names the pages it covers"""
+        text = "aaaa" + "b" * 12 + "cc"
+        chunks = split_into_chunks(text, [0, 4, 16], chunk_size=5)
+        self.assertEqual(chunks, [(1, 1, "aaaa"), (2, 2, "bbbbb"), (2, 2, "bbbbb"), (2, 3, "bbcc")])
+
+    def test_chunks_cover_the_text(self):
+        """Chunks never exceed chunk_size and together are the whole text, in order"""
+        pages = ["page one text\n" * 3, "x" * 50, "", "short\n", "tail " * 7]
+        offsets, text = [], ""
+        for page in pages:
+            offsets.append(len(text))
+            text += page
+        chunks = split_into_chunks(text, offsets, chunk_size=20)
+        self.assertEqual("".join(chunk for _, _, chunk in chunks), text)
+        self.assertTrue(all(len(chunk) <= 20 for _, _, chunk in chunks))
+        self.assertEqual(chunks[-1][1], len(pages))
+
+class TestMergeCodeResults(unittest.TestCase):
+    """Test merging of per-chunk extraction results"""
+
+    def test_deduplicates_ignoring_case_and_whitespace(self):
+        """Duplicates keep the first spelling and the longest description, in order of first appearance"""
+        merged = merge_code_results([
+            [{"code": "E-12", "description": "Low"}, {"code": "WS01-F01092", "description": "Thermostat"}],
+            [{"code": "e- 12", "description": "Low water level"}, {"code": "  ", "description": "blank"}],
+            [{"code": "F3", "description": None}],
+        ])
+        self.assertEqual(merged, [
+            {"code": "E-12", "description": "Low water level"},
+            {"code": "WS01-F01092", "description": "Thermostat"},
+            {"code": "F3", "description": ""},
+        ])
+
+    def test_empty(self):
+        """No results merge to an empty list"""
+        self.assertEqual(merge_code_results([]), [])
+        self.assertEqual(merge_code_results([[], []]), [])
+
+class TestMapReduceExtract(unittest.TestCase):
+    """Test that chunk extraction maps chunks of selected pages back to manual pages"""
+
+    PAGES = [
+        "Introduction and warranty\n",
+        "Error code E12 means low water, error code E45 means sensor open\n",
+        "Cleaning instructions\n",
+        "Part number WS01-F01092 thermostat, part number WS01-F01093 probe\n",
+    ]
+
+    def setUp(self):
+        self.offsets, self.text = [], ""
+        for page in self.PAGES:
+            self.offsets.append(len(self.text))
+            self.text += page
+        # Only pages 2 and 4 reach the minimum score
+        self.page_scores = [{"score": 0}, {"score": 10}, {"score": 0}, {"score": 10}]
+
+    def fake_extract(self, chunk, extraction_types):
+        """Return every regex candidate of a chunk as if the LLM had extracted it"""
+        return {
+            "part_numbers": [{"code": code, "description": ""} for code in ("WS01-F01092", "WS01-F01093") if code in chunk],
+            "error_codes": [{"code": code, "description": ""} for code in ("E12", "E45") if code in chunk],
+        }
+
+    def test_selected_pages_are_mapped_back(self):
+        """Chunks of the selected pages report the manual's page numbers"""
+        with mock.patch.object(manual_parser.Config, "MANUAL_PAGE_MIN_SCORE", 4), \
+                mock.patch.object(manual_parser.Config, "MANUAL_CHUNK_CHARS", 70), \
+                mock.patch.object(manual_parser, "_extract_chunk", side_effect=self.fake_extract):
+            result = map_reduce_extract(self.text, ["part numbers", "error codes"], self.offsets, self.page_scores)
+
+        self.assertEqual({item["code"] for item in result["error_codes"]}, {"E12", "E45"})
+        self.assertEqual({item["code"] for item in result["part_numbers"]}, {"WS01-F01092", "WS01-F01093"})
+        self.assertEqual(result["coverage"]["analyzed_pages"], [2, 4])
+        self.assertEqual(result["coverage"]["chunks_failed"], 0)
+
+    def test_failed_chunks_are_counted(self):
+        """A chunk whose extraction fails is counted and the other chunks still merge"""
+        def flaky_extract(chunk, extraction_types):
+            if "E12" in chunk:
+                raise RuntimeError("rate limited")
+            return self.fake_extract(chunk, extraction_types)
+
+        with mock.patch.object(manual_parser.Config, "MANUAL_PAGE_MIN_SCORE", 4), \
+                mock.patch.object(manual_parser.Config, "MANUAL_CHUNK_CHARS", 70), \
+                mock.patch.object(manual_parser, "_extract_chunk", side_effect=flaky_extract):
+            result = map_reduce_extract(self.text, ["part numbers", "error codes"], self.offsets, self.page_scores)
+
+        self.assertEqual(result["coverage"]["chunks_failed"], 1)
+        self.assertEqual(result["error_codes"], [])
+        self.assertEqual({item["code"] for item in result["part_numbers"]}, {"WS01-F01092", "WS01-F01093"})
+        self.assertEqual(result["coverage"]["analyzed_pages"], [2, 4])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import unittest
+from services.manual_parser import score_page, score_pages, select_pages, pages_text, page_for_offset
+
+ERROR_CODE_PAGE = "TROUBLESHOOTING\nError codes\n" + "".join(f"E{code}\nCheck sensor\n" for code in range(10, 22))
+PARTS_LIST_PAGE = "REPLACEMENT PARTS LIST\nItem  Part Number  Description  Qty\n" + "".join(
+    f"{item}  AB{10000 + item}  Bracket  1\n" for item in range(1, 13))
+PROSE_PAGE = ("Thank you for purchasing this appliance. Read these instructions carefully before "
+              "installing it and keep them for future reference.\n")
+
+class TestPageScoring(unittest.TestCase):
+    """Test which manual pages are scored as likely to hold codes, parts lists or diagrams"""
+
+    def test_table_pages_outscore_prose(self):
+        """Error code tables and parts lists score above plain prose, under the right kind"""
+        errors, parts, prose = score_page(ERROR_CODE_PAGE), score_page(PARTS_LIST_PAGE), score_page(PROSE_PAGE)
+        self.assertGreater(errors["error_codes"], parts["error_codes"])
+        self.assertGreater(parts["parts_list"], errors["parts_list"])
+        self.assertGreater(errors["score"], prose["score"])
+        self.assertGreater(parts["score"], prose["score"])
+        self.assertEqual(prose["score"], prose["error_codes"] + prose["parts_list"] + prose["exploded_view"])
+
+    def test_layout_marks_exploded_views(self):
+        """A page with images counts toward exploded_view"""
+        self.assertGreater(score_page("Figure 3\n", {"images": 1})["exploded_view"], score_page("Figure 3\n")["exploded_view"])
+
+    def test_score_pages(self):
+        """Every page gets its own score, in page order"""
+        text = PROSE_PAGE + ERROR_CODE_PAGE
+        scores = score_pages(text, [0, len(PROSE_PAGE)])
+        self.assertEqual(len(scores), 2)
+        self.assertEqual(scores[1], score_page(ERROR_CODE_PAGE))
+
+class TestSelectPages(unittest.TestCase):
+    """Test which pages are sent to the LLM"""
+
+    SCORES = [{"score": score} for score in (0, 9, 3, 12, 4, 7)]
+
+    def test_minimum_score(self):
+        """Only pages reaching the minimum score are selected, in page order"""
+        self.assertEqual(select_pages(self.SCORES, min_score=4), [2, 4, 5, 6])
+
+    def test_max_pages_keeps_best(self):
+        """With max_pages the best scoring pages are kept, still in page order"""
+        self.assertEqual(select_pages(self.SCORES, max_pages=2, min_score=4), [2, 4])
+
+    def test_nothing_selected(self):
+        """No page reaching the minimum selects nothing"""
+        self.assertEqual(select_pages(self.SCORES, min_score=100), [])
+
+class TestPagesText(unittest.TestCase):
+    """Test joining selected pages and locating offsets"""
+
+    PAGES = ["first\n", "second\n", "third\n"]
+
+    def setUp(self):
+        self.offsets, self.text = [], ""
+        for page in self.PAGES:
+            self.offsets.append(len(self.text))
+            self.text += page
+
+    def test_join_selected_pages(self):
+        """Selected pages are joined with the offset each starts at"""
+        joined, offsets = pages_text(self.text, self.offsets, [1, 3])
+        self.assertEqual(joined, "first\nthird\n")
+        self.assertEqual(offsets, [0, 6])
+
+    def test_markers(self):
+        """With markers each page starts with its page number"""
+        joined, offsets = pages_text(self.text, self.offsets, [2], markers=True)
+        self.assertEqual(joined, "\n--- Page 2 ---\nsecond\n")
+        self.assertEqual(offsets, [0])
+
+    def test_page_for_offset(self):
+        """Character offsets map to 1-based page numbers"""
+        self.assertEqual(page_for_offset(self.offsets, 0), 1)
+        self.assertEqual(page_for_offset(self.offsets, 5), 1)
+        self.assertEqual(page_for_offset(self.offsets, 6), 2)
+        self.assertEqual(page_for_offset(self.offsets, len(self.text) - 1), 3)
+        self.assertEqual(page_for_offset([], 10), 1)
+
+if __name__ == "__main__":
+    unittest.main()
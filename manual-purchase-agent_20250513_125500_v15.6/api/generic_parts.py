@@ -1,33 +1,17 @@
 from flask import Blueprint, request, jsonify
-import requests
 import json
 import os
 import logging
 from typing import Dict, List, Optional
+from services import serpapi_client, llm_gateway, prompt_budget
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-    USING_NEW_OPENAI_CLIENT = True
-    logger = logging.getLogger(__name__)
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to legacy OpenAI client (v0.x)
-    import openai
-    openai.api_key = os.getenv('OPENAI_API_KEY')
-    openai_client = None
-    USING_NEW_OPENAI_CLIENT = False
-    logger = logging.getLogger(__name__)
-    logger.info("Using legacy OpenAI client")
+logger = logging.getLogger(__name__)
 
 generic_parts_bp = Blueprint('generic_parts', __name__)
 
 class GenericPartsFinder:
     def __init__(self):
         self.serpapi_key = os.getenv('SERPAPI_KEY')
-        self.openai_client = openai_client
     
     def find_generic_alternatives(self, make: str, model: str, oem_part_number: str, 
                                 oem_part_description: str, options: Dict = None) -> Dict:
@@ -101,19 +85,17 @@ class GenericPartsFinder:
                     'num': 5
                 }
                 
-                response = requests.get('https://serpapi.com/search', params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    results = data.get('organic_results', [])
-                    
-                    for result in results:
-                        all_results.append({
-                            'title': result.get('title', ''),
-                            'link': result.get('link', ''),
-                            'snippet': result.get('snippet', ''),
-                            'search_type': 'cross_reference',
-                            'query': query
-                        })
+                data = serpapi_client.search(params, family="generic_parts")
+                results = data.get('organic_results', [])
+                
+                for result in results:
+                    all_results.append({
+                        'title': result.get('title', ''),
+                        'link': result.get('link', ''),
+                        'snippet': result.get('snippet', ''),
+                        'search_type': 'cross_reference',
+                        'query': query
+                    })
                         
             except Exception as e:
                 print(f"Error in cross-reference search: {e}")
@@ -142,19 +124,17 @@ class GenericPartsFinder:
                     'num': 5
                 }
                 
-                response = requests.get('https://serpapi.com/search', params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    results = data.get('organic_results', [])
-                    
-                    for result in results:
-                        all_results.append({
-                            'title': result.get('title', ''),
-                            'link': result.get('link', ''),
-                            'snippet': result.get('snippet', ''),
-                            'search_type': 'generic_search',
-                            'query': query
-                        })
+                data = serpapi_client.search(params, family="generic_parts")
+                results = data.get('organic_results', [])
+                
+                for result in results:
+                    all_results.append({
+                        'title': result.get('title', ''),
+                        'link': result.get('link', ''),
+                        'snippet': result.get('snippet', ''),
+                        'search_type': 'generic_search',
+                        'query': query
+                    })
                         
             except Exception as e:
                 print(f"Error in generic parts search: {e}")
@@ -169,7 +149,7 @@ class GenericPartsFinder:
         # Prepare search results for AI analysis - GPT-4.1-Nano can handle up to 1M input tokens
         results_text = "\n".join([
             f"Title: {r.get('title', '')}\nURL: {r.get('link', '')}\nDescription: {r.get('snippet', '')}\nSearch Type: {r.get('search_type', '')}\n---"
-            for r in search_results  # Process all results with GPT-4.1-Nano's large input context
+            for r in prompt_budget.compact_results(search_results, "generic_parts_analysis", url_key="link")
         ])
         
         prompt = f"""
@@ -228,35 +208,16 @@ class GenericPartsFinder:
         """
         
         try:
-            # Handle both new and old OpenAI clients - using GPT-4.1-Nano
-            if USING_NEW_OPENAI_CLIENT:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4.1-mini-2025-04-14",
-                    messages=[
-                        {"role": "system", "content": "You are an expert in automotive and industrial parts cross-referencing using GPT-4.1-Nano's enhanced analytical capabilities. Analyze search results to find compatible generic alternatives to OEM parts with comprehensive analysis."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=32768,  # GPT-4.1-Nano max completion tokens
-                    temperature=0.2   # Lower temperature for more precise analysis
-                )
-            else:
-                # Legacy OpenAI client - using GPT-4.1-Nano
-                import openai
-                response = openai.ChatCompletion.create(
-                    model="gpt-4.1-mini-2025-04-14",
-                    messages=[
-                        {"role": "system", "content": "You are an expert in automotive and industrial parts cross-referencing using GPT-4.1-Nano's enhanced analytical capabilities. Analyze search results to find compatible generic alternatives to OEM parts with comprehensive analysis."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=32768,  # GPT-4.1-Nano max completion tokens
-                    temperature=0.2   # Lower temperature for more precise analysis
-                )
-            
-            # Parse response based on client version
-            if USING_NEW_OPENAI_CLIENT:
-                ai_response = response.choices[0].message.content
-            else:
-                ai_response = response.choices[0].message['content']
+            # Route through the shared gateway - using GPT-4.1-Nano
+            ai_response = llm_gateway.chat_completion(
+                model="gpt-4.1-mini-2025-04-14",
+                messages=[
+                    {"role": "system", "content": "You are an expert in automotive and industrial parts cross-referencing using GPT-4.1-Nano's enhanced analytical capabilities. Analyze search results to find compatible generic alternatives to OEM parts with comprehensive analysis."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2,   # Lower temperature for more precise analysis
+                purpose="generic_parts_analysis"
+            )
             
             # Try to parse JSON from AI response
             try:
@@ -315,12 +276,10 @@ class GenericPartsFinder:
                 'num': 1
             }
             
-            response = requests.get('https://serpapi.com/search', params=params)
-            if response.status_code == 200:
-                data = response.json()
-                images = data.get('images_results', [])
-                if images:
-                    return images[0].get('original', '')
+            data = serpapi_client.search(params, family="image_search")
+            images = data.get('images_results', [])
+            if images:
+                return images[0].get('original', '')
                     
         except Exception as e:
             print(f"Error searching for part image: {e}")
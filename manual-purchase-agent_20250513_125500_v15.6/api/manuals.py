@@ -34,9 +34,6 @@ logger = logging.getLogger(__name__)
 
 manuals_bp = Blueprint('manuals', __name__)
 
-# Store manual URLs temporarily for proxy access
-manual_url_cache = {}
-
 @manuals_bp.route('/search', methods=['GET', 'POST'])
 def search_manuals():
     """Search for manuals by make, model and optional year"""
@@ -100,11 +97,10 @@ def search_manuals():
         # Use results as verified_results since we're not doing verification
         verified_results = results
         
-        # Generate proxy URLs for PDFs to avoid ad blocker issues
-        import uuid
+        # Generate proxy URLs for PDFs to avoid ad blocker issues (ids are shared by all workers)
+        from services import manual_proxy
         for result in verified_results:
-            proxy_id = str(uuid.uuid4())[:8]
-            manual_url_cache[proxy_id] = result['url']
+            proxy_id = manual_proxy.register_url(result['url'])
             result['proxy_url'] = f"/api/manuals/proxy/{proxy_id}"
             
         return jsonify({
@@ -1105,14 +1101,29 @@ def get_components_static(manual_id):
 
 @manuals_bp.route('/proxy/<proxy_id>')
 def proxy_manual(proxy_id):
-    """Proxy manual PDF to avoid ad blocker issues"""
-    from flask import redirect
+    """
+    Serve a manual PDF through this server to avoid ad blocker issues
+    
+    Manuals in the local cache are served from disk with Range support. Others are
+    streamed from their origin (Range requests are passed on) and cached. Origins
+    that fail or do not answer with a PDF get a redirect to the original URL.
+    """
+    from flask import redirect, send_file, Response
+    from services import manual_proxy
     
     # Get the original URL
-    original_url = manual_url_cache.get(proxy_id)
+    original_url = manual_proxy.resolve_proxy_id(proxy_id)
     if not original_url:
         return jsonify({'error': 'Manual not found'}), 404
     
-    # Redirect to the original URL
-    # This avoids direct linking which can be blocked
-    return redirect(original_url, code=302)
\ No newline at end of file
+    cached_path = manual_proxy.cached_path(original_url)
+    if cached_path:
+        return send_file(cached_path, mimetype='application/pdf', conditional=True)
+    
+    fetched = manual_proxy.open_manual(original_url, request.headers.get('Range'))
+    if fetched is None:
+        # Redirect to the original URL
+        return redirect(original_url, code=302)
+    
+    status, headers, body = fetched
+    return Response(body, status=status, mimetype='application/pdf', headers=headers)
\ No newline at end of file
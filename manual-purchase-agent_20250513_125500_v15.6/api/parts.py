@@ -1,7 +1,16 @@
-from flask import Blueprint, request, jsonify
-from models import db, Part
-from services.part_resolver import resolve_part_name
+from flask import Blueprint, request, jsonify, Response, current_app
+from models import db, Part, PartAlternate
+from models.part import normalize_part_number
+from sqlalchemy import or_
+from config import Config
+from services.part_resolver import resolve_part_name, RESOLVE_STAGES
+from services import resolve_jobs, resolution_cache, part_crossref, part_trigram_index, deadline
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import logging
+import queue
+import threading
+import time
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -9,6 +18,191 @@ logger = logging.getLogger(__name__)
 
 parts_bp = Blueprint('parts', __name__)
 
+def validate_bool_param(param, name):
+    """Validate that a parameter is a boolean or can be converted to one"""
+    if isinstance(param, bool):
+        return param
+    elif isinstance(param, str):
+        if param.lower() in ['true', 'false']:
+            return param.lower() == 'true'
+        else:
+            raise ValueError(f"{name} must be a boolean value or 'true'/'false' string")
+    elif isinstance(param, int):
+        if param in [0, 1]:
+            return bool(param)
+        else:
+            raise ValueError(f"{name} must be a boolean value, 0/1, or 'true'/'false' string")
+    else:
+        raise ValueError(f"{name} must be a boolean value, 0/1, or 'true'/'false' string")
+
+def parse_resolve_options(data):
+    """
+    Read the description and search toggles of a resolve request
+    
+    Args:
+        data (dict): Request JSON
+        
+    Returns:
+        dict: Keyword arguments for resolve_part_name
+        
+    Raises:
+        ValueError: If a toggle is not a boolean value or deadline_ms is not a positive number
+    """
+    # Validated here, the deadline itself starts when the resolution starts
+    deadline.from_ms(data.get('deadline_ms'))
+    
+    return {
+        "description": data['description'],
+        "make": data.get('make'),
+        "model": data.get('model'),
+        "year": data.get('year'),
+        "use_database": validate_bool_param(data.get('use_database', True), 'use_database'),
+        "use_manual_search": validate_bool_param(data.get('use_manual_search', True), 'use_manual_search'),
+        "use_web_search": validate_bool_param(data.get('use_web_search', True), 'use_web_search'),
+        "save_results": validate_bool_param(data.get('save_results', True), 'save_results'),
+        "bypass_cache": validate_bool_param(data.get('bypass_cache', False), 'bypass_cache'),
+        "parallel": validate_bool_param(data.get('parallel', Config.RESOLVE_PARALLEL_DEFAULT), 'parallel'),
+        "deadline_ms": data.get('deadline_ms')
+    }
+
+def build_resolve_response(result, options):
+    """
+    Build the API response for a resolve_part_name result
+    
+    Args:
+        result (dict): Response from resolve_part_name
+        options (dict): The resolve options from parse_resolve_options
+        
+    Returns:
+        dict: Structured response with results, recommendation and summary
+    """
+    use_manual_search = options.get('use_manual_search', True)
+    use_web_search = options.get('use_web_search', True)
+    
+    # Build structured response with the enhanced data
+    response = {
+        "success": True,
+        "query": result.get("query", {
+            "description": options.get('description'),
+            "make": options.get('make'),
+            "model": options.get('model'),
+            "year": options.get('year')
+        }),
+        "results": {
+            "database": result.get("database_result"),
+            "manual_search": result.get("manual_search_result"),
+            "ai_web_search": result.get("ai_web_search_result")
+        },
+        "search_methods_used": result.get("search_methods_used", {
+            "database": options.get('use_database', True),
+            "manual_search": use_manual_search,
+            "web_search": use_web_search
+        })
+    }
+    
+    # Add comparison if available
+    if "comparison" in result:
+        response["comparison"] = result["comparison"]
+    
+    # Add recommendation if available
+    if "recommended_result" in result:
+        response["recommended_result"] = result["recommended_result"]
+        response["recommendation_reason"] = result.get("recommendation_reason", "")
+    
+    # Add similar parts if triggered
+    if result.get("similar_parts_triggered"):
+        response["similar_parts_triggered"] = True
+        response["similar_parts"] = result.get("similar_parts", [])
+    else:
+        response["similar_parts_triggered"] = False
+    
+    # Report stages skipped or cut short by deadline_ms
+    if result.get("deadline_ms") is not None:
+        response["deadline_ms"] = result["deadline_ms"]
+        response["dropped_stages"] = result.get("dropped_stages", [])
+    
+    # Report legs skipped because a higher-priority leg already gave a confident, validated answer
+    if result.get("skipped_legs"):
+        response["skipped_legs"] = result["skipped_legs"]
+    
+    # Mark responses that reused the resolution of a similar earlier query
+    if result.get("similar_resolution"):
+        response["similar_resolution"] = result["similar_resolution"]
+    
+    # Mark responses served from the resolve cache
+    if result.get("from_cache"):
+        response["from_cache"] = True
+        response["cached_at"] = result.get("cached_at")
+    
+    # Generate summary message
+    messages = []
+    
+    # Check database result
+    db_result = result.get("database_result") or {}
+    if db_result.get("found"):
+        db_res = result["database_result"]
+        if db_res.get("match_type") in ("fuzzy", "full_text"):
+            label = "fuzzy description" if db_res["match_type"] == "fuzzy" else "full-text"
+            messages.append(f"Database: Found {label} match '{db_res['oem_part_number']}' "
+                            f"with {db_res.get('confidence', 0):.0%} similarity")
+        else:
+            messages.append(f"Database: Found exact match '{db_res['oem_part_number']}' with 100% confidence")
+    
+    # Check manual search result
+    manual_result = result.get("manual_search_result") or {}
+    if manual_result.get("found"):
+        manual_res = result["manual_search_result"]
+        validation = manual_res.get("serpapi_validation", {})
+        messages.append(
+            f"Manual Search: Found '{manual_res['oem_part_number']}' "
+            f"(confidence: {manual_res['confidence']:.0%}, "
+            f"validated: {'✓' if validation.get('is_valid') else '✗'})"
+        )
+    elif use_manual_search:
+        messages.append("Manual Search: No results found")
+    
+    # Check AI web search result (now dual search)
+    ai_result = result.get("ai_web_search_result") or {}
+    if ai_result.get("found"):
+        ai_res = result["ai_web_search_result"]
+        validation = ai_res.get("serpapi_validation", {})
+        selected_method = ai_res.get("selected_method", "unknown")
+        serpapi_count = ai_res.get("serpapi_count", 0)
+        gpt_success = ai_res.get("gpt_web_success", False)
+        
+        messages.append(
+            f"Dual Search: Found '{ai_res['oem_part_number']}' "
+            f"(confidence: {ai_res['confidence']:.0%}, "
+            f"method: {selected_method}, "
+            f"SerpAPI: {serpapi_count} results, "
+            f"GPT: {'✓' if gpt_success else '✗'}, "
+            f"validated: {'✓' if validation.get('is_valid') else '✗'})"
+        )
+    elif use_web_search:
+        ai_res = result.get("ai_web_search_result", {})
+        serpapi_count = ai_res.get("serpapi_count", 0)
+        gpt_success = ai_res.get("gpt_web_success", False)
+        messages.append(f"Dual Search: No results found (SerpAPI: {serpapi_count} results, GPT: {'✓' if gpt_success else '✗'})")
+    
+    # Add comparison message if both manual and AI found results
+    if result.get("comparison"):
+        if result["comparison"]["part_numbers_match"]:
+            messages.append("✓ Manual and AI results match - high confidence in accuracy")
+        else:
+            messages.append("⚠ Manual and AI returned different part numbers")
+    
+    # Add recommendation to summary
+    if result.get("recommended_result"):
+        rec = result["recommended_result"]
+        messages.insert(0, f"✅ RECOMMENDED: {rec['oem_part_number']} - {result.get('recommendation_reason', '')}")
+    elif result.get("similar_parts_triggered") and result.get("similar_parts"):
+        similar_count = len(result["similar_parts"])
+        messages.insert(0, f"🔍 SIMILAR PARTS: Found {similar_count} alternative parts for review - {result.get('recommendation_reason', '')}")
+    
+    response["summary"] = " | ".join(messages) if messages else "No results found"
+    
+    return response
+
 @parts_bp.route('/resolve', methods=['POST'])
 def resolve_part():
     """
@@ -23,6 +217,13 @@ def resolve_part():
     - use_web_search: Whether to search on the web (default: true)
     - save_results: Whether to save results to the database (default: true)
     - bypass_cache: Whether to bypass all caching and perform fresh searches (default: false)
+    - parallel: Whether to run the manual and web searches concurrently (default: RESOLVE_PARALLEL_DEFAULT)
+    - deadline_ms: Time budget in milliseconds; stages that cannot finish in time are skipped
+      or cut short and listed in dropped_stages (default: no deadline)
+    
+    Optional asynchronous mode:
+    - async: Queue the resolution and return 202 with a job id instead of waiting (default: false)
+    - callback_url: Public http(s) URL that receives a POST with the finished job (async only)
     
     Returns a comprehensive response with:
     - Primary OEM part number and details
@@ -43,41 +244,16 @@ def resolve_part():
     try:
         logger.info(f"API: Resolving part: {data.get('description')} for {data.get('make')} {data.get('model')} {data.get('year')}")
         
-        # Get search toggle parameters with defaults
-        use_database = data.get('use_database', True)
-        use_manual_search = data.get('use_manual_search', True)
-        use_web_search = data.get('use_web_search', True)
-        save_results = data.get('save_results', True)
-        bypass_cache = data.get('bypass_cache', False)
-        
-        # Validate toggle parameters
-        def validate_bool_param(param, name):
-            """Validate that a parameter is a boolean or can be converted to one"""
-            if isinstance(param, bool):
-                return param
-            elif isinstance(param, str):
-                if param.lower() in ['true', 'false']:
-                    return param.lower() == 'true'
-                else:
-                    raise ValueError(f"{name} must be a boolean value or 'true'/'false' string")
-            elif isinstance(param, int):
-                if param in [0, 1]:
-                    return bool(param)
-                else:
-                    raise ValueError(f"{name} must be a boolean value, 0/1, or 'true'/'false' string")
-            else:
-                raise ValueError(f"{name} must be a boolean value, 0/1, or 'true'/'false' string")
-        
         # Validate and convert each toggle parameter
         try:
-            use_database = validate_bool_param(use_database, 'use_database')
-            use_manual_search = validate_bool_param(use_manual_search, 'use_manual_search')
-            use_web_search = validate_bool_param(use_web_search, 'use_web_search')
-            save_results = validate_bool_param(save_results, 'save_results')
-            bypass_cache = validate_bool_param(bypass_cache, 'bypass_cache')
+            options = parse_resolve_options(data)
+            run_async = validate_bool_param(data.get('async', False), 'async')
+            callback_url = data.get('callback_url')
+            if callback_url:
+                resolve_jobs.validate_callback_url(callback_url)
             
             # Ensure at least one search method is enabled
-            if not any([use_database, use_manual_search, use_web_search]):
+            if not any([options['use_database'], options['use_manual_search'], options['use_web_search']]):
                 return jsonify({
                     'error': 'At least one search method must be enabled',
                     'message': 'Please enable at least one of: database search, manual search, or web search'
@@ -90,20 +266,21 @@ def resolve_part():
             }), 400
             
         # Log toggle parameters
-        logger.info(f"Search toggles: DB={use_database}, Manual={use_manual_search}, Web={use_web_search}, Save={save_results}, Bypass Cache={bypass_cache}")
+        logger.info(f"Search toggles: DB={options['use_database']}, Manual={options['use_manual_search']}, Web={options['use_web_search']}, Save={options['save_results']}, Bypass Cache={options['bypass_cache']}, Parallel={options['parallel']}, Async={run_async}")
+        
+        # Queue the resolution and return immediately in async mode
+        if run_async:
+            job = resolve_jobs.submit_job(options, callback_url=callback_url)
+            return jsonify({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': f"/api/parts/resolve/jobs/{job.id}",
+                'result_url': f"/api/parts/resolve/jobs/{job.id}/result"
+            }), 202
         
         # Execute part resolution with selected methods
-        result = resolve_part_name(
-            description=data['description'],
-            make=data.get('make'),
-            model=data.get('model'),
-            year=data.get('year'),
-            use_database=use_database,
-            use_manual_search=use_manual_search,
-            use_web_search=use_web_search,
-            save_results=save_results,
-            bypass_cache=bypass_cache
-        )
+        result = resolve_part_name(**options)
         
         # Check if result is None or empty
         if not result:
@@ -114,114 +291,277 @@ def resolve_part():
                 'message': f"Failed to resolve part '{data.get('description')}'"
             }), 500
         
-        # Build structured response with the enhanced data
-        response = {
-            "success": True,
-            "query": result.get("query", {
-                "description": data.get('description'),
-                "make": data.get('make'),
-                "model": data.get('model'),
-                "year": data.get('year')
-            }),
-            "results": {
-                "database": result.get("database_result"),
-                "manual_search": result.get("manual_search_result"),
-                "ai_web_search": result.get("ai_web_search_result")
-            },
-            "search_methods_used": result.get("search_methods_used", {
-                "database": use_database,
-                "manual_search": use_manual_search,
-                "web_search": use_web_search
-            })
-        }
-        
-        # Add comparison if available
-        if "comparison" in result:
-            response["comparison"] = result["comparison"]
-        
-        # Add recommendation if available
-        if "recommended_result" in result:
-            response["recommended_result"] = result["recommended_result"]
-            response["recommendation_reason"] = result.get("recommendation_reason", "")
-        
-        # Add similar parts if triggered
-        if result.get("similar_parts_triggered"):
-            response["similar_parts_triggered"] = True
-            response["similar_parts"] = result.get("similar_parts", [])
-        else:
-            response["similar_parts_triggered"] = False
-        
-        # Generate summary message
-        messages = []
-        
-        # Check database result
-        db_result = result.get("database_result") or {}
-        if db_result.get("found"):
-            db_res = result["database_result"]
-            messages.append(f"Database: Found exact match '{db_res['oem_part_number']}' with 100% confidence")
-        
-        # Check manual search result
-        manual_result = result.get("manual_search_result") or {}
-        if manual_result.get("found"):
-            manual_res = result["manual_search_result"]
-            validation = manual_res.get("serpapi_validation", {})
-            messages.append(
-                f"Manual Search: Found '{manual_res['oem_part_number']}' "
-                f"(confidence: {manual_res['confidence']:.0%}, "
-                f"validated: {'✓' if validation.get('is_valid') else '✗'})"
-            )
-        elif use_manual_search:
-            messages.append("Manual Search: No results found")
-        
-        # Check AI web search result (now dual search)
-        ai_result = result.get("ai_web_search_result") or {}
-        if ai_result.get("found"):
-            ai_res = result["ai_web_search_result"]
-            validation = ai_res.get("serpapi_validation", {})
-            selected_method = ai_res.get("selected_method", "unknown")
-            serpapi_count = ai_res.get("serpapi_count", 0)
-            gpt_success = ai_res.get("gpt_web_success", False)
+        return jsonify(build_resolve_response(result, options))
+    
+    except Exception as e:
+        logger.error(f"Error resolving part name: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'message': f"Failed to resolve part '{data.get('description')}'"
+        }), 500
+
+def format_sse(event, data):
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@parts_bp.route('/resolve/stream', methods=['GET', 'POST'])
+def resolve_part_stream():
+    """
+    Streaming variant of /resolve using server-sent events
+    
+    Accepts the same parameters as /resolve, as JSON (POST) or query string (GET,
+    for EventSource clients). Emits one event per stage as soon as it is ready:
+    database_result, manual_search_result, ai_web_search_result, comparison and
+    similar_parts, then a final "result" event carrying the same response as
+    /resolve (including the recommendation). Failures are sent as an "error" event.
+    """
+    data = request.get_json(silent=True) if request.method == 'POST' else request.args.to_dict()
+    data = data or {}
+    
+    if not (data.get('description') or '').strip():
+        return jsonify({'error': 'Description is required'}), 400
+    
+    try:
+        options = parse_resolve_options(data)
+        if not any([options['use_database'], options['use_manual_search'], options['use_web_search']]):
+            raise ValueError("At least one search method must be enabled")
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid parameter format',
+            'message': str(e)
+        }), 400
+    
+    logger.info(f"API: Streaming resolve for: {options['description']} for {options['make']} {options['model']} {options['year']}")
+    
+    app = current_app._get_current_object()
+    events = queue.Queue()
+    
+    def run_resolution():
+        with app.app_context():
+            try:
+                result = resolve_part_name(
+                    on_stage=lambda stage, payload: events.put(('stage', stage, payload)),
+                    **options
+                )
+                events.put(('result', None, result))
+            except Exception as e:
+                logger.error(f"Error in streaming resolve: {e}")
+                events.put(('error', None, str(e)))
+    
+    threading.Thread(target=run_resolution, name="resolve-stream", daemon=True).start()
+    
+    def generate():
+        sent_stages = set()
+        while True:
+            try:
+                kind, stage, payload = events.get(timeout=Config.RESOLVE_STREAM_KEEPALIVE)
+            except queue.Empty:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
             
-            messages.append(
-                f"Dual Search: Found '{ai_res['oem_part_number']}' "
-                f"(confidence: {ai_res['confidence']:.0%}, "
-                f"method: {selected_method}, "
-                f"SerpAPI: {serpapi_count} results, "
-                f"GPT: {'✓' if gpt_success else '✗'}, "
-                f"validated: {'✓' if validation.get('is_valid') else '✗'})"
-            )
-        elif use_web_search:
-            ai_res = result.get("ai_web_search_result", {})
-            serpapi_count = ai_res.get("serpapi_count", 0)
-            gpt_success = ai_res.get("gpt_web_success", False)
-            messages.append(f"Dual Search: No results found (SerpAPI: {serpapi_count} results, GPT: {'✓' if gpt_success else '✗'})")
-        
-        # Add comparison message if both manual and AI found results
-        if result.get("comparison"):
-            if result["comparison"]["part_numbers_match"]:
-                messages.append("✓ Manual and AI results match - high confidence in accuracy")
+            if kind == 'stage':
+                sent_stages.add(stage)
+                yield format_sse(stage, payload)
+            elif kind == 'result':
+                if not payload:
+                    yield format_sse('error', {'success': False, 'error': "Internal error: No result returned from resolver"})
+                    return
+                # Stages may not have been reported, e.g. when the request was coalesced with another
+                for missing_stage in RESOLVE_STAGES:
+                    if missing_stage not in sent_stages and payload.get(missing_stage) is not None:
+                        yield format_sse(missing_stage, payload[missing_stage])
+                yield format_sse('result', build_resolve_response(payload, options))
+                return
             else:
-                messages.append("⚠ Manual and AI returned different part numbers")
+                yield format_sse('error', {
+                    'success': False,
+                    'error': payload,
+                    'message': f"Failed to resolve part '{options['description']}'"
+                })
+                return
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@parts_bp.route('/resolve-batch', methods=['POST'])
+def resolve_part_batch():
+    """
+    Resolve many part descriptions in one request
+    
+    Request JSON:
+    - items: List of objects with description, make, model, year (max RESOLVE_BATCH_MAX_ITEMS).
+      An item may also override any of the search toggles accepted by /resolve.
+    - use_database, use_manual_search, use_web_search, save_results, bypass_cache, parallel:
+      Defaults applied to every item
+    - concurrency: Number of items resolved at once (capped at RESOLVE_BATCH_MAX_CONCURRENCY)
+    
+    Identical items (same normalized description/make/model/year, toggles, parallel
+    and deadline_ms) are resolved once and the result is reported for each of them.
+    
+    Streams newline-delimited JSON: one line per item as it finishes, with its
+    index, duplicate_of (index of the item that was actually resolved, if any) and
+    the same response /resolve would return, followed by a final summary line.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    
+    if len(items) > Config.RESOLVE_BATCH_MAX_ITEMS:
+        return jsonify({
+            'error': 'Too many items',
+            'message': f"A batch may contain at most {Config.RESOLVE_BATCH_MAX_ITEMS} items"
+        }), 400
+    
+    try:
+        concurrency = int(data.get('concurrency', Config.RESOLVE_BATCH_DEFAULT_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid parameter format', 'message': 'concurrency must be an integer'}), 400
+    concurrency = max(1, min(concurrency, Config.RESOLVE_BATCH_MAX_CONCURRENCY))
+    
+    toggle_names = ('use_database', 'use_manual_search', 'use_web_search', 'save_results', 'bypass_cache', 'parallel')
+    shared_toggles = {name: data[name] for name in toggle_names if name in data}
+    
+    # Validate every item and group identical ones under the first occurrence
+    invalid_items = []
+    unique_items = {}
+    duplicates = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not (item.get('description') or '').strip():
+            invalid_items.append((index, 'Description is required'))
+            continue
+        try:
+            options = parse_resolve_options(dict(shared_toggles, **item))
+            if not any([options['use_database'], options['use_manual_search'], options['use_web_search']]):
+                raise ValueError("At least one search method must be enabled")
+        except ValueError as e:
+            invalid_items.append((index, str(e)))
+            continue
         
-        # Add recommendation to summary
-        if result.get("recommended_result"):
-            rec = result["recommended_result"]
-            messages.insert(0, f"✅ RECOMMENDED: {rec['oem_part_number']} - {result.get('recommendation_reason', '')}")
-        elif result.get("similar_parts_triggered") and result.get("similar_parts"):
-            similar_count = len(result["similar_parts"])
-            messages.insert(0, f"🔍 SIMILAR PARTS: Found {similar_count} alternative parts for review - {result.get('recommendation_reason', '')}")
+        key = resolution_cache.make_cache_key(
+            options['description'], options['make'], options['model'], options['year'],
+            options['use_database'], options['use_manual_search'], options['use_web_search']
+        )
+        # Items only share a resolution if every option that changes how it runs matches
+        key += f":{options['save_results']}:{options['bypass_cache']}:{options['parallel']}:{options['deadline_ms']}"
+        if key in unique_items:
+            duplicates.setdefault(unique_items[key][0], []).append(index)
+        else:
+            unique_items[key] = (index, options)
+            duplicates[index] = []
+    
+    logger.info(f"API: Batch resolve of {len(items)} items ({len(unique_items)} unique, "
+                f"{len(invalid_items)} invalid) with concurrency {concurrency}")
+    
+    app = current_app._get_current_object()
+    
+    def resolve_item(options):
+        with app.app_context():
+            return resolve_part_name(**options)
+    
+    def generate():
+        started_at = time.time()
+        counts = {'succeeded': 0, 'failed': len(invalid_items)}
         
-        response["summary"] = " | ".join(messages) if messages else "No results found"
+        for index, error in invalid_items:
+            yield json.dumps({'index': index, 'success': False, 'error': error}) + "\n"
         
-        return jsonify(response)
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="resolve-batch")
+        try:
+            futures = {
+                executor.submit(resolve_item, options): (index, options)
+                for index, options in unique_items.values()
+            }
+            for future in as_completed(futures):
+                index, options = futures[future]
+                try:
+                    result = future.result()
+                    if not result:
+                        raise RuntimeError("Internal error: No result returned from resolver")
+                    item_response = build_resolve_response(result, options)
+                except Exception as e:
+                    logger.error(f"Error resolving batch item {index}: {e}")
+                    item_response = {
+                        'success': False,
+                        'error': str(e),
+                        'message': f"Failed to resolve part '{options['description']}'"
+                    }
+                
+                for item_index in [index] + duplicates[index]:
+                    counts['succeeded' if item_response.get('success') else 'failed'] += 1
+                    line = {'index': item_index, 'duplicate_of': index if item_index != index else None}
+                    line.update(item_response)
+                    yield json.dumps(line) + "\n"
+        finally:
+            # Stop queued work if the client goes away
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield json.dumps({
+            'summary': {
+                'total_items': len(items),
+                'unique_items': len(unique_items),
+                'duplicates': len(items) - len(invalid_items) - len(unique_items),
+                'invalid_items': len(invalid_items),
+                'succeeded': counts['succeeded'],
+                'failed': counts['failed'],
+                'concurrency': concurrency,
+                'elapsed_seconds': round(time.time() - started_at, 2)
+            }
+        }) + "\n"
     
-    except Exception as e:
-        logger.error(f"Error resolving part name: {e}")
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@parts_bp.route('/resolve/jobs/<job_id>', methods=['GET'])
+def get_resolve_job(job_id):
+    """Get the status of an asynchronous resolve job"""
+    job = resolve_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = job.to_dict()
+    response['success'] = True
+    response['result_url'] = f"/api/parts/resolve/jobs/{job.id}/result"
+    return jsonify(response)
+
+@parts_bp.route('/resolve/jobs/<job_id>/result', methods=['GET'])
+def get_resolve_job_result(job_id):
+    """
+    Get the result of an asynchronous resolve job
+    
+    Returns the same response as a synchronous /resolve call once the job has
+    completed, or 202 with the job status while it is still queued or running.
+    """
+    job = resolve_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job.status in ('queued', 'running'):
+        response = job.to_dict()
+        response['success'] = True
+        return jsonify(response), 202
+    
+    # Jobs that raised have no result; resolver error responses are returned like the synchronous call
+    result = job.get_result()
+    if not result:
         return jsonify({
             'success': False,
-            'error': str(e),
-            'message': f"Failed to resolve part '{data.get('description')}'"
+            'job_id': job.id,
+            'status': job.status,
+            'error': job.error,
+            'message': f"Failed to resolve part '{job.get_params().get('description')}'"
         }), 500
+    
+    response = build_resolve_response(result, job.get_params())
+    response['job_id'] = job.id
+    return jsonify(response)
 
 @parts_bp.route('', methods=['GET'])
 def get_parts():
@@ -238,7 +578,13 @@ def get_parts():
     query = Part.query
     
     if part_number:
-        query = query.filter(Part.oem_part_number.ilike(f'%{part_number}%'))
+        # Also match other spellings of the number and known alternates
+        normalized = normalize_part_number(part_number)
+        query = query.filter(or_(
+            Part.oem_part_number.ilike(f'%{part_number}%'),
+            Part.normalized_part_number == normalized,
+            Part.alternates.any(PartAlternate.normalized_part_number == normalized)
+        ))
     if manufacturer:
         query = query.filter(Part.manufacturer.ilike(f'%{manufacturer}%'))
     if description:
@@ -281,7 +627,7 @@ def create_part():
     
     try:
         # Check if part already exists
-        existing = Part.query.filter_by(oem_part_number=data['oem_part_number']).first()
+        existing = Part.query.filter_by(normalized_part_number=normalize_part_number(data['oem_part_number'])).first()
         if existing:
             return jsonify({
                 'error': 'Part with this OEM number already exists',
@@ -306,6 +652,7 @@ def create_part():
         
         db.session.add(part)
         db.session.commit()
+        part_trigram_index.add_part(part)
         
         return jsonify({
             'id': part.id,
@@ -361,6 +708,7 @@ def update_part(part_id):
             part.set_alternate_part_numbers(data['alternate_part_numbers'])
         
         db.session.commit()
+        part_trigram_index.add_part(part)
         
         return jsonify({
             'id': part.id,
@@ -380,6 +728,7 @@ def delete_part(part_id):
     try:
         db.session.delete(part)
         db.session.commit()
+        part_trigram_index.remove_part(part_id)
         
         return jsonify({
             'message': 'Part deleted successfully'
@@ -416,18 +765,38 @@ def find_similar_parts():
     try:
         logger.info(f"API: Finding similar parts for: {data.get('description')} for {data.get('make')} {data.get('model')}")
         
-        # Import the find_similar_parts function from the service layer
-        from services.part_resolver import find_similar_parts as find_similar_parts_service
+        # Answer from the recorded interchanges first - a single index probe
+        search_strategies_used = ['database_cross_reference']
+        similar_parts = []
+        cross_reference_number = data.get('failed_part_number')
+        if not cross_reference_number and part_crossref.looks_like_part_number(data['description']):
+            cross_reference_number = data['description']
+        if cross_reference_number:
+            similar_parts = part_crossref.find_interchangeable_parts(
+                cross_reference_number,
+                make=data.get('make'),
+                max_results=data.get('max_results', 10)
+            )
         
-        # Call the service to find similar parts
-        similar_parts = find_similar_parts_service(
-            description=data['description'],
-            make=data.get('make'),
-            model=data.get('model'),
-            year=data.get('year'),
-            failed_part_number=data.get('failed_part_number'),  # Optional: the part number that failed validation
-            max_results=data.get('max_results', 10)  # Default to 10 results
-        )
+        if not similar_parts:
+            # Import the find_similar_parts function from the service layer
+            from services.part_resolver import find_similar_parts as find_similar_parts_service
+            
+            # Call the service to find similar parts
+            similar_parts = find_similar_parts_service(
+                description=data['description'],
+                make=data.get('make'),
+                model=data.get('model'),
+                year=data.get('year'),
+                failed_part_number=data.get('failed_part_number'),  # Optional: the part number that failed validation
+                max_results=data.get('max_results', 10)  # Default to 10 results
+            )
+            search_strategies_used = [
+                'manufacturer_alternatives',
+                'compatible_parts',
+                'generic_equivalents',
+                'similar_equipment_parts'
+            ]
         
         # Check if we found any similar parts
         if not similar_parts or len(similar_parts) == 0:
@@ -455,12 +824,7 @@ def find_similar_parts():
             },
             'similar_parts': similar_parts,
             'total_found': len(similar_parts),
-            'search_strategies_used': [
-                'manufacturer_alternatives',
-                'compatible_parts',
-                'generic_equivalents',
-                'similar_equipment_parts'
-            ]
+            'search_strategies_used': search_strategies_used
         }
         
         # Add a summary message
@@ -3,6 +3,7 @@ from models import db, Supplier
 from services.dual_supplier_search import find_supplier_with_dual_search
 from services.supplier_finder import find_suppliers
 from services.supplier_finder_v2 import search_suppliers_v2
+from services import deadline
 import logging
 
 # Set up logging
@@ -11,9 +12,28 @@ logger = logging.getLogger(__name__)
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
+# Descriptions of the ranking paths search_suppliers_v2 reports in ranking_method
+V2_RANKING_METHODS = {
+    'deterministic': 'Rule-based ranking v2 (PartsTown priority)',
+    'ai': 'AI-based intelligent ranking v2 (PartsTown priority, close call)',
+    'deterministic_fallback': 'Rule-based ranking v2 (AI tie-break unavailable)'
+}
+
+def with_deadline_report(payload, request_deadline):
+    """Add deadline_ms and the stages the deadline dropped to a search response"""
+    if request_deadline is not None:
+        payload['deadline_ms'] = request_deadline.budget_ms
+        payload['dropped_stages'] = list(request_deadline.dropped_stages)
+    return payload
+
 @suppliers_bp.route('/search', methods=['GET', 'POST'])
 def search_suppliers():
-    """Search for suppliers offering a specific part"""
+    """
+    Search for suppliers offering a specific part
+    
+    Optional deadline_ms sets a time budget in milliseconds; stages that cannot
+    finish in time are skipped or cut short and listed in dropped_stages.
+    """
     if request.method == 'POST':
         data = request.json
         logger.info(f"POST data received: {data}")
@@ -25,6 +45,7 @@ def search_suppliers():
         use_dual = data.get('use_dual', False)  # Option for dual search
         location = data.get('location')
         bypass_cache = data.get('bypass_cache', False)  # Cache bypass option
+        deadline_ms = data.get('deadline_ms')
         logger.info(f"Parsed use_v2: {use_v2}, use_dual: {use_dual}, bypass_cache: {bypass_cache} (type: {type(use_v2)})")
     else:
         part_number = request.args.get('part_number')
@@ -35,10 +56,18 @@ def search_suppliers():
         use_dual = request.args.get('use_dual', 'false').lower() == 'true'
         location = request.args.get('location')
         bypass_cache = request.args.get('bypass_cache', 'false').lower() == 'true'
+        deadline_ms = request.args.get('deadline_ms')
     
     if not part_number:
         return jsonify({'error': 'Part number is required'}), 400
     
+    try:
+        request_deadline = deadline.from_ms(deadline_ms)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # External calls made by the search below share this deadline
+    deadline_token = deadline.activate(request_deadline)
     try:
         # Force dual search if cache bypass is requested (only dual search supports cache bypass)
         if bypass_cache:
@@ -74,7 +103,7 @@ def search_suppliers():
                     'ai_ranking': True
                 })
             
-            return jsonify({
+            return jsonify(with_deadline_report({
                 'part_number': part_number,
                 'oem_only': oem_only,
                 'count': len(suppliers),
@@ -82,7 +111,7 @@ def search_suppliers():
                 'ai_ranked': True,
                 'ranking_method': 'Dual AI-based supplier search with arbitrator',
                 'version': 'dual'
-            })
+            }, request_deadline))
         elif use_v2:
             # Use the new v2 supplier finder with PartsTown boosting
             result = search_suppliers_v2(
@@ -103,18 +132,20 @@ def search_suppliers():
                     'score': supplier.get('score', 0),
                     'has_part_number': supplier.get('has_part_number', False),
                     'is_product_page': supplier.get('is_product_page', False),
-                    'ai_ranking': True
+                    'ai_ranking': supplier.get('ai_ranking', False)
                 })
             
-            return jsonify({
+            ranked_by = result.get('ranking_method', 'deterministic')
+            return jsonify(with_deadline_report({
                 'part_number': part_number,
                 'oem_only': oem_only,
                 'count': len(suppliers),
                 'suppliers': suppliers,
-                'ai_ranked': True,
-                'ranking_method': 'AI-based intelligent ranking v2 (PartsTown priority)',
+                'ai_ranked': ranked_by == 'ai',
+                'ranking_method': V2_RANKING_METHODS.get(ranked_by, ranked_by),
+                'ranked_by': ranked_by,
                 'version': 'v2'
-            })
+            }, request_deadline))
         else:
             # Use original supplier finder
             suppliers = find_suppliers(
@@ -127,7 +158,7 @@ def search_suppliers():
             # Check if AI ranking was used
             ai_ranked = any(s.get('ai_ranking') for s in suppliers) if suppliers else False
             
-            return jsonify({
+            return jsonify(with_deadline_report({
                 'part_number': part_number,
                 'oem_only': oem_only,
                 'count': len(suppliers),
@@ -135,11 +166,16 @@ def search_suppliers():
                 'ai_ranked': ai_ranked,
                 'ranking_method': 'AI-based intelligent ranking' if ai_ranked else 'Domain-based ranking',
                 'version': 'v1'
-            })
+            }, request_deadline))
     
+    except deadline.DeadlineExceeded as e:
+        logger.warning(f"Supplier search for {part_number} ran out of time: {e}")
+        return jsonify(with_deadline_report({'error': str(e)}, request_deadline)), 504
     except Exception as e:
         logger.error(f"Error searching suppliers: {e}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        deadline.deactivate(deadline_token)
 
 @suppliers_bp.route('', methods=['GET'])
 def get_suppliers():
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify, make_response
-from models import db, Manual, ErrorCode, PartReference, Part, Supplier, BillingProfile, Purchase
+from models import db, Manual, ErrorCode, PartReference, Part, PartAlternate, Supplier, BillingProfile, Purchase
 from sqlalchemy import text
 import logging
 import os
@@ -96,7 +96,8 @@ def clear_database():
         Supplier.query.delete()
         logger.info("Suppliers deleted")
         
-        # Delete parts
+        # Delete parts and their indexed alternate part numbers
+        PartAlternate.query.delete()
         Part.query.delete()
         logger.info("Parts deleted")
         
@@ -111,6 +112,10 @@ def clear_database():
         # Commit the changes
         db.session.commit()
         
+        # Rebuild the in-memory fuzzy index from the now empty parts table
+        from services import part_trigram_index
+        part_trigram_index.build_index()
+        
         # Also clear any cached files in temporary directories
         clear_cache()
         
@@ -166,6 +171,65 @@ def clear_cache_endpoint():
             'error': f"Failed to clear cache: {str(e)}"
         }), 500
         
+@system_bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """
+    Report hit/miss counters and sizes of the external API response caches,
+    and how many duplicate in-flight requests were coalesced
+    """
+    from services import serpapi_client, llm_gateway, single_flight, resolution_cache, resolution_vector_index, validation_cache, manual_proxy
+    
+    try:
+        response = jsonify({
+            'success': True,
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'serpapi': serpapi_client.get_cache_stats(),
+            'llm': llm_gateway.get_cache_stats(),
+            'resolve': resolution_cache.get_cache_stats(),
+            'similar_resolutions': resolution_vector_index.get_stats(),
+            'validation': validation_cache.get_cache_stats(),
+            'manual_pdfs': manual_proxy.get_cache_stats(),
+            'coalescing': single_flight.get_stats()
+        })
+        return add_no_cache_headers(response)
+    
+    except Exception as e:
+        logger.error(f"Error reading cache stats: {e}")
+        return jsonify({
+            'success': False,
+            'error': f"Failed to read cache stats: {str(e)}"
+        }), 500
+
+@system_bp.route('/usage', methods=['GET'])
+def usage():
+    """
+    Report SerpAPI and OpenAI usage per day, endpoint and model from the usage ledger,
+    the current state of the rate limiters, and prompt sizes and response caps per LLM call type
+    
+    Query parameters:
+        days: Number of days to include, counting today (default 7)
+    """
+    from flask import request
+    from services import usage_ledger, rate_limiter, prompt_budget
+    
+    try:
+        days = request.args.get('days', 7, type=int)
+        response = jsonify({
+            'success': True,
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'usage': usage_ledger.get_usage(days),
+            'rate_limits': rate_limiter.get_stats(),
+            'prompt_budget': prompt_budget.get_stats()
+        })
+        return add_no_cache_headers(response)
+    
+    except Exception as e:
+        logger.error(f"Error reading API usage: {e}")
+        return jsonify({
+            'success': False,
+            'error': f"Failed to read API usage: {str(e)}"
+        }), 500
+
 def clear_cache():
     """Helper function to clear various caches"""
     from flask import current_app
@@ -199,6 +263,48 @@ def clear_cache():
     except Exception as e:
         logger.error(f"Error clearing temporary files: {e}")
     
+    # 3. Clear cached SerpAPI responses
+    try:
+        from services import serpapi_client
+        serpapi_client.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing SerpAPI cache: {e}")
+    
+    # 4. Clear cached LLM completions
+    try:
+        from services import llm_gateway
+        llm_gateway.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing LLM completion cache: {e}")
+    
+    # 5. Clear cached resolve responses
+    try:
+        from services import resolution_cache
+        resolution_cache.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing resolve cache: {e}")
+    
+    # 6. Clear the index of past resolutions reused for similar queries
+    try:
+        from services import resolution_vector_index
+        resolution_vector_index.clear_index()
+    except Exception as e:
+        logger.error(f"Error clearing resolution vector index: {e}")
+    
+    # 7. Clear cached part number validations
+    try:
+        from services import validation_cache
+        validation_cache.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing validation cache: {e}")
+    
+    # 8. Clear cached manual PDFs and proxy ids
+    try:
+        from services import manual_proxy
+        manual_proxy.clear_cache()
+    except Exception as e:
+        logger.error(f"Error clearing manual cache: {e}")
+    
     # Log completion
     logger.info("Cache clearing completed")
 
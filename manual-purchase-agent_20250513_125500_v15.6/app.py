@@ -13,6 +13,7 @@ from api.generic_parts import generic_parts_bp
 from api.service_providers import service_providers_bp
 from api.images import images_bp
 from web import web_bp
+from services import resolve_jobs, part_search_index, part_crossref, part_trigram_index, app_context
 import os
 import logging
 
@@ -39,6 +40,15 @@ def test_db_connection(app):
             # Create tables if they don't exist
             db.create_all()
             logger.info("Database tables verified/created")
+            
+            # Normalized part numbers and alternates used by cross-reference lookups
+            part_crossref.ensure_schema()
+            
+            # Full-text index used by database part lookups
+            part_search_index.ensure_index()
+            
+            # In-memory trigram index used for fuzzy description matches
+            part_trigram_index.build_index()
             return True
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
@@ -60,6 +70,9 @@ def create_app():
     # Initialize database
     db.init_app(app)
     
+    # Share this app with background threads and service functions
+    app_context.register_app(app)
+    
     # Register API blueprints
     app.register_blueprint(manuals_bp, url_prefix='/api/manuals')
     app.register_blueprint(parts_bp, url_prefix='/api/parts')
@@ -141,6 +154,9 @@ def create_app():
     if not test_db_connection(app):
         logger.error("Failed to establish database connection - app may not function properly")
     
+    # Start the background workers for asynchronous resolve jobs
+    resolve_jobs.start_workers(app)
+    
     return app
 
 if __name__ == '__main__':
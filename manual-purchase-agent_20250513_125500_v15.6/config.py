@@ -35,4 +35,202 @@ class Config:
     
     # File storage settings
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
-    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
+    
+    # Local cache directory for SerpAPI responses and other shared caches
+    CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(_basedir, 'instance', 'cache'))
+    
+    # SerpAPI client settings
+    SERPAPI_POOL_SIZE = int(os.environ.get('SERPAPI_POOL_SIZE', 20))
+    SERPAPI_CACHE_MAX_ENTRIES = int(os.environ.get('SERPAPI_CACHE_MAX_ENTRIES', 50000))
+    SERPAPI_CACHE_DEFAULT_TTL = int(os.environ.get('SERPAPI_CACHE_DEFAULT_TTL', 24 * 3600))
+    # Cache lifetime (seconds) per search family; override with SERPAPI_CACHE_TTL_<FAMILY>
+    SERPAPI_CACHE_TTLS = {
+        'part_search': 24 * 3600,
+        'manual_search': 7 * 24 * 3600,
+        'part_validation': 7 * 24 * 3600,
+        'similar_parts': 24 * 3600,
+        'supplier_search': 6 * 3600,
+        'service_provider_search': 7 * 24 * 3600,
+        'image_search': 30 * 24 * 3600,
+        'generic_parts': 24 * 3600,
+    }
+    
+    # LLM gateway settings
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 20))
+    LLM_REQUEST_TIMEOUT = float(os.environ.get('LLM_REQUEST_TIMEOUT', 120))
+    LLM_DEFAULT_CONCURRENCY = int(os.environ.get('LLM_DEFAULT_CONCURRENCY', 4))
+    # Maximum in-flight requests per model
+    LLM_CONCURRENCY_LIMITS = {
+        'gpt-4.1-mini-2025-04-14': int(os.environ.get('LLM_CONCURRENCY_GPT41_MINI', 8)),
+        'gpt-4o': int(os.environ.get('LLM_CONCURRENCY_GPT4O', 4)),
+        'gpt-4': int(os.environ.get('LLM_CONCURRENCY_GPT4', 2)),
+    }
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 20000))
+    # Completions above this temperature are not treated as deterministic and never cached
+    LLM_CACHE_MAX_TEMPERATURE = float(os.environ.get('LLM_CACHE_MAX_TEMPERATURE', 0.2))
+    
+    # Part resolution settings
+    # Run the manual and web legs of resolve_part_name concurrently unless the request says otherwise
+    RESOLVE_PARALLEL_DEFAULT = os.environ.get('RESOLVE_PARALLEL_DEFAULT', 'False').lower() == 'true'
+    RESOLVE_PARALLEL_WORKERS = int(os.environ.get('RESOLVE_PARALLEL_WORKERS', 4))
+    
+    # Short-circuit of lower-priority resolve legs (database, then manual, then web): once a leg's
+    # result has this confidence, passed validation with this score and (optionally) has
+    # alternates, the legs after it are skipped, or cancelled if they are already running
+    RESOLVE_SHORT_CIRCUIT_ENABLED = os.environ.get('RESOLVE_SHORT_CIRCUIT_ENABLED', 'True').lower() == 'true'
+    RESOLVE_SHORT_CIRCUIT_MIN_CONFIDENCE = float(os.environ.get('RESOLVE_SHORT_CIRCUIT_MIN_CONFIDENCE', 0.85))
+    RESOLVE_SHORT_CIRCUIT_MIN_VALIDATION = float(os.environ.get('RESOLVE_SHORT_CIRCUIT_MIN_VALIDATION', 0.8))
+    RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES = os.environ.get('RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES', 'True').lower() == 'true'
+    
+    # Dual search settings: SerpAPI and GPT web search legs run concurrently with these timeouts (seconds),
+    # counted from when a leg starts running. The pool is sized for a full resolve batch (16 items with
+    # two dual searches of two legs each); a leg still queued after DUAL_SEARCH_QUEUE_TIMEOUT fails.
+    DUAL_SEARCH_WORKERS = int(os.environ.get('DUAL_SEARCH_WORKERS', 64))
+    DUAL_SEARCH_SERPAPI_TIMEOUT = float(os.environ.get('DUAL_SEARCH_SERPAPI_TIMEOUT', 35))
+    DUAL_SEARCH_GPT_TIMEOUT = float(os.environ.get('DUAL_SEARCH_GPT_TIMEOUT', 90))
+    DUAL_SEARCH_QUEUE_TIMEOUT = float(os.environ.get('DUAL_SEARCH_QUEUE_TIMEOUT', 60))
+    
+    # Resolve response cache: full resolve_part_name responses, with a short lifetime for "no part found"
+    RESOLVE_CACHE_TTL = int(os.environ.get('RESOLVE_CACHE_TTL', 7 * 24 * 3600))
+    RESOLVE_CACHE_NEGATIVE_TTL = int(os.environ.get('RESOLVE_CACHE_NEGATIVE_TTL', 3600))
+    # Responses where a leg or validation failed or timed out (0 = don't cache them)
+    RESOLVE_CACHE_DEGRADED_TTL = int(os.environ.get('RESOLVE_CACHE_DEGRADED_TTL', 600))
+    RESOLVE_CACHE_MAX_ENTRIES = int(os.environ.get('RESOLVE_CACHE_MAX_ENTRIES', 20000))
+    
+    # Asynchronous resolve jobs (stored in the app database, run by background workers)
+    RESOLVE_JOB_WORKERS = int(os.environ.get('RESOLVE_JOB_WORKERS', 4))
+    RESOLVE_JOB_POLL_INTERVAL = float(os.environ.get('RESOLVE_JOB_POLL_INTERVAL', 5))
+    # Running jobs older than this are treated as abandoned by a dead worker and requeued
+    RESOLVE_JOB_STALE_SECONDS = int(os.environ.get('RESOLVE_JOB_STALE_SECONDS', 900))
+    RESOLVE_JOB_MAX_ATTEMPTS = int(os.environ.get('RESOLVE_JOB_MAX_ATTEMPTS', 3))
+    RESOLVE_JOB_CALLBACK_TIMEOUT = float(os.environ.get('RESOLVE_JOB_CALLBACK_TIMEOUT', 10))
+    # Comma-separated hosts callback URLs may point at (a leading dot also allows subdomains);
+    # empty allows any host. Hosts resolving to private, loopback or link-local addresses are
+    # always rejected unless RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE is set (local development).
+    RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get('RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS', '').split(',') if host.strip()]
+    RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE = os.environ.get('RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE', 'False').lower() == 'true'
+    
+    # Seconds between keepalive comments on idle /api/parts/resolve/stream connections
+    RESOLVE_STREAM_KEEPALIVE = float(os.environ.get('RESOLVE_STREAM_KEEPALIVE', 15))
+    
+    # Batch resolution (/api/parts/resolve-batch)
+    RESOLVE_BATCH_MAX_ITEMS = int(os.environ.get('RESOLVE_BATCH_MAX_ITEMS', 2000))
+    RESOLVE_BATCH_DEFAULT_CONCURRENCY = int(os.environ.get('RESOLVE_BATCH_DEFAULT_CONCURRENCY', 8))
+    RESOLVE_BATCH_MAX_CONCURRENCY = int(os.environ.get('RESOLVE_BATCH_MAX_CONCURRENCY', 16))
+    
+    # Part number validation outcomes, cached per normalized part number, make and model
+    VALIDATION_CACHE_TTL = int(os.environ.get('VALIDATION_CACHE_TTL', 180 * 24 * 3600))
+    VALIDATION_CACHE_MAX_ENTRIES = int(os.environ.get('VALIDATION_CACHE_MAX_ENTRIES', 50000))
+    # Cached outcomes older than this are still used but re-validated in the background
+    VALIDATION_REVALIDATE_AFTER = int(os.environ.get('VALIDATION_REVALIDATE_AFTER', 30 * 24 * 3600))
+    VALIDATION_REVALIDATE_QUEUE_SIZE = int(os.environ.get('VALIDATION_REVALIDATE_QUEUE_SIZE', 1000))
+    
+    # Minimum trigram similarity (0-1) for a fuzzy database match on the part description
+    PART_FUZZY_MATCH_THRESHOLD = float(os.environ.get('PART_FUZZY_MATCH_THRESHOLD', 0.7))
+    
+    # Hashing-vector index of past resolutions for differently worded queries (same make and model);
+    # matches above the threshold are reused only if their words agree (at least RESOLVE_VECTOR_MIN_TOKEN_OVERLAP
+    # Jaccard overlap, no conflicting nouns or qualifiers) and the year is the same
+    RESOLVE_VECTOR_INDEX_ENABLED = os.environ.get('RESOLVE_VECTOR_INDEX_ENABLED', 'True').lower() == 'true'
+    RESOLVE_VECTOR_THRESHOLD = float(os.environ.get('RESOLVE_VECTOR_THRESHOLD', 0.7))
+    RESOLVE_VECTOR_MIN_TOKEN_OVERLAP = float(os.environ.get('RESOLVE_VECTOR_MIN_TOKEN_OVERLAP', 0.6))
+    RESOLVE_VECTOR_DIM = int(os.environ.get('RESOLVE_VECTOR_DIM', 256))
+    RESOLVE_VECTOR_SNAPSHOT_EVERY = int(os.environ.get('RESOLVE_VECTOR_SNAPSHOT_EVERY', 200))
+    
+    # Token-bucket rate limits (requests per minute); callers queue for a slot instead of failing
+    RATE_LIMIT_SERPAPI_PER_MINUTE = float(os.environ.get('RATE_LIMIT_SERPAPI_PER_MINUTE', 100))
+    RATE_LIMIT_OPENAI_PER_MINUTE = float(os.environ.get('RATE_LIMIT_OPENAI_PER_MINUTE', 500))
+    # Per-model overrides of RATE_LIMIT_OPENAI_PER_MINUTE
+    RATE_LIMIT_OPENAI_MODEL_LIMITS = {
+        'gpt-4o': float(os.environ.get('RATE_LIMIT_GPT4O_PER_MINUTE', 500)),
+        'gpt-4': float(os.environ.get('RATE_LIMIT_GPT4_PER_MINUTE', 200)),
+    }
+    # Seconds of requests that may be sent back to back after an idle period
+    RATE_LIMIT_BURST_SECONDS = float(os.environ.get('RATE_LIMIT_BURST_SECONDS', 10))
+    RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', 60))
+    # Retries of a request rejected with 429 (after waiting for Retry-After)
+    RATE_LIMIT_MAX_RETRIES = int(os.environ.get('RATE_LIMIT_MAX_RETRIES', 3))
+    
+    # Usage ledger: calls, tokens and estimated cost per endpoint and day (instance/cache/usage_ledger.db)
+    USAGE_LEDGER_ENABLED = os.environ.get('USAGE_LEDGER_ENABLED', 'True').lower() == 'true'
+    SERPAPI_COST_PER_SEARCH = float(os.environ.get('SERPAPI_COST_PER_SEARCH', 0.015))
+    # USD per million (input, output) tokens, matched by model name prefix
+    LLM_PRICING = {
+        'gpt-4.1-nano': (0.10, 0.40),
+        'gpt-4.1-mini': (0.40, 1.60),
+        'gpt-4.1': (2.00, 8.00),
+        'gpt-4o-mini': (0.15, 0.60),
+        'gpt-4o': (2.50, 10.00),
+        'gpt-4': (30.00, 60.00),
+    }
+    
+    # Supplier search v2: the AI ranking only runs when the rule-based scores of the top two
+    # candidates are closer than this many points
+    SUPPLIER_RANK_CLOSE_MARGIN = int(os.environ.get('SUPPLIER_RANK_CLOSE_MARGIN', 10))
+    
+    # Request deadlines (deadline_ms): minimum seconds that must be left to start an optional stage
+    DEADLINE_STAGE_MIN_SECONDS = {
+        'database_validation': float(os.environ.get('DEADLINE_MIN_DATABASE_VALIDATION', 3)),
+        'manual_search_result': float(os.environ.get('DEADLINE_MIN_MANUAL_SEARCH', 10)),
+        'ai_web_search_result': float(os.environ.get('DEADLINE_MIN_WEB_SEARCH', 10)),
+        'similar_parts': float(os.environ.get('DEADLINE_MIN_SIMILAR_PARTS', 5)),
+        'supplier_ai_ranking': float(os.environ.get('DEADLINE_MIN_SUPPLIER_RANKING', 3)),
+        'supplier_arbitrator': float(os.environ.get('DEADLINE_MIN_SUPPLIER_ARBITRATOR', 3)),
+    }
+    
+    # Prompt budgets (tokens counted with tiktoken's LLM_TOKENIZER_ENCODING)
+    LLM_TOKENIZER_ENCODING = os.environ.get('LLM_TOKENIZER_ENCODING', 'cl100k_base')
+    # Response token cap per LLM call type; calls that pass max_tokens explicitly keep their own.
+    # Responses cut off at the cap are not cached, so caps leave room for the longest expected answer
+    LLM_DEFAULT_MAX_TOKENS = int(os.environ.get('LLM_DEFAULT_MAX_TOKENS', 1500))
+    LLM_MAX_TOKENS = {
+        'call_gpt_for_analysis': 4096,
+        'find_part_with_dual_search': 800,
+        'find_part_in_manuals': 800,
+        'find_similar_parts': 2000,
+        'validate_part_with_serpapi': 500,
+        'get_gpt_web_search_result': 800,
+        'get_gpt_manual_web_search_result': 800,
+        'get_gpt_supplier_web_search_result': 800,
+        'get_gpt_service_provider_web_search_result': 800,
+        'get_industry_search_terms': 300,
+        'ai_arbitrator': 2000,
+        'ai_manual_arbitrator': 2000,
+        'ai_supplier_arbitrator': 2000,
+        'ai_service_provider_arbitrator': 2000,
+        'ai_manual_arbitrator_multiple': 4000,
+        'ai_service_provider_arbitrator_multiple': 4000,
+        'ai_select_best_equipment_image': 400,
+        'ai_select_best_part_image': 400,
+        'generic_parts_analysis': 4000,
+        'rank_with_ai': 300,
+    }
+    # Tokens allowed for the block of search results pasted into a prompt, per LLM call type
+    LLM_DEFAULT_PROMPT_BUDGET = int(os.environ.get('LLM_DEFAULT_PROMPT_BUDGET', 1500))
+    LLM_PROMPT_BUDGETS = {
+        'find_part_with_dual_search': 1000,
+        'find_part_in_manuals': 1500,
+        'find_similar_parts': 2000,
+        'validate_part_with_serpapi': 1200,
+        'ai_arbitrator': 1500,
+        'ai_manual_arbitrator': 1500,
+        'ai_supplier_arbitrator': 1500,
+        'ai_service_provider_arbitrator': 1500,
+        'ai_manual_arbitrator_multiple': 2500,
+        'ai_service_provider_arbitrator_multiple': 2500,
+        'generic_parts_analysis': 4000,
+    }
+    # Search result snippets are cut to this many tokens before they go into a prompt
+    LLM_SNIPPET_MAX_TOKENS = int(os.environ.get('LLM_SNIPPET_MAX_TOKENS', 80))
+    
+    # Manual PDF proxy (/api/manuals/proxy): proxy ids shared by all workers, and a
+    # size-bounded LRU cache of fetched PDFs under CACHE_DIR/manual_pdfs
+    MANUAL_PROXY_ID_TTL = int(os.environ.get('MANUAL_PROXY_ID_TTL', 7 * 24 * 3600))
+    MANUAL_PROXY_MAX_IDS = int(os.environ.get('MANUAL_PROXY_MAX_IDS', 100000))
+    MANUAL_PROXY_TIMEOUT = float(os.environ.get('MANUAL_PROXY_TIMEOUT', 30))
+    MANUAL_PROXY_POOL_SIZE = int(os.environ.get('MANUAL_PROXY_POOL_SIZE', 16))
+    MANUAL_PDF_CACHE_MAX_BYTES = int(os.environ.get('MANUAL_PDF_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+    # Larger PDFs are streamed but not cached
+    MANUAL_PDF_MAX_FILE_BYTES = int(os.environ.get('MANUAL_PDF_MAX_FILE_BYTES', 200 * 1024 * 1024))
@@ -4,7 +4,8 @@ db = SQLAlchemy()
 
 # Import models
 from models.manual import Manual, ErrorCode, PartReference
-from models.part import Part
+from models.part import Part, PartAlternate
 from models.supplier import Supplier
 from models.profile import BillingProfile
-from models.purchase import Purchase
\ No newline at end of file
+from models.purchase import Purchase
+from models.job import ResolveJob
\ No newline at end of file
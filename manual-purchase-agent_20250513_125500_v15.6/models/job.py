@@ -0,0 +1,68 @@
+from models import db
+from datetime import datetime
+import json
+
+class ResolveJob(db.Model):
+    """Model for storing asynchronous part resolution jobs"""
+
+    __tablename__ = "resolve_jobs"
+
+    # Job ids are opaque uuid4 hex strings handed out to API clients
+    id = db.Column(db.String(32), primary_key=True)
+
+    # queued -> running -> completed / failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+
+    # Store as JSON strings
+    params = db.Column(db.Text, nullable=False)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+
+    # Optional URL notified with the finished job
+    callback_url = db.Column(db.String(500))
+    callback_status = db.Column(db.String(100))
+
+    attempts = db.Column(db.Integer, default=0)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+
+    def get_params(self):
+        """Parse resolve parameters JSON"""
+        if self.params:
+            return json.loads(self.params)
+        return {}
+
+    def set_params(self, params_dict):
+        """Set resolve parameters as JSON string"""
+        self.params = json.dumps(params_dict)
+
+    def get_result(self):
+        """Parse resolve result JSON"""
+        if self.result:
+            return json.loads(self.result)
+        return None
+
+    def set_result(self, result_dict):
+        """Set resolve result as JSON string"""
+        self.result = json.dumps(result_dict)
+
+    def to_dict(self):
+        """Status view of the job, without the result payload"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "params": self.get_params(),
+            "error": self.error,
+            "attempts": self.attempts,
+            "callback_url": self.callback_url,
+            "callback_status": self.callback_status,
+            "created_at": self.created_at.isoformat() + "Z" if self.created_at else None,
+            "started_at": self.started_at.isoformat() + "Z" if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() + "Z" if self.completed_at else None
+        }
+
+    def __repr__(self):
+        return f"<ResolveJob {self.id}: {self.status}>"
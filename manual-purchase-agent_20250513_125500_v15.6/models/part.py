@@ -1,6 +1,14 @@
 from models import db
+from sqlalchemy.orm import validates
 from datetime import datetime
 import json
+import re
+
+def normalize_part_number(part_number):
+    """Normalize a part number for lookups: uppercase letters and digits only"""
+    if not part_number:
+        return None
+    return re.sub(r"[^A-Z0-9]", "", str(part_number).upper()) or None
 
 class Part(db.Model):
     """Model for storing part information"""
@@ -9,6 +17,8 @@ class Part(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     oem_part_number = db.Column(db.String(100), nullable=False, index=True)
+    # Maintained from oem_part_number, see normalize_part_number
+    normalized_part_number = db.Column(db.String(100), index=True)
     manufacturer = db.Column(db.String(100), nullable=False)
     
     generic_description = db.Column(db.Text, nullable=False)
@@ -22,6 +32,31 @@ class Part(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Indexed copy of alternate_part_numbers, maintained when it is set
+    alternates = db.relationship("PartAlternate", backref="part", cascade="all, delete-orphan", lazy=True)
+    
+    @validates("oem_part_number")
+    def _validate_oem_part_number(self, key, value):
+        self.normalized_part_number = normalize_part_number(value)
+        return value
+    
+    @validates("alternate_part_numbers")
+    def _validate_alternate_part_numbers(self, key, value):
+        self.sync_alternates(json.loads(value) if value else [])
+        return value
+    
+    def sync_alternates(self, part_numbers):
+        """Rebuild the alternates rows from a list of part numbers"""
+        alternates = []
+        seen = set()
+        for part_number in part_numbers or []:
+            normalized = normalize_part_number(part_number)
+            if not normalized or normalized in seen or normalized == self.normalized_part_number:
+                continue
+            seen.add(normalized)
+            alternates.append(PartAlternate(part_number=str(part_number)[:100], normalized_part_number=normalized))
+        self.alternates = alternates
+    
     def get_specifications(self):
         """Parse specifications JSON"""
         if self.specifications:
@@ -43,4 +78,17 @@ class Part(db.Model):
         self.alternate_part_numbers = json.dumps(part_numbers)
     
     def __repr__(self):
-        return f"<Part {self.id}: {self.oem_part_number}>"
\ No newline at end of file
+        return f"<Part {self.id}: {self.oem_part_number}>"
+
+class PartAlternate(db.Model):
+    """Model for the alternate part numbers of a part, indexed for cross-reference lookups"""
+    
+    __tablename__ = "part_alternates"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("parts.id"), nullable=False, index=True)
+    part_number = db.Column(db.String(100), nullable=False)
+    normalized_part_number = db.Column(db.String(100), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<PartAlternate {self.part_number} of part {self.part_id}>"
\ No newline at end of file
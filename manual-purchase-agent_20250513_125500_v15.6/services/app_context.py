@@ -0,0 +1,73 @@
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from flask import Flask, has_app_context
+from models import db
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_app = None
+_app_lock = threading.Lock()
+
+def register_app(app):
+    """
+    Make an application the process-wide app used by code running outside a request
+
+    create_app registers the app it builds. The first registration wins, so
+    background threads and service functions all share one app, one engine and
+    one connection pool.
+    """
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = app
+
+def _create_base_app():
+    """
+    Build a minimal app for processes that never call create_app (scripts, workers)
+
+    It only loads the configuration and sets up the database - no blueprints
+    and no background workers.
+    """
+    from services import part_crossref, part_search_index
+
+    app = Flask("app")
+    app.config.from_object("config.Config")
+    os.makedirs(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instance"), exist_ok=True)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        part_crossref.ensure_schema()
+        part_search_index.ensure_index()
+
+    logger.info("Created process-wide app for database access outside requests")
+    return app
+
+def get_app():
+    """Get the process-wide app, creating a minimal one on first use if none was registered"""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = _create_base_app()
+    return _app
+
+@contextmanager
+def app_context():
+    """
+    Run a block inside an app context
+
+    Reuses the current context if there is one. Otherwise a context of the
+    process-wide app is pushed for the block; popping it removes the block's
+    database session and returns its connection to the pool.
+    """
+    if has_app_context():
+        yield
+        return
+
+    with get_app().app_context():
+        yield
@@ -0,0 +1,151 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_deadline", default=None)
+_cancel_event = contextvars.ContextVar("stage_cancel_event", default=None)
+
+class DeadlineExceeded(Exception):
+    """Raised when an external call is attempted after the request deadline has passed"""
+
+class StageCancelled(DeadlineExceeded):
+    """Raised when an external call is attempted by a stage whose result is no longer needed"""
+
+class Deadline:
+    """
+    Time budget of one request, shared by every stage and external call it makes
+
+    Stages that are skipped or cut short are recorded in dropped_stages so the
+    response can report them.
+    """
+
+    def __init__(self, budget_ms):
+        self.budget_ms = budget_ms
+        self.expires_at = time.monotonic() + budget_ms / 1000.0
+        self.dropped_stages = []
+
+    def remaining(self):
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def drop(self, stage, reason):
+        """Record a stage that was skipped or cut short"""
+        self.dropped_stages.append({
+            "stage": stage,
+            "reason": reason,
+            "remaining_ms": int(self.remaining() * 1000)
+        })
+        logger.warning(f"Dropped stage {stage} ({reason}), {self.remaining():.2f}s of the deadline left")
+
+def from_ms(deadline_ms):
+    """
+    Build a deadline from a request's deadline_ms
+
+    Returns:
+        Deadline: The deadline, or None if deadline_ms is not set
+
+    Raises:
+        ValueError: If deadline_ms is not a positive number
+    """
+    if deadline_ms is None or deadline_ms == "":
+        return None
+    try:
+        budget_ms = float(deadline_ms)
+    except (TypeError, ValueError):
+        raise ValueError("deadline_ms must be a number of milliseconds")
+    if budget_ms <= 0:
+        raise ValueError("deadline_ms must be positive")
+    return Deadline(budget_ms)
+
+def current():
+    """The deadline of the running request, or None"""
+    return _current.get()
+
+def activate(deadline):
+    """Make a deadline current; returns the token for deactivate()"""
+    return _current.set(deadline)
+
+def deactivate(token):
+    _current.reset(token)
+
+@contextmanager
+def scope(deadline):
+    """Run a block with a deadline as the current one (None means no deadline)"""
+    token = activate(deadline)
+    try:
+        yield deadline
+    finally:
+        deactivate(token)
+
+def remaining(default=None):
+    """Seconds left on the current deadline, or default if there is none"""
+    deadline = current()
+    return default if deadline is None else deadline.remaining()
+
+def clamp_timeout(timeout):
+    """
+    Shorten a call's timeout to the time left on the current deadline
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+        StageCancelled: If the calling stage was cancelled (see submit_cancellable)
+    """
+    cancel_event = _cancel_event.get()
+    if cancel_event is not None and cancel_event.is_set():
+        raise StageCancelled("Stage cancelled: its result is no longer needed")
+    deadline = current()
+    if deadline is None:
+        return timeout
+    left = deadline.remaining()
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return left if timeout is None else min(timeout, left)
+
+def fits(stage):
+    """
+    Check that enough of the current deadline is left to start a stage
+
+    The minimum per stage comes from DEADLINE_STAGE_MIN_SECONDS. A stage that
+    does not fit is recorded as dropped.
+
+    Returns:
+        bool: True if there is no deadline or enough time is left
+    """
+    deadline = current()
+    if deadline is None:
+        return True
+    if deadline.remaining() >= Config.DEADLINE_STAGE_MIN_SECONDS.get(stage, 0):
+        return True
+    deadline.drop(stage, "insufficient_budget")
+    return False
+
+def submit(executor, fn, *args, **kwargs):
+    """Submit work to a thread pool so it runs under the caller's deadline"""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+def submit_cancellable(executor, fn, *args, **kwargs):
+    """
+    Submit work like submit(), together with an event that cancels it
+
+    Once the event is set, the work's next external call raises StageCancelled,
+    so a stage whose result is no longer needed stops at its next SerpAPI or
+    OpenAI request instead of running to the end.
+
+    Returns:
+        tuple: (future, cancel event)
+    """
+    cancel_event = threading.Event()
+    context = contextvars.copy_context()
+    context.run(_cancel_event.set, cancel_event)
+    return executor.submit(context.run, fn, *args, **kwargs), cancel_event
@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    """
+    Small SQLite-backed key/value store with per-entry expiry.
+
+    Values are stored as JSON so entries can be shared between worker
+    processes and survive restarts. Each thread gets its own connection.
+    """
+
+    # How many writes between checks of the max_entries bound
+    EVICTION_CHECK_INTERVAL = 100
+
+    def __init__(self, path, table="cache", max_entries=None):
+        """
+        Args:
+            path (str): Path of the SQLite file backing the cache
+            table (str): Table name, lets several caches share one file
+            max_entries (int, optional): Evict least recently used entries above this size
+        """
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "expires_at REAL, "
+            "last_accessed REAL NOT NULL)"
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_last_accessed ON {self.table} (last_accessed)")
+        conn.commit()
+
+    def _connect(self):
+        """Get the SQLite connection for the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key):
+        """
+        Get a cache entry with its metadata
+
+        Returns:
+            dict: {"value", "created_at", "expires_at"} or None if missing or expired
+        """
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            now = time.time()
+            if row[2] is not None and row[2] <= now:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                conn.commit()
+                return None
+
+            if self.max_entries:
+                conn.execute(f"UPDATE {self.table} SET last_accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+
+            return {
+                "value": json.loads(row[0]),
+                "created_at": row[1],
+                "expires_at": row[2]
+            }
+        except Exception as e:
+            logger.error(f"Error reading {self.table} cache entry: {e}")
+            return None
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if missing or expired"""
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+        return entry["value"]
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+            ttl (float, optional): Seconds until the entry expires. None keeps it until evicted.
+        """
+        try:
+            now = time.time()
+            expires_at = now + ttl if ttl is not None else None
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value), now, expires_at, now)
+            )
+            conn.commit()
+
+            with self._lock:
+                self._writes += 1
+                check_eviction = self.max_entries and self._writes % self.EVICTION_CHECK_INTERVAL == 0
+            if check_eviction:
+                self.evict()
+        except Exception as e:
+            logger.error(f"Error writing {self.table} cache entry: {e}")
+
+    def delete(self, key):
+        """Remove a single entry"""
+        try:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error deleting {self.table} cache entry: {e}")
+
+    def evict(self):
+        """Drop expired entries and trim the cache down to max_entries"""
+        try:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            if self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error evicting {self.table} cache entries: {e}")
+
+    def clear(self):
+        """Remove every entry"""
+        try:
+            conn = self._connect()
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+            logger.info(f"Cleared {self.table} cache")
+        except Exception as e:
+            logger.error(f"Error clearing {self.table} cache: {e}")
+
+    def __len__(self):
+        try:
+            return self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting {self.table} cache entries: {e}")
+            return 0
@@ -1,26 +1,14 @@
 import json
 import logging
 import requests
-import time
 from config import Config
+from services import serpapi_client, llm_gateway, single_flight, prompt_budget
+from services.dual_search_executor import run_dual_legs
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to old OpenAI client
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
 def get_serpapi_manual_results(make, model, year=None, manual_type="service manual", bypass_cache=False):
     """
@@ -55,16 +43,8 @@ def get_serpapi_manual_results(make, model, year=None, manual_type="service manu
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache")
-        
-        # Make the request
-        api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-        api_response.raise_for_status()
-        results = api_response.json()
+        # Make the request through the shared pooled, cached client
+        results = serpapi_client.search(search_params, family="manual_search", bypass_cache=bypass_cache)
         
         # Extract the first 10 organic results
         manual_results = []
@@ -163,51 +143,37 @@ def get_gpt_manual_web_search_result(make, model, year=None, manual_type="servic
         """
         
         # Use GPT with web search using the Responses API (newer approach)
-        if USING_NEW_OPENAI_CLIENT:
-            try:
-                # Try the new Responses API first
-                response = client.responses.create(
-                    model="gpt-4o",
-                    input=f"Find official equipment manual for: {prompt}. Return your findings in JSON format with: manual_title, manual_url, manufacturer_source (boolean), document_id, manual_type, file_format, confidence (0.0-1.0), sources (array), search_method.",
-                    tools=[{"type": "web_search"}]
-                )
-                # Extract the content from the Responses API format - check different possible structures
-                if hasattr(response, 'choices') and response.choices:
-                    raw_content = response.choices[0].message.content
-                elif hasattr(response, 'output'):
-                    raw_content = response.output
-                elif hasattr(response, 'content'):
-                    raw_content = response.content
-                else:
-                    # Log the response structure for debugging
-                    logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
-                    raw_content = str(response)
-            except Exception as e:
-                logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
-                # Fallback to regular Chat Completions without web search
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a technical documentation specialist who finds official equipment manuals and documentation. Use your knowledge to provide the most accurate information about manuals and their sources."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
+        try:
+            # Try the new Responses API first
+            response = llm_gateway.web_search(
+                model="gpt-4o",
+                input=f"Find official equipment manual for: {prompt}. Return your findings in JSON format with: manual_title, manual_url, manufacturer_source (boolean), document_id, manual_type, file_format, confidence (0.0-1.0), sources (array), search_method.",
+                tools=[{"type": "web_search"}]
+            )
+            # Extract the content from the Responses API format - check different possible structures
+            if hasattr(response, 'choices') and response.choices:
                 raw_content = response.choices[0].message.content
-        else:
-            # For legacy client, fallback to regular GPT (web search may not be available)
-            import openai
-            response = openai.ChatCompletion.create(
+            elif hasattr(response, 'output'):
+                raw_content = response.output
+            elif hasattr(response, 'content'):
+                raw_content = response.content
+            else:
+                # Log the response structure for debugging
+                logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
+                raw_content = str(response)
+        except Exception as e:
+            logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
+            # Fallback to regular Chat Completions without web search
+            raw_content = llm_gateway.chat_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a technical documentation specialist who finds official equipment manuals and documentation. Use your knowledge to provide the most accurate information about manuals and their sources."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
-                temperature=0.1
+                temperature=0.1,
+                purpose="get_gpt_manual_web_search_result"
             )
-            raw_content = response.choices[0].message['content']
         
         # Parse the result - handle different response formats
         try:
@@ -320,7 +286,7 @@ def ai_manual_arbitrator(serpapi_results, gpt_results, make, model, year=None, m
         # Prepare the analysis prompt
         serpapi_summary = "SerpAPI Manual Results (First 10 search results):\n"
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for result in serpapi_results["results"]:
+            for result in prompt_budget.compact_results(serpapi_results["results"], "ai_manual_arbitrator"):
                 serpapi_summary += f"- {result['title']}\n  URL: {result['url']}\n  Description: {result['snippet']}\n  Is PDF: {result.get('is_pdf', False)}\n\n"
         else:
             serpapi_summary += "No SerpAPI manual results available\n"
@@ -380,29 +346,16 @@ def ai_manual_arbitrator(serpapi_results, gpt_results, make, model, year=None, m
         """
         
         # Get arbitrator decision (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different manual search results to select the most accurate and official equipment documentation. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different manual search results to select the most accurate and official equipment documentation. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who analyzes different manual search results to select the most accurate and official equipment documentation. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_manual_arbitrator"
+        )
         
         # Parse arbitrator decision
         arbitrator_decision = json.loads(raw_content)
@@ -463,7 +416,7 @@ def ai_manual_arbitrator_multiple(serpapi_results, gpt_results, make, model, yea
         
         # Add SerpAPI results
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for idx, result in enumerate(serpapi_results["results"]):
+            for idx, result in enumerate(prompt_budget.compact_results(serpapi_results["results"], "ai_manual_arbitrator_multiple")):
                 manual_candidates.append({
                     "manual_title": result.get('title', 'Unknown'),
                     "manual_url": result.get('url'),
@@ -560,29 +513,16 @@ def ai_manual_arbitrator_multiple(serpapi_results, gpt_results, make, model, yea
         """
         
         # Get arbitrator ranking (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who ranks technical documentation search results to help users find the most relevant and high-quality equipment manuals. You analyze search results to provide comprehensive rankings based on relevance, authenticity, and usefulness."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who ranks technical documentation search results to help users find the most relevant and high-quality equipment manuals. You analyze search results to provide comprehensive rankings based on relevance, authenticity, and usefulness."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who ranks technical documentation search results to help users find the most relevant and high-quality equipment manuals. You analyze search results to provide comprehensive rankings based on relevance, authenticity, and usefulness."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_manual_arbitrator_multiple"
+        )
         
         # Parse arbitrator rankings
         arbitrator_rankings = json.loads(raw_content)
@@ -614,11 +554,12 @@ def ai_manual_arbitrator_multiple(serpapi_results, gpt_results, make, model, yea
             "gpt_data": gpt_results
         }
 
+@single_flight.coalesce("find_manual_with_dual_search")
 def find_manual_with_dual_search(make, model, year=None, manual_type="service manual", bypass_cache=False, max_results=5):
     """
     Main function implementing the dual search approach for equipment manuals:
     1. Get first 10 SerpAPI search results for manuals directly
-    2. Use GPT-4o with web search preview to find official manuals  
+    2. Use GPT-4o with web search preview to find official manuals (runs concurrently with step 1)
     3. Send both results to AI arbitrator to rank and return top results
     
     Args:
@@ -635,13 +576,13 @@ def find_manual_with_dual_search(make, model, year=None, manual_type="service ma
     logger.info(f"Starting dual manual search for: {make} {model} {year} - {manual_type} (max {max_results} results)")
     
     try:
-        # Step 1: Get SerpAPI manual results
-        logger.info("Step 1: Getting SerpAPI manual results...")
-        serpapi_results = get_serpapi_manual_results(make, model, year, manual_type, bypass_cache)
-        
-        # Step 2: Get GPT manual web search results  
-        logger.info("Step 2: Getting GPT manual web search results...")
-        gpt_results = get_gpt_manual_web_search_result(make, model, year, manual_type)
+        # Steps 1 and 2: Get SerpAPI manual results and GPT manual web search results concurrently
+        logger.info("Steps 1-2: Getting SerpAPI manual results and GPT manual web search results...")
+        serpapi_results, gpt_results = run_dual_legs(
+            lambda: get_serpapi_manual_results(make, model, year, manual_type, bypass_cache),
+            lambda: get_gpt_manual_web_search_result(make, model, year, manual_type),
+            label="manual dual search"
+        )
         
         # Step 3: AI arbitrator ranks all results
         logger.info("Step 3: AI manual arbitrator ranking all results...")
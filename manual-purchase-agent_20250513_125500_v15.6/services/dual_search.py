@@ -1,26 +1,14 @@
 import json
 import logging
 import requests
-import time
 from config import Config
+from services import serpapi_client, llm_gateway, prompt_budget
+from services.dual_search_executor import run_dual_legs
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to old OpenAI client
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
 def get_serpapi_results(description, make=None, model=None, year=None, bypass_cache=False):
     """
@@ -59,16 +47,8 @@ def get_serpapi_results(description, make=None, model=None, year=None, bypass_ca
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache")
-        
-        # Make the request
-        api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-        api_response.raise_for_status()
-        results = api_response.json()
+        # Make the request through the shared pooled, cached client
+        results = serpapi_client.search(search_params, family="part_search", bypass_cache=bypass_cache)
         
         # Extract the first 10 organic results
         search_results = []
@@ -165,51 +145,37 @@ def get_gpt_web_search_result(description, make=None, model=None, year=None):
         """
         
         # Use GPT with web search using the Responses API (newer approach)
-        if USING_NEW_OPENAI_CLIENT:
-            try:
-                # Try the new Responses API first
-                response = client.responses.create(
-                    model="gpt-4o",
-                    input=f"Find OEM part information for: {prompt}. Return your findings in JSON format with: oem_part_number, manufacturer, description, confidence (0.0-1.0), alternate_part_numbers (array), sources (array), search_method.",
-                    tools=[{"type": "web_search"}]
-                )
-                # Extract the content from the Responses API format - check different possible structures
-                if hasattr(response, 'choices') and response.choices:
-                    raw_content = response.choices[0].message.content
-                elif hasattr(response, 'output'):
-                    raw_content = response.output
-                elif hasattr(response, 'content'):
-                    raw_content = response.content
-                else:
-                    # Log the response structure for debugging
-                    logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
-                    raw_content = str(response)
-            except Exception as e:
-                logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
-                # Fallback to regular Chat Completions without web search
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a parts specialist who finds precise OEM part numbers. Use your knowledge to provide the most accurate information about parts and their manufacturers."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
+        try:
+            # Try the new Responses API first
+            response = llm_gateway.web_search(
+                model="gpt-4o",
+                input=f"Find OEM part information for: {prompt}. Return your findings in JSON format with: oem_part_number, manufacturer, description, confidence (0.0-1.0), alternate_part_numbers (array), sources (array), search_method.",
+                tools=[{"type": "web_search"}]
+            )
+            # Extract the content from the Responses API format - check different possible structures
+            if hasattr(response, 'choices') and response.choices:
                 raw_content = response.choices[0].message.content
-        else:
-            # For legacy client, fallback to regular GPT (web search may not be available)
-            import openai
-            response = openai.ChatCompletion.create(
+            elif hasattr(response, 'output'):
+                raw_content = response.output
+            elif hasattr(response, 'content'):
+                raw_content = response.content
+            else:
+                # Log the response structure for debugging
+                logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
+                raw_content = str(response)
+        except Exception as e:
+            logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
+            # Fallback to regular Chat Completions without web search
+            raw_content = llm_gateway.chat_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a parts specialist who finds precise OEM part numbers. Use your knowledge to provide the most accurate information about parts and their manufacturers."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
-                temperature=0.1
+                temperature=0.1,
+                purpose="get_gpt_web_search_result"
             )
-            raw_content = response.choices[0].message['content']
         
         # Parse the result - handle different response formats
         try:
@@ -327,7 +293,7 @@ def ai_arbitrator(serpapi_results, gpt_results, description, make=None, model=No
         # Prepare the analysis prompt
         serpapi_summary = "SerpAPI Results (First 10 search results):\n"
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for result in serpapi_results["results"]:
+            for result in prompt_budget.compact_results(serpapi_results["results"], "ai_arbitrator"):
                 serpapi_summary += f"- {result['title']}\n  URL: {result['url']}\n  Description: {result['snippet']}\n\n"
         else:
             serpapi_summary += "No SerpAPI results available\n"
@@ -337,7 +303,7 @@ def ai_arbitrator(serpapi_results, gpt_results, description, make=None, model=No
             gpt_result = gpt_results["result"]
             gpt_summary += f"OEM Part Number: {gpt_result.get('oem_part_number', 'None')}\n"
             gpt_summary += f"Manufacturer: {gpt_result.get('manufacturer', 'None')}\n"
-            gpt_summary += f"Description: {gpt_result.get('description', 'None')}\n"
+            gpt_summary += f"Description: {prompt_budget.truncate(str(gpt_result.get('description', 'None')), Config.LLM_SNIPPET_MAX_TOKENS)}\n"
             gpt_summary += f"Confidence: {gpt_result.get('confidence', 0)}\n"
             gpt_summary += f"Sources: {', '.join(gpt_result.get('sources', []))}\n"
         else:
@@ -382,29 +348,16 @@ def ai_arbitrator(serpapi_results, gpt_results, description, make=None, model=No
         """
         
         # Get arbitrator decision (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different search results to select the most accurate OEM part number. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different search results to select the most accurate OEM part number. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who analyzes different search results to select the most accurate OEM part number. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_arbitrator"
+        )
         
         # Parse arbitrator decision
         arbitrator_decision = json.loads(raw_content)
@@ -443,7 +396,7 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
     """
     Main function implementing the new dual search approach:
     1. Get first 10 SerpAPI search results directly
-    2. Use GPT-4.1-nano with web search preview to find the answer  
+    2. Use GPT-4.1-nano with web search preview to find the answer (runs concurrently with step 1)
     3. Send both results to AI arbitrator without web search to pick the best answer
     
     Args:
@@ -459,13 +412,13 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
     logger.info(f"Starting dual search for: {description} - {make} {model} {year}")
     
     try:
-        # Step 1: Get SerpAPI results
-        logger.info("Step 1: Getting SerpAPI results...")
-        serpapi_results = get_serpapi_results(description, make, model, year, bypass_cache)
-        
-        # Step 2: Get GPT web search results  
-        logger.info("Step 2: Getting GPT web search results...")
-        gpt_results = get_gpt_web_search_result(description, make, model, year)
+        # Steps 1 and 2: Get SerpAPI results and GPT web search results concurrently
+        logger.info("Steps 1-2: Getting SerpAPI results and GPT web search results...")
+        serpapi_results, gpt_results = run_dual_legs(
+            lambda: get_serpapi_results(description, make, model, year, bypass_cache),
+            lambda: get_gpt_web_search_result(description, make, model, year),
+            label="part dual search"
+        )
         
         # Step 3: AI arbitrator selects best result
         logger.info("Step 3: AI arbitrator analyzing results...")
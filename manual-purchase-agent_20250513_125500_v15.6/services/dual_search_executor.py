@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from config import Config
+from services import deadline
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Get the process-wide thread pool shared by all dual searches"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.DUAL_SEARCH_WORKERS,
+                    thread_name_prefix="dual-search"
+                )
+    return _executor
+
+class _LegRun:
+    """A leg submitted to the shared pool, and the time it actually started running"""
+
+    def __init__(self, executor, leg):
+        self.started = threading.Event()
+        self.started_at = None
+        # Cancellable, so an abandoned leg stops at its next external call and frees its thread
+        self.future, self.cancel_event = deadline.submit_cancellable(executor, self._run, leg)
+
+    def _run(self, leg):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return leg()
+
+    def cancel(self):
+        self.future.cancel()
+        self.cancel_event.set()
+
+def _wait_for_leg(run, name, timeout, request_deadline=None):
+    """
+    Wait for one leg, turning timeouts and exceptions into a failed leg result
+
+    The leg's timeout counts from when it starts running, so time spent queued
+    behind other searches on the shared pool does not use it up. Queueing is
+    bounded separately by DUAL_SEARCH_QUEUE_TIMEOUT, and both by the request deadline.
+
+    Returns:
+        tuple: (result dict or None, error message or None)
+    """
+    queue_timeout = Config.DUAL_SEARCH_QUEUE_TIMEOUT
+    if request_deadline is not None:
+        queue_timeout = min(queue_timeout, request_deadline.remaining())
+    if not run.started.wait(queue_timeout):
+        run.cancel()
+        logger.warning(f"{name} leg did not start within {queue_timeout:.1f}s, search pool busy")
+        return None, f"{name} leg did not start within {queue_timeout:.1f}s (search pool busy)"
+
+    remaining = timeout - (time.monotonic() - run.started_at)
+    if request_deadline is not None:
+        remaining = min(remaining, request_deadline.remaining())
+    try:
+        return run.future.result(timeout=max(0.0, remaining)), None
+    except FutureTimeoutError:
+        # The worker stops at its next external call; its result is ignored either way
+        run.cancel()
+        logger.warning(f"{name} leg timed out after {timeout}s")
+        return None, f"{name} timeout after {timeout}s"
+    except Exception as e:
+        logger.error(f"{name} leg failed: {e}")
+        return None, str(e)
+
+def run_dual_legs(serpapi_leg, gpt_leg, serpapi_timeout=None, gpt_timeout=None, label="dual search"):
+    """
+    Run the SerpAPI and GPT web search legs of a dual search concurrently
+
+    Neither leg needs the other's output, so they are started together and the
+    caller only waits for the slower one. A leg that raises or runs past its
+    timeout is replaced by a failed result in the shape the arbitrators already
+    handle, so the arbitrator still runs on whatever came back. Timeouts count
+    from when a leg starts running and are shortened to the time left on the
+    request deadline, if there is one.
+
+    Args:
+        serpapi_leg (callable): No-argument callable returning the SerpAPI leg result
+        gpt_leg (callable): No-argument callable returning the GPT web search leg result
+        serpapi_timeout (float, optional): Seconds to wait for the SerpAPI leg
+        gpt_timeout (float, optional): Seconds to wait for the GPT leg
+        label (str): Name used in log messages
+
+    Returns:
+        tuple: (serpapi_results, gpt_results)
+    """
+    serpapi_timeout = serpapi_timeout or Config.DUAL_SEARCH_SERPAPI_TIMEOUT
+    gpt_timeout = gpt_timeout or Config.DUAL_SEARCH_GPT_TIMEOUT
+
+    # Both legs run under the caller's request deadline and are not waited for past it
+    request_deadline = deadline.current()
+
+    executor = get_executor()
+    started_at = time.time()
+    logger.info(f"Starting SerpAPI and GPT legs of {label} concurrently")
+    serpapi_run = _LegRun(executor, serpapi_leg)
+    gpt_run = _LegRun(executor, gpt_leg)
+
+    serpapi_results, serpapi_error = _wait_for_leg(serpapi_run, "SerpAPI", serpapi_timeout, request_deadline)
+    if serpapi_results is None and request_deadline is not None and request_deadline.expired():
+        request_deadline.drop(f"{label}: SerpAPI", "deadline_exceeded")
+    if serpapi_results is None:
+        serpapi_results = {
+            "success": False,
+            "error": serpapi_error,
+            "results": []
+        }
+
+    gpt_results, gpt_error = _wait_for_leg(gpt_run, "GPT web search", gpt_timeout, request_deadline)
+    if gpt_results is None and request_deadline is not None and request_deadline.expired():
+        request_deadline.drop(f"{label}: GPT web search", "deadline_exceeded")
+    if gpt_results is None:
+        gpt_results = {
+            "success": False,
+            "error": gpt_error,
+            "result": {}
+        }
+
+    logger.info(f"Both legs of {label} finished in {time.time() - started_at:.2f}s "
+                f"(serpapi_success={serpapi_results.get('success', False)}, "
+                f"gpt_success={gpt_results.get('success', False)})")
+
+    return serpapi_results, gpt_results
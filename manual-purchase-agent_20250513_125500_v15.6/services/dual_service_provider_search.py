@@ -1,26 +1,14 @@
 import json
 import logging
 import requests
-import time
 from config import Config
+from services import serpapi_client, llm_gateway, prompt_budget
+from services.dual_search_executor import run_dual_legs
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to old OpenAI client
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
 def get_industry_search_terms(equipment_make, equipment_model):
     """
@@ -75,29 +63,16 @@ def get_industry_search_terms(equipment_make, equipment_model):
         """
         
         # Get AI analysis of equipment industry
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert equipment industry analyst who categorizes equipment into service industries and generates optimal search terms for finding qualified service providers."},
-                    {"role": "user", "content": industry_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert equipment industry analyst who categorizes equipment into service industries and generates optimal search terms for finding qualified service providers."},
-                    {"role": "user", "content": industry_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are an expert equipment industry analyst who categorizes equipment into service industries and generates optimal search terms for finding qualified service providers."},
+                {"role": "user", "content": industry_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="get_industry_search_terms"
+        )
         
         # Parse AI response
         ai_analysis = json.loads(raw_content)
@@ -173,16 +148,8 @@ def get_serpapi_service_provider_results(equipment_make, equipment_model, servic
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache")
-        
-        # Make the request
-        api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-        api_response.raise_for_status()
-        results = api_response.json()
+        # Make the request through the shared pooled, cached client
+        results = serpapi_client.search(search_params, family="service_provider_search", bypass_cache=bypass_cache)
         
         # Extract the first 10 organic results
         service_results = []
@@ -300,51 +267,37 @@ def get_gpt_service_provider_web_search_result(equipment_make, equipment_model,
         """
         
         # Use GPT with web search using the Responses API (newer approach)
-        if USING_NEW_OPENAI_CLIENT:
-            try:
-                # Try the new Responses API first
-                response = client.responses.create(
-                    model="gpt-4o",
-                    input=f"Find service providers for equipment: {prompt}. Return your findings in JSON format with: provider_name, provider_url, contact_info, service_area, certifications, service_types, is_authorized (boolean), emergency_service (boolean), location, confidence (0.0-1.0), sources (array), search_method.",
-                    tools=[{"type": "web_search"}]
-                )
-                # Extract the content from the Responses API format - check different possible structures
-                if hasattr(response, 'choices') and response.choices:
-                    raw_content = response.choices[0].message.content
-                elif hasattr(response, 'output'):
-                    raw_content = response.output
-                elif hasattr(response, 'content'):
-                    raw_content = response.content
-                else:
-                    # Log the response structure for debugging
-                    logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
-                    raw_content = str(response)
-            except Exception as e:
-                logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
-                # Fallback to regular Chat Completions without web search
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a service coordination specialist who finds qualified service providers and technicians for industrial equipment. Use your knowledge to provide the most accurate information about service providers and their capabilities."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
+        try:
+            # Try the new Responses API first
+            response = llm_gateway.web_search(
+                model="gpt-4o",
+                input=f"Find service providers for equipment: {prompt}. Return your findings in JSON format with: provider_name, provider_url, contact_info, service_area, certifications, service_types, is_authorized (boolean), emergency_service (boolean), location, confidence (0.0-1.0), sources (array), search_method.",
+                tools=[{"type": "web_search"}]
+            )
+            # Extract the content from the Responses API format - check different possible structures
+            if hasattr(response, 'choices') and response.choices:
                 raw_content = response.choices[0].message.content
-        else:
-            # For legacy client, fallback to regular GPT (web search may not be available)
-            import openai
-            response = openai.ChatCompletion.create(
+            elif hasattr(response, 'output'):
+                raw_content = response.output
+            elif hasattr(response, 'content'):
+                raw_content = response.content
+            else:
+                # Log the response structure for debugging
+                logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
+                raw_content = str(response)
+        except Exception as e:
+            logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
+            # Fallback to regular Chat Completions without web search
+            raw_content = llm_gateway.chat_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a service coordination specialist who finds qualified service providers and technicians for industrial equipment. Use your knowledge to provide the most accurate information about service providers and their capabilities."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
-                temperature=0.1
+                temperature=0.1,
+                purpose="get_gpt_service_provider_web_search_result"
             )
-            raw_content = response.choices[0].message['content']
         
         # Parse the result - handle different response formats
         try:
@@ -470,7 +423,7 @@ def ai_service_provider_arbitrator(serpapi_results, gpt_results, equipment_make,
         # Prepare the analysis prompt
         serpapi_summary = "SerpAPI Service Provider Results (First 10 search results):\n"
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for result in serpapi_results["results"]:
+            for result in prompt_budget.compact_results(serpapi_results["results"], "ai_service_provider_arbitrator"):
                 serpapi_summary += f"- {result['title']}\n  URL: {result['url']}\n  Description: {result['snippet']}\n  Likely Service Provider: {result.get('is_likely_service_provider', False)}\n\n"
         else:
             serpapi_summary += "No SerpAPI service provider results available\n"
@@ -480,9 +433,9 @@ def ai_service_provider_arbitrator(serpapi_results, gpt_results, equipment_make,
             gpt_result = gpt_results["result"]
             gpt_summary += f"Provider Name: {gpt_result.get('provider_name', 'None')}\n"
             gpt_summary += f"Provider URL: {gpt_result.get('provider_url', 'None')}\n"
-            gpt_summary += f"Contact Info: {gpt_result.get('contact_info', 'None')}\n"
+            gpt_summary += f"Contact Info: {prompt_budget.truncate(str(gpt_result.get('contact_info', 'None')), Config.LLM_SNIPPET_MAX_TOKENS)}\n"
             gpt_summary += f"Service Area: {gpt_result.get('service_area', 'Unknown')}\n"
-            gpt_summary += f"Certifications: {gpt_result.get('certifications', 'Unknown')}\n"
+            gpt_summary += f"Certifications: {prompt_budget.truncate(str(gpt_result.get('certifications', 'Unknown')), Config.LLM_SNIPPET_MAX_TOKENS)}\n"
             gpt_summary += f"Service Types: {', '.join(gpt_result.get('service_types', []))}\n"
             gpt_summary += f"Is Authorized: {gpt_result.get('is_authorized', False)}\n"
             gpt_summary += f"Emergency Service: {gpt_result.get('emergency_service', False)}\n"
@@ -539,29 +492,16 @@ def ai_service_provider_arbitrator(serpapi_results, gpt_results, equipment_make,
         """
         
         # Get arbitrator decision (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different service provider search results to select the most qualified and appropriate service provider for equipment maintenance and repair. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different service provider search results to select the most qualified and appropriate service provider for equipment maintenance and repair. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who analyzes different service provider search results to select the most qualified and appropriate service provider for equipment maintenance and repair. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_service_provider_arbitrator"
+        )
         
         # Parse arbitrator decision
         arbitrator_decision = json.loads(raw_content)
@@ -625,7 +565,7 @@ def ai_service_provider_arbitrator_multiple(serpapi_results, gpt_results, equipm
         
         # Add SerpAPI results
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for idx, result in enumerate(serpapi_results["results"]):
+            for idx, result in enumerate(prompt_budget.compact_results(serpapi_results["results"], "ai_service_provider_arbitrator_multiple")):
                 provider_candidates.append({
                     "provider_name": result.get('title', 'Unknown Provider'),
                     "provider_url": result.get('url'),
@@ -731,29 +671,16 @@ def ai_service_provider_arbitrator_multiple(serpapi_results, gpt_results, equipm
         """
         
         # Get arbitrator ranking (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who ranks service provider search results to help users find the most qualified and appropriate service providers for their equipment. You analyze search results to provide comprehensive rankings based on expertise, authorization, and service quality."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who ranks service provider search results to help users find the most qualified and appropriate service providers for their equipment. You analyze search results to provide comprehensive rankings based on expertise, authorization, and service quality."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who ranks service provider search results to help users find the most qualified and appropriate service providers for their equipment. You analyze search results to provide comprehensive rankings based on expertise, authorization, and service quality."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_service_provider_arbitrator_multiple"
+        )
         
         # Parse arbitrator rankings
         arbitrator_rankings = json.loads(raw_content)
@@ -789,7 +716,7 @@ def find_service_provider_with_dual_search(equipment_make, equipment_model, serv
     """
     Main function implementing the dual search approach for service providers:
     1. Get first 10 SerpAPI search results for service providers directly
-    2. Use GPT-4o with web search preview to find qualified service providers  
+    2. Use GPT-4o with web search preview to find qualified service providers (runs concurrently with step 1)
     3. Send both results to AI arbitrator to rank and return top providers
     
     Args:
@@ -806,13 +733,13 @@ def find_service_provider_with_dual_search(equipment_make, equipment_model, serv
     logger.info(f"Starting dual service provider search for: {equipment_make} {equipment_model} - {service_type} (max {max_results} results)")
     
     try:
-        # Step 1: Get SerpAPI service provider results
-        logger.info("Step 1: Getting SerpAPI service provider results...")
-        serpapi_results = get_serpapi_service_provider_results(equipment_make, equipment_model, service_type, location, bypass_cache)
-        
-        # Step 2: Get GPT service provider web search results  
-        logger.info("Step 2: Getting GPT service provider web search results...")
-        gpt_results = get_gpt_service_provider_web_search_result(equipment_make, equipment_model, service_type, location)
+        # Steps 1 and 2: Get SerpAPI service provider results and GPT service provider web search results concurrently
+        logger.info("Steps 1-2: Getting SerpAPI service provider results and GPT service provider web search results...")
+        serpapi_results, gpt_results = run_dual_legs(
+            lambda: get_serpapi_service_provider_results(equipment_make, equipment_model, service_type, location, bypass_cache),
+            lambda: get_gpt_service_provider_web_search_result(equipment_make, equipment_model, service_type, location),
+            label="service provider dual search"
+        )
         
         # Step 3: AI arbitrator ranks all results
         logger.info("Step 3: AI service provider arbitrator ranking all results...")
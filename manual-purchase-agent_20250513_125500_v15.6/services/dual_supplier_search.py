@@ -1,26 +1,14 @@
 import json
 import logging
 import requests
-import time
 from config import Config
+from services import serpapi_client, llm_gateway, single_flight, deadline, prompt_budget
+from services.dual_search_executor import run_dual_legs
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to old OpenAI client
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
 def get_serpapi_supplier_results(part_number, part_description=None, location=None, bypass_cache=False):
     """
@@ -56,16 +44,8 @@ def get_serpapi_supplier_results(part_number, part_description=None, location=No
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache")
-        
-        # Make the request
-        api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-        api_response.raise_for_status()
-        results = api_response.json()
+        # Make the request through the shared pooled, cached client
+        results = serpapi_client.search(search_params, family="supplier_search", bypass_cache=bypass_cache)
         
         # Extract the first 10 organic results
         supplier_results = []
@@ -175,51 +155,37 @@ def get_gpt_supplier_web_search_result(part_number, part_description=None, locat
         """
         
         # Use GPT with web search using the Responses API (newer approach)
-        if USING_NEW_OPENAI_CLIENT:
-            try:
-                # Try the new Responses API first
-                response = client.responses.create(
-                    model="gpt-4o",
-                    input=f"Find suppliers for part: {prompt}. Return your findings in JSON format with: supplier_name, supplier_url, contact_info, part_availability, pricing_info, is_authorized (boolean), supplier_type, location, confidence (0.0-1.0), sources (array), search_method.",
-                    tools=[{"type": "web_search"}]
-                )
-                # Extract the content from the Responses API format - check different possible structures
-                if hasattr(response, 'choices') and response.choices:
-                    raw_content = response.choices[0].message.content
-                elif hasattr(response, 'output'):
-                    raw_content = response.output
-                elif hasattr(response, 'content'):
-                    raw_content = response.content
-                else:
-                    # Log the response structure for debugging
-                    logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
-                    raw_content = str(response)
-            except Exception as e:
-                logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
-                # Fallback to regular Chat Completions without web search
-                response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a procurement specialist who finds reliable suppliers and distributors for industrial parts. Use your knowledge to provide the most accurate information about suppliers and their capabilities."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=0.1
-                )
+        try:
+            # Try the new Responses API first
+            response = llm_gateway.web_search(
+                model="gpt-4o",
+                input=f"Find suppliers for part: {prompt}. Return your findings in JSON format with: supplier_name, supplier_url, contact_info, part_availability, pricing_info, is_authorized (boolean), supplier_type, location, confidence (0.0-1.0), sources (array), search_method.",
+                tools=[{"type": "web_search"}]
+            )
+            # Extract the content from the Responses API format - check different possible structures
+            if hasattr(response, 'choices') and response.choices:
                 raw_content = response.choices[0].message.content
-        else:
-            # For legacy client, fallback to regular GPT (web search may not be available)
-            import openai
-            response = openai.ChatCompletion.create(
+            elif hasattr(response, 'output'):
+                raw_content = response.output
+            elif hasattr(response, 'content'):
+                raw_content = response.content
+            else:
+                # Log the response structure for debugging
+                logger.info(f"Responses API structure: {type(response)} - {dir(response)}")
+                raw_content = str(response)
+        except Exception as e:
+            logger.warning(f"Responses API failed, trying Chat Completions without web search: {e}")
+            # Fallback to regular Chat Completions without web search
+            raw_content = llm_gateway.chat_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a procurement specialist who finds reliable suppliers and distributors for industrial parts. Use your knowledge to provide the most accurate information about suppliers and their capabilities."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"},
-                temperature=0.1
+                temperature=0.1,
+                purpose="get_gpt_supplier_web_search_result"
             )
-            raw_content = response.choices[0].message['content']
         
         # Parse the result - handle different response formats
         try:
@@ -341,7 +307,7 @@ def ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_descr
         # Prepare the analysis prompt
         serpapi_summary = "SerpAPI Supplier Results (First 10 search results):\n"
         if serpapi_results.get("success") and serpapi_results.get("results"):
-            for result in serpapi_results["results"]:
+            for result in prompt_budget.compact_results(serpapi_results["results"], "ai_supplier_arbitrator"):
                 serpapi_summary += f"- {result['title']}\n  URL: {result['url']}\n  Description: {result['snippet']}\n  Likely Supplier: {result.get('is_likely_supplier', False)}\n\n"
         else:
             serpapi_summary += "No SerpAPI supplier results available\n"
@@ -351,9 +317,9 @@ def ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_descr
             gpt_result = gpt_results["result"]
             gpt_summary += f"Supplier Name: {gpt_result.get('supplier_name', 'None')}\n"
             gpt_summary += f"Supplier URL: {gpt_result.get('supplier_url', 'None')}\n"
-            gpt_summary += f"Contact Info: {gpt_result.get('contact_info', 'None')}\n"
+            gpt_summary += f"Contact Info: {prompt_budget.truncate(str(gpt_result.get('contact_info', 'None')), Config.LLM_SNIPPET_MAX_TOKENS)}\n"
             gpt_summary += f"Part Availability: {gpt_result.get('part_availability', 'Unknown')}\n"
-            gpt_summary += f"Pricing Info: {gpt_result.get('pricing_info', 'Unknown')}\n"
+            gpt_summary += f"Pricing Info: {prompt_budget.truncate(str(gpt_result.get('pricing_info', 'Unknown')), Config.LLM_SNIPPET_MAX_TOKENS)}\n"
             gpt_summary += f"Is Authorized: {gpt_result.get('is_authorized', False)}\n"
             gpt_summary += f"Supplier Type: {gpt_result.get('supplier_type', 'Unknown')}\n"
             gpt_summary += f"Location: {gpt_result.get('location', 'Unknown')}\n"
@@ -406,29 +372,16 @@ def ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_descr
         """
         
         # Get arbitrator decision (WITHOUT web search)
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different supplier search results to select the most reliable and appropriate supplier for parts procurement. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert AI arbitrator who analyzes different supplier search results to select the most reliable and appropriate supplier for parts procurement. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
-                    {"role": "user", "content": arbitrator_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",  # Use nano for arbitration, no web search needed
+            messages=[
+                {"role": "system", "content": "You are an expert AI arbitrator who analyzes different supplier search results to select the most reliable and appropriate supplier for parts procurement. You do not have web search capabilities - you analyze only the provided search results to make your decision."},
+                {"role": "user", "content": arbitrator_prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_supplier_arbitrator"
+        )
         
         # Parse arbitrator decision
         arbitrator_decision = json.loads(raw_content)
@@ -467,11 +420,12 @@ def ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_descr
             "gpt_data": gpt_results
         }
 
+@single_flight.coalesce("find_supplier_with_dual_search")
 def find_supplier_with_dual_search(part_number, part_description=None, location=None, bypass_cache=False):
     """
     Main function implementing the dual search approach for parts suppliers:
     1. Get first 10 SerpAPI search results for suppliers directly
-    2. Use GPT-4o with web search preview to find reliable suppliers  
+    2. Use GPT-4o with web search preview to find reliable suppliers (runs concurrently with step 1)
     3. Send both results to AI arbitrator without web search to pick the best supplier
     
     Args:
@@ -486,17 +440,20 @@ def find_supplier_with_dual_search(part_number, part_description=None, location=
     logger.info(f"Starting dual supplier search for: {part_number} - {part_description}")
     
     try:
-        # Step 1: Get SerpAPI supplier results
-        logger.info("Step 1: Getting SerpAPI supplier results...")
-        serpapi_results = get_serpapi_supplier_results(part_number, part_description, location, bypass_cache)
-        
-        # Step 2: Get GPT supplier web search results  
-        logger.info("Step 2: Getting GPT supplier web search results...")
-        gpt_results = get_gpt_supplier_web_search_result(part_number, part_description, location)
-        
-        # Step 3: AI arbitrator selects best supplier result
-        logger.info("Step 3: AI supplier arbitrator analyzing results...")
-        final_result = ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_description, location)
+        # Steps 1 and 2: Get SerpAPI supplier results and GPT supplier web search results concurrently
+        logger.info("Steps 1-2: Getting SerpAPI supplier results and GPT supplier web search results...")
+        serpapi_results, gpt_results = run_dual_legs(
+            lambda: get_serpapi_supplier_results(part_number, part_description, location, bypass_cache),
+            lambda: get_gpt_supplier_web_search_result(part_number, part_description, location),
+            label="supplier dual search"
+        )
+        
+        # Step 3: AI arbitrator selects best supplier result (if the request deadline leaves room)
+        if deadline.fits("supplier_arbitrator"):
+            logger.info("Step 3: AI supplier arbitrator analyzing results...")
+            final_result = ai_supplier_arbitrator(serpapi_results, gpt_results, part_number, part_description, location)
+        else:
+            final_result = {"success": False, "error": "Supplier arbitrator skipped: request deadline"}
         
         if final_result.get("success"):
             decision = final_result["arbitrator_decision"]
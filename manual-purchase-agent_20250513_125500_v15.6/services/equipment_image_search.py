@@ -1,24 +1,13 @@
 import json
 import logging
-import requests
 import time
 from config import Config
+from services import serpapi_client, llm_gateway
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-try:
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
 def search_equipment_images(make, model, num_results=20):
     """
@@ -49,10 +38,8 @@ def search_equipment_images(make, model, num_results=20):
             "safe": "active"
         }
         
-        # Make the request
-        api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-        api_response.raise_for_status()
-        results = api_response.json()
+        # Make the request through the shared pooled, cached client
+        results = serpapi_client.search(search_params, family="image_search")
         
         # Extract image results
         image_results = []
@@ -150,29 +137,16 @@ def ai_select_best_equipment_image(make, model, image_results):
         """
         
         # Get AI selection
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing equipment images and identifying authentic, complete equipment photos from search results."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message.content
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing equipment images and identifying authentic, complete equipment photos from search results."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are an expert at analyzing equipment images and identifying authentic, complete equipment photos from search results."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="ai_select_best_equipment_image"
+        )
         
         # Parse AI selection
         selection = json.loads(raw_content)
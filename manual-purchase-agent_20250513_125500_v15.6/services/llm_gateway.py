@@ -0,0 +1,308 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from services.disk_cache import DiskCache
+from services import rate_limiter, usage_ledger, deadline, prompt_budget
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Initialize OpenAI client - handle both new and old API versions
+try:
+    # Try to import using new OpenAI Python client (v1.0.0+)
+    from openai import OpenAI
+    import httpx
+    USING_NEW_OPENAI_CLIENT = True
+    logger.info("Using new OpenAI client (v1.0.0+)")
+except ImportError:
+    # Fall back to old OpenAI client
+    import openai
+    openai.api_key = Config.OPENAI_API_KEY
+    USING_NEW_OPENAI_CLIENT = False
+    logger.info("Using legacy OpenAI client")
+
+DEFAULT_MODEL = "gpt-4.1-mini-2025-04-14"
+
+_client = None
+_client_lock = threading.Lock()
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+def get_client():
+    """Get the process-wide OpenAI client backed by one pooled HTTP client"""
+    global _client
+    if not USING_NEW_OPENAI_CLIENT:
+        return None
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=Config.LLM_POOL_SIZE,
+                        max_keepalive_connections=Config.LLM_POOL_SIZE
+                    ),
+                    timeout=Config.LLM_REQUEST_TIMEOUT
+                )
+                # Retries are done in _call_openai so 429s reach the rate limiter
+                _client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=http_client, max_retries=0)
+    return _client
+
+def get_cache():
+    """Get the shared on-disk completion cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(Config.CACHE_DIR, "llm_cache.db"),
+                    table="llm_completions",
+                    max_entries=Config.LLM_CACHE_MAX_ENTRIES
+                )
+    return _cache
+
+def _get_semaphore(model):
+    with _semaphores_lock:
+        semaphore = _semaphores.get(model)
+        if semaphore is None:
+            limit = Config.LLM_CONCURRENCY_LIMITS.get(model, Config.LLM_DEFAULT_CONCURRENCY)
+            semaphore = threading.BoundedSemaphore(limit)
+            _semaphores[model] = semaphore
+        return semaphore
+
+@contextmanager
+def model_slot(model):
+    """Hold one of the model's concurrency slots for the duration of a request"""
+    semaphore = _get_semaphore(model)
+    left = deadline.remaining()
+    if left is None:
+        semaphore.acquire()
+    elif not semaphore.acquire(timeout=left):
+        raise deadline.DeadlineExceeded(f"Request deadline exceeded waiting for a {model} slot")
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+def _is_transient(error):
+    """Connection errors, timeouts and 5xx responses are worth retrying"""
+    status = getattr(error, "status_code", None) or getattr(error, "http_status", None)
+    if status:
+        return status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "Timeout")
+
+def _call_openai(model, purpose, create):
+    """
+    Send one OpenAI request through the model's rate limit bucket
+
+    Waits for a request slot, retries 429s after slowing the bucket down (honouring
+    Retry-After) and transient errors with a short backoff, and records the call,
+    its tokens and its estimated cost in the usage ledger.
+
+    Args:
+        model (str): Model name, selects the bucket
+        purpose (str): Label of the calling step, used as the ledger endpoint
+        create (callable): Called with the request timeout in seconds, makes the request
+            and returns the response
+
+    Returns:
+        The OpenAI response object
+    """
+    bucket = rate_limiter.get_bucket("openai", model)
+    retries = 0
+    while True:
+        # Never wait or run past the request deadline, if there is one
+        timeout = deadline.clamp_timeout(Config.LLM_REQUEST_TIMEOUT)
+        try:
+            bucket.acquire(max_wait=min(Config.RATE_LIMIT_MAX_WAIT, timeout))
+            response = create(timeout)
+        except rate_limiter.RateLimitTimeout:
+            usage_ledger.record("openai", purpose, model, error=True)
+            raise
+        except Exception as e:
+            status = getattr(e, "status_code", None) or getattr(e, "http_status", None)
+            if status == 429:
+                headers = getattr(getattr(e, "response", None), "headers", None) or {}
+                bucket.on_rate_limited(rate_limiter.parse_retry_after(headers.get("retry-after")))
+                usage_ledger.record("openai", purpose, model, rate_limited=True)
+            else:
+                usage_ledger.record("openai", purpose, model, error=True)
+
+            if retries < Config.RATE_LIMIT_MAX_RETRIES and (status == 429 or _is_transient(e)):
+                retries += 1
+                if status != 429:
+                    time.sleep(min(2 ** retries, 10))
+                continue
+            raise
+
+        bucket.on_success()
+        usage = getattr(response, "usage", None)
+        usage_ledger.record(
+            "openai", purpose, model,
+            input_tokens=getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0),
+            output_tokens=getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", 0)
+        )
+        return response
+
+def _record(purpose, counter):
+    with _stats_lock:
+        purpose_stats = _stats.setdefault(purpose, {"hits": 0, "misses": 0, "uncached": 0, "errors": 0})
+        purpose_stats[counter] += 1
+
+def make_cache_key(model, messages, response_format=None, temperature=None, max_tokens=None):
+    """Build the content-addressed cache key for a completion request"""
+    payload = json.dumps({
+        "model": model,
+        "messages": messages,
+        "response_format": response_format,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def chat_completion(messages, model=DEFAULT_MODEL, response_format=None, temperature=0.1,
+                    max_tokens=None, use_cache=True, purpose="general"):
+    """
+    Run a chat completion through the shared client, concurrency limits and completion cache
+
+    Args:
+        messages (list): Chat messages
+        model (str): Model name
+        response_format (dict, optional): OpenAI response_format, e.g. {"type": "json_object"}
+        temperature (float): Sampling temperature
+        max_tokens (int, optional): Maximum tokens for the response, defaults to the
+            purpose's cap in LLM_MAX_TOKENS
+        use_cache (bool): Whether a cached completion may be returned and stored
+        purpose (str): Label of the calling step, used to group cache counters
+
+    Returns:
+        str: The message content of the first choice
+
+    Raises:
+        Exception: Whatever the OpenAI client raises
+    """
+    if max_tokens is None:
+        max_tokens = prompt_budget.max_tokens_for(purpose)
+    cacheable = (use_cache and temperature is not None
+                 and temperature <= Config.LLM_CACHE_MAX_TEMPERATURE)
+    key = None
+
+    if cacheable:
+        key = make_cache_key(model, messages, response_format, temperature, max_tokens)
+        cached = get_cache().get(key)
+        if cached is not None:
+            _record(purpose, "hits")
+            logger.info(f"LLM cache hit for {purpose} ({model})")
+            return cached
+        _record(purpose, "misses")
+    else:
+        _record(purpose, "uncached")
+
+    request_kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature
+    }
+    if response_format:
+        request_kwargs["response_format"] = response_format
+    if max_tokens:
+        request_kwargs["max_tokens"] = max_tokens
+
+    prompt_tokens = prompt_budget.count_message_tokens(messages)
+    try:
+        with model_slot(model):
+            if USING_NEW_OPENAI_CLIENT:
+                response = _call_openai(model, purpose, lambda timeout: get_client().chat.completions.create(timeout=timeout, **request_kwargs))
+                content = response.choices[0].message.content
+            else:
+                response = _call_openai(model, purpose, lambda timeout: openai.ChatCompletion.create(request_timeout=timeout, **request_kwargs))
+                content = response.choices[0].message['content']
+    except Exception:
+        _record(purpose, "errors")
+        raise
+
+    truncated = getattr(response.choices[0], "finish_reason", None) == "length"
+    if truncated:
+        logger.warning(f"{purpose} response stopped at max_tokens={max_tokens} ({prompt_tokens} prompt tokens)")
+    prompt_budget.record_call(purpose, prompt_tokens, max_tokens, getattr(response, "usage", None), truncated)
+
+    # A response cut off at max_tokens is incomplete; it is returned but never cached
+    if cacheable and content and not truncated:
+        if _is_cacheable_content(content, response_format):
+            get_cache().set(key, content, ttl=Config.LLM_CACHE_TTL)
+
+    return content
+
+def _is_cacheable_content(content, response_format):
+    """Never cache a JSON-mode completion that does not parse"""
+    if response_format and response_format.get("type") == "json_object":
+        try:
+            json.loads(content)
+        except (ValueError, TypeError):
+            return False
+    return True
+
+def web_search(input, model="gpt-4o", tools=None):
+    """
+    Run a Responses API request with the web search tool through the shared client
+
+    Web search results change over time, so these requests are never cached.
+
+    Args:
+        input (str): The request input
+        model (str): Model name
+        tools (list, optional): Tools to enable, defaults to web search
+
+    Returns:
+        The raw Responses API response object
+
+    Raises:
+        RuntimeError: If only the legacy OpenAI client is available
+    """
+    if not USING_NEW_OPENAI_CLIENT:
+        raise RuntimeError("Responses API requires the OpenAI v1 client")
+
+    with model_slot(model):
+        response = _call_openai(model, "web_search", lambda timeout: get_client().responses.create(
+            model=model,
+            input=input,
+            tools=tools or [{"type": "web_search"}],
+            timeout=timeout
+        ))
+    prompt_budget.record_call("web_search", prompt_budget.count_tokens(input), None, getattr(response, "usage", None))
+    return response
+
+def get_cache_stats():
+    """
+    Get completion cache counters
+
+    Returns:
+        dict: Per-purpose counters, totals and cache size
+    """
+    with _stats_lock:
+        purposes = {name: dict(counters) for name, counters in _stats.items()}
+
+    hits = sum(counters["hits"] for counters in purposes.values())
+    misses = sum(counters["misses"] for counters in purposes.values())
+    lookups = hits + misses
+
+    return {
+        "purposes": purposes,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "entries": len(get_cache())
+    }
+
+def clear_cache():
+    """Remove all cached completions"""
+    get_cache().clear()
@@ -0,0 +1,303 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from services.disk_cache import DiskCache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+_ids = None
+_ids_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+_evict_lock = threading.Lock()
+_filling = set()
+_filling_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "range_passthrough": 0, "stored": 0, "evicted": 0, "not_pdf": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+def get_id_store():
+    """Get the proxy id -> manual URL store, shared by all workers"""
+    global _ids
+    if _ids is None:
+        with _ids_lock:
+            if _ids is None:
+                _ids = DiskCache(
+                    os.path.join(Config.CACHE_DIR, "manual_proxy.db"),
+                    table="manual_proxy_ids",
+                    max_entries=Config.MANUAL_PROXY_MAX_IDS
+                )
+    return _ids
+
+def get_session():
+    """Get the process-wide requests session used to fetch manuals from their origin"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=Config.MANUAL_PROXY_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def _record(counter, amount=1):
+    with _stats_lock:
+        _stats[counter] += amount
+
+def url_hash(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def register_url(url):
+    """
+    Get the proxy id of a manual URL, storing it for MANUAL_PROXY_ID_TTL
+
+    The id is derived from the URL, so the same manual always gets the same id
+    and a repeat search refreshes its expiry.
+
+    Returns:
+        str: The proxy id
+    """
+    proxy_id = url_hash(url)[:16]
+    get_id_store().set(proxy_id, url, ttl=Config.MANUAL_PROXY_ID_TTL)
+    return proxy_id
+
+def resolve_proxy_id(proxy_id):
+    """The manual URL of a proxy id, or None if it is unknown or expired"""
+    return get_id_store().get(proxy_id)
+
+def _pdf_dir():
+    return os.path.join(Config.CACHE_DIR, "manual_pdfs")
+
+def cached_path(url):
+    """
+    Path of the cached copy of a manual, or None if it is not cached
+
+    A hit marks the file as recently used for the LRU eviction.
+    """
+    path = os.path.join(_pdf_dir(), url_hash(url) + ".pdf")
+    if not os.path.exists(path):
+        _record("misses")
+        return None
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    _record("hits")
+    return path
+
+def evict():
+    """Delete least recently used manuals until the cache is under MANUAL_PDF_CACHE_MAX_BYTES"""
+    with _evict_lock:
+        try:
+            names = os.listdir(_pdf_dir())
+        except OSError as e:
+            logger.error(f"Error scanning manual cache: {e}")
+            return
+
+        files = []
+        for name in names:
+            if name.endswith(".pdf"):
+                path = os.path.join(_pdf_dir(), name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= Config.MANUAL_PDF_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                _record("evicted")
+            except OSError:
+                pass
+
+def is_pdf_response(upstream, url):
+    """The origin answered with a PDF rather than an HTML landing page"""
+    content_type = upstream.headers.get("Content-Type", "").lower()
+    return "pdf" in content_type or ("octet-stream" in content_type and url.lower().split("?")[0].endswith(".pdf"))
+
+def open_upstream(url, range_header=None):
+    """
+    Start fetching a manual from its origin
+
+    Returns:
+        requests.Response: The streaming response; the caller must close it
+    """
+    headers = {"Accept": "application/pdf,*/*"}
+    if range_header:
+        headers["Range"] = range_header
+    upstream = get_session().get(url, headers=headers, stream=True, timeout=Config.MANUAL_PROXY_TIMEOUT)
+    upstream.raise_for_status()
+    return upstream
+
+def stream_and_store(upstream, url):
+    """
+    Yield the body of a full (200) origin response while writing it to the cache
+
+    The file only enters the cache once the whole body was received; a client
+    that disconnects early, a short read or a body above MANUAL_PDF_MAX_FILE_BYTES
+    leaves nothing behind.
+    """
+    os.makedirs(_pdf_dir(), exist_ok=True)
+    final_path = os.path.join(_pdf_dir(), url_hash(url) + ".pdf")
+    temp_path = f"{final_path}.{uuid.uuid4().hex}.part"
+    # iter_content decodes gzip, so Content-Length only checks the size of unencoded bodies
+    expected = None if upstream.headers.get("Content-Encoding") else upstream.headers.get("Content-Length")
+    written = 0
+    complete = False
+    temp_file = open(temp_path, "wb")
+    try:
+        for chunk in upstream.iter_content(CHUNK_SIZE):
+            if not chunk:
+                continue
+            written += len(chunk)
+            if temp_file is not None:
+                if written > Config.MANUAL_PDF_MAX_FILE_BYTES:
+                    temp_file.close()
+                    temp_file = None
+                else:
+                    temp_file.write(chunk)
+            yield chunk
+        complete = expected is None or int(expected) == written
+    finally:
+        upstream.close()
+        if temp_file is not None:
+            temp_file.close()
+        try:
+            if complete and written <= Config.MANUAL_PDF_MAX_FILE_BYTES:
+                os.replace(temp_path, final_path)
+                _record("stored")
+                logger.info(f"Cached manual {url} ({written} bytes)")
+                evict()
+            elif os.path.exists(temp_path):
+                os.remove(temp_path)
+        except OSError as e:
+            logger.error(f"Error storing manual {url} in the cache: {e}")
+
+def _stream_range(upstream):
+    """Yield the body of a partial (206) origin response"""
+    try:
+        for chunk in upstream.iter_content(CHUNK_SIZE):
+            if chunk:
+                yield chunk
+    finally:
+        upstream.close()
+
+def open_manual(url, range_header=None):
+    """
+    Fetch a manual that is not cached from its origin, for streaming to the client
+
+    A full response is cached while it streams. A Range request is passed on to
+    the origin so the viewer gets only the bytes it asked for, and the whole
+    manual is downloaded into the cache in the background.
+
+    Args:
+        url (str): Manual URL
+        range_header (str, optional): The client's Range header
+
+    Returns:
+        tuple: (status code, headers, body iterator), or None if the origin failed or
+            did not answer with a PDF and the client should be redirected to it
+    """
+    try:
+        upstream = open_upstream(url, range_header)
+    except Exception as e:
+        _record("errors")
+        logger.warning(f"Could not fetch manual {url}: {e}")
+        return None
+
+    if not is_pdf_response(upstream, url):
+        upstream.close()
+        _record("not_pdf")
+        return None
+
+    headers = {"Accept-Ranges": "bytes"}
+    if upstream.headers.get("Content-Length") and not upstream.headers.get("Content-Encoding"):
+        headers["Content-Length"] = upstream.headers["Content-Length"]
+
+    if upstream.status_code == 206:
+        _record("range_passthrough")
+        headers["Content-Range"] = upstream.headers.get("Content-Range", "")
+        fill_in_background(url)
+        return 206, headers, _stream_range(upstream)
+
+    return 200, headers, stream_and_store(upstream, url)
+
+def fill_in_background(url):
+    """
+    Download a whole manual into the cache on a background thread
+
+    Used after a Range request missed the cache, so later opens come from disk.
+    A manual already being downloaded by this process is not downloaded again.
+    """
+    key = url_hash(url)
+    with _filling_lock:
+        if key in _filling:
+            return
+        _filling.add(key)
+
+    def fill():
+        try:
+            upstream = open_upstream(url)
+            if not is_pdf_response(upstream, url):
+                upstream.close()
+                return
+            for _ in stream_and_store(upstream, url):
+                pass
+        except Exception as e:
+            _record("errors")
+            logger.error(f"Error caching manual {url}: {e}")
+        finally:
+            with _filling_lock:
+                _filling.discard(key)
+
+    threading.Thread(target=fill, name="manual-cache-fill", daemon=True).start()
+
+def get_cache_stats():
+    """
+    Get manual cache counters and size
+
+    Returns:
+        dict: Hit/miss/store/eviction counters, number of cached manuals and bytes on disk
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    files = 0
+    size = 0
+    if os.path.isdir(_pdf_dir()):
+        for name in os.listdir(_pdf_dir()):
+            if name.endswith(".pdf"):
+                files += 1
+                size += os.path.getsize(os.path.join(_pdf_dir(), name))
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["files"] = files
+    stats["bytes"] = size
+    stats["max_bytes"] = Config.MANUAL_PDF_CACHE_MAX_BYTES
+    stats["proxy_ids"] = len(get_id_store())
+    return stats
+
+def clear_cache():
+    """Remove all cached manuals and proxy ids"""
+    get_id_store().clear()
+    if os.path.isdir(_pdf_dir()):
+        for name in os.listdir(_pdf_dir()):
+            try:
+                os.remove(os.path.join(_pdf_dir(), name))
+            except OSError:
+                pass
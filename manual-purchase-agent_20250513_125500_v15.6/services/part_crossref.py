@@ -0,0 +1,126 @@
+import logging
+import re
+from sqlalchemy import inspect, text
+from models import db, Part, PartAlternate
+from models.part import normalize_part_number
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+def ensure_schema():
+    """
+    Add the normalized part number column to existing databases and backfill it
+
+    db.create_all creates the part_alternates table but does not add columns to
+    the existing parts table, so the column and its index are added here. Parts
+    saved before the column existed get their normalized number and alternates
+    rows filled in. Must run inside an app context.
+    """
+    columns = [column["name"] for column in inspect(db.engine).get_columns("parts")]
+    if "normalized_part_number" not in columns:
+        db.session.execute(text("ALTER TABLE parts ADD COLUMN normalized_part_number VARCHAR(100)"))
+        logger.info("Added normalized_part_number column to parts")
+    db.session.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_parts_normalized_part_number ON parts (normalized_part_number)"
+    ))
+    db.session.commit()
+
+    backfilled = 0
+    while True:
+        parts = Part.query.filter(Part.normalized_part_number.is_(None)).limit(BACKFILL_BATCH_SIZE).all()
+        if not parts:
+            break
+        for part in parts:
+            # Placeholder for numbers that normalize to nothing, so they are not picked up again
+            part.normalized_part_number = normalize_part_number(part.oem_part_number) or ""
+            part.sync_alternates(part.get_alternate_part_numbers())
+        db.session.commit()
+        backfilled += len(parts)
+
+    if backfilled:
+        logger.info(f"Backfilled normalized part numbers for {backfilled} parts")
+
+def looks_like_part_number(value):
+    """Check whether a query is a single part-number-like token rather than a description"""
+    if not value or len(value.split()) != 1:
+        return False
+    normalized = normalize_part_number(value)
+    return bool(normalized) and len(normalized) >= 3 and bool(re.search(r"\d", normalized))
+
+def lookup_part_number(part_number, make=None):
+    """
+    Find the parts known under a part number, as OEM number or as an alternate
+
+    Args:
+        part_number (str): Part number in any spelling (dashes, spaces, case)
+        make (str, optional): Only return parts whose manufacturer contains this
+
+    Returns:
+        list: [{"part": Part, "matched_on": "oem_part_number" | "alternate_part_number"}]
+    """
+    normalized = normalize_part_number(part_number)
+    if not normalized:
+        return []
+
+    oem_query = Part.query.filter(Part.normalized_part_number == normalized)
+    alternate_query = Part.query.join(PartAlternate).filter(PartAlternate.normalized_part_number == normalized)
+    if make:
+        oem_query = oem_query.filter(Part.manufacturer.ilike(f"%{make}%"))
+        alternate_query = alternate_query.filter(Part.manufacturer.ilike(f"%{make}%"))
+
+    matches = [{"part": part, "matched_on": "oem_part_number"} for part in oem_query.all()]
+    seen = {match["part"].id for match in matches}
+    for part in alternate_query.all():
+        if part.id not in seen:
+            seen.add(part.id)
+            matches.append({"part": part, "matched_on": "alternate_part_number"})
+    return matches
+
+def find_interchangeable_parts(part_number, make=None, max_results=10):
+    """
+    List the known interchangeable numbers for a part number
+
+    These are the alternates recorded for parts with this OEM number, plus the
+    parts that list this number as one of their alternates.
+
+    Args:
+        part_number (str): Part number to find interchanges for
+        make (str, optional): Only use parts whose manufacturer contains this
+        max_results (int): Maximum number of results
+
+    Returns:
+        list: Similar part dicts in the same shape as part_resolver.find_similar_parts
+    """
+    normalized = normalize_part_number(part_number)
+    results = []
+    seen = {normalized}
+
+    for match in lookup_part_number(part_number, make):
+        part = match["part"]
+        if match["matched_on"] == "oem_part_number":
+            candidates = [(alternate.part_number, alternate.normalized_part_number) for alternate in part.alternates]
+        else:
+            candidates = [(part.oem_part_number, part.normalized_part_number)]
+
+        for candidate_number, candidate_normalized in candidates:
+            if candidate_normalized in seen:
+                continue
+            seen.add(candidate_normalized)
+            results.append({
+                "part_number": candidate_number,
+                "manufacturer": part.manufacturer,
+                "part_type": "OEM",
+                "description": part.description or part.generic_description,
+                "compatibility": f"Recorded as interchangeable with {part_number}",
+                "confidence": 1.0,
+                "source_url": None,
+                "interchangeable": True,
+                "source": "database"
+            })
+            if len(results) >= max_results:
+                return results
+
+    return results
@@ -2,43 +2,22 @@ import json
 import logging
 import time
 import requests
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from config import Config
 from models import db, Part
-from flask import current_app
-from contextlib import contextmanager
+from models.part import normalize_part_number
+from services import serpapi_client, llm_gateway, single_flight, resolution_cache, prompt_budget, validation_cache
+from services import part_search_index, part_crossref, part_trigram_index, resolution_vector_index, app_context, deadline
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client - handle both new and old API versions
-try:
-    # Try to import using new OpenAI Python client (v1.0.0+)
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-    logger.info("Using new OpenAI client (v1.0.0+)")
-except ImportError:
-    # Fall back to old OpenAI client
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
-    logger.info("Using legacy OpenAI client")
 
-@contextmanager
 def get_app_context():
-    """Get Flask app context for database operations"""
-    try:
-        # Check if we're already in an app context
-        if current_app:
-            yield
-            return
-    except RuntimeError:
-        # We're not in an app context, create one
-        from app import create_app
-        app = create_app()
-        with app.app_context():
-            yield
+    """Get Flask app context for database operations (reusing the process-wide app)"""
+    return app_context.app_context()
 
 def evaluate_part_number_quality(part_number):
     """
@@ -167,48 +146,211 @@ def select_best_part_result(results, description, make=None, model=None):
     
     return best_result
 
-def call_gpt_for_analysis(prompt, max_tokens=32768):
+def call_gpt_for_analysis(prompt, max_tokens=None):
     """
     Call GPT for text analysis with consistent error handling
     
     Args:
         prompt: The prompt to send to GPT
-        max_tokens: Maximum tokens for the response (default 32K for GPT-4.1-Nano)
+        max_tokens: Maximum tokens for the response (default: the call_gpt_for_analysis cap in LLM_MAX_TOKENS)
         
     Returns:
         str: The GPT response text or None on error
     """
     try:
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a technical assistant that extracts specific information from text. Using GPT-4.1-Nano for precise analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.1
-            )
-            return response.choices[0].message.content.strip()
-        else:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a technical assistant that extracts specific information from text. Using GPT-4.1-Nano for precise analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.1
-            )
-            return response.choices[0].message['content'].strip()
+        content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are a technical assistant that extracts specific information from text. Using GPT-4.1-Nano for precise analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.1,
+            purpose="call_gpt_for_analysis"
+        )
+        return content.strip()
     except Exception as e:
         logger.error(f"Error calling GPT for analysis: {str(e)}")
         return None
 
+def _build_database_result(exact_match, validation):
+    """
+    Build the database_result section of a resolve response
+    
+    A fuzzy description match reports its trigram similarity as its confidence
+    and match_type "fuzzy". A full-text match reports match_type "full_text" and the
+    trigram similarity of its description as its confidence; its match_score is the
+    bm25 rank. Every other database match is "exact" with confidence 1.0.
+    """
+    match_score = getattr(exact_match, "match_score", None)
+    matched_on = getattr(exact_match, "matched_on", "description")
+    if matched_on == "fuzzy_description":
+        match_type, confidence = "fuzzy", round(match_score or 0.0, 3)
+    elif matched_on == "full_text":
+        match_type, confidence = "full_text", getattr(exact_match, "match_similarity", 0.0)
+    else:
+        match_type, confidence = "exact", 1.0
+    return {
+        "found": True,
+        "oem_part_number": exact_match.oem_part_number,
+        "manufacturer": exact_match.manufacturer,
+        "description": exact_match.description,
+        "confidence": confidence,
+        "alternate_part_numbers": exact_match.get_alternate_part_numbers() if exact_match.alternate_part_numbers else [],
+        "match_score": match_score,
+        "matched_on": matched_on,
+        "match_type": match_type,
+        "serpapi_validation": validation
+    }
+
+def _run_manual_leg(description, make=None, model=None, year=None, bypass_cache=False):
+    """
+    Run the manual search leg and validate its part number as soon as it is known
+    
+    Returns:
+        dict: The manual_search_result section of a resolve response
+    """
+    manual_result = find_part_in_manuals(description, make, model, year, bypass_cache)
+    # Check if we got a valid part number (not empty, not placeholder)
+    if (manual_result and 
+        manual_result.get("oem_part_number") and 
+        not manual_result.get("placeholder_rejected", False)):
+        # Validate with SerpAPI
+        validation = validate_part_with_serpapi(manual_result["oem_part_number"], make, model, description, bypass_cache)
+        return {
+            "found": True,
+            "oem_part_number": manual_result["oem_part_number"],
+            "manufacturer": manual_result.get("manufacturer"),
+            "description": manual_result.get("description"),
+            "confidence": manual_result.get("confidence", 0),
+            "manual_source": manual_result.get("manual_source", "Unknown manual"),
+            "alternate_part_numbers": manual_result.get("alternate_part_numbers", []),
+            "serpapi_validation": validation
+        }
+    
+    return {
+        "found": False,
+        "error": manual_result.get("error") if manual_result and isinstance(manual_result, dict) else "No manual found",
+        "confidence": 0
+    }
+
+def _run_web_leg(description, make=None, model=None, year=None, bypass_cache=False):
+    """
+    Run the AI web search leg (dual search) and validate its part number as soon as it is known
+    
+    Returns:
+        dict: The ai_web_search_result section of a resolve response
+    """
+    from services.dual_search import find_part_with_dual_search
+    web_result = find_part_with_dual_search(description, make, model, year, bypass_cache)
+    if web_result and web_result.get("oem_part_number"):
+        # Validate with SerpAPI
+        validation = validate_part_with_serpapi(web_result["oem_part_number"], make, model, description, bypass_cache)
+        return {
+            "found": True,
+            "oem_part_number": web_result["oem_part_number"],
+            "manufacturer": web_result.get("manufacturer"),
+            "description": web_result.get("description"),
+            "confidence": web_result.get("confidence", 0),
+            "sources": web_result.get("sources", []),
+            "alternate_part_numbers": web_result.get("alternate_part_numbers", []),
+            "serpapi_validation": validation,
+            # NEW: Dual search specific fields
+            "selected_method": web_result.get("selected_method"),
+            "arbitrator_reasoning": web_result.get("arbitrator_reasoning"),
+            "arbitrator_analysis": web_result.get("arbitrator_analysis"),
+            "serpapi_count": web_result.get("serpapi_count", 0),
+            "gpt_web_success": web_result.get("gpt_web_success", False),
+            "source": "dual_search"
+        }
+    
+    return {
+        "found": False,
+        "error": web_result.get("error") if web_result and isinstance(web_result, dict) else "No results found",
+        "confidence": 0,
+        "serpapi_count": web_result.get("serpapi_count", 0) if web_result else 0,
+        "gpt_web_success": web_result.get("gpt_web_success", False) if web_result else False,
+        "source": "dual_search"
+    }
+
+# Sections of a resolve response reported to on_stage callbacks, in pipeline order
+RESOLVE_STAGES = ("database_result", "manual_search_result", "ai_web_search_result", "comparison", "similar_parts")
+
+def _emit_stage(on_stage, stage, payload):
+    """Report a finished stage to the caller, never letting a callback break the resolution"""
+    if on_stage is None:
+        return
+    try:
+        on_stage(stage, payload)
+    except Exception as e:
+        logger.error(f"Error in resolve stage callback for {stage}: {e}")
+
+def _similar_parts_likely(database_result):
+    """
+    Guess early whether the similar-parts decision tree will fire
+    
+    The tree only stops when the selected result has alternate part numbers and
+    passed validation, so a database hit with alternates is the one cheap signal
+    that the speculative search would be wasted.
+    """
+    if not database_result or not database_result.get("found"):
+        return True
+    return not database_result.get("alternate_part_numbers")
+
+def _skipped_validation(part_number=None, make=None, model=None):
+    """Validation result for a part whose SerpAPI validation did not fit in the deadline (a cached outcome if there is one)"""
+    cached = validation_cache.get(part_number, make, model) if part_number else None
+    if cached is not None:
+        return cached["validation"]
+    return {"is_valid": False, "confidence_score": 0.0, "assessment": "Validation skipped: request deadline", "incomplete": True}
+
+def _note_cut_short(request_deadline, stage, result):
+    """Record a leg that came back empty because the request deadline ran out while it ran"""
+    if request_deadline is not None and request_deadline.expired() and (not result or result.get("error")):
+        request_deadline.drop(stage, "deadline_exceeded")
+
+# Legs of a resolve in priority order; a leg that clears the short-circuit gate makes the legs after it unnecessary
+LEG_PRIORITY = ("database_result", "manual_search_result", "ai_web_search_result")
+# Database matches ranked by similarity rather than matched literally; they never short-circuit
+APPROXIMATE_DATABASE_MATCHES = ("full_text", "fuzzy_description")
+
+def _short_circuits(result):
+    """
+    Check whether a leg's result clears the short-circuit gate
+    
+    The result must be found, have at least RESOLVE_SHORT_CIRCUIT_MIN_CONFIDENCE,
+    pass SerpAPI validation with at least RESOLVE_SHORT_CIRCUIT_MIN_VALIDATION, look
+    like a real part number and (by default) come with alternate part numbers.
+    select_best_part_result then all but always picks it, so lower-priority legs
+    can be skipped. Database results found by full-text or fuzzy description
+    search never clear the gate: their confidence is not a real match score.
+    """
+    if not Config.RESOLVE_SHORT_CIRCUIT_ENABLED or not result or not result.get("found"):
+        return False
+    if result.get("matched_on") in APPROXIMATE_DATABASE_MATCHES:
+        return False
+    validation = result.get("serpapi_validation") or {}
+    if not validation.get("is_valid") or (validation.get("confidence_score") or 0) < Config.RESOLVE_SHORT_CIRCUIT_MIN_VALIDATION:
+        return False
+    if (result.get("confidence") or 0) < Config.RESOLVE_SHORT_CIRCUIT_MIN_CONFIDENCE:
+        return False
+    if Config.RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES and not result.get("alternate_part_numbers"):
+        return False
+    return evaluate_part_number_quality(result.get("oem_part_number")) >= 0.8
+
+def _skip_leg(response, stage, satisfied_by):
+    """Record a leg that was skipped or cancelled because a higher-priority leg already cleared the gate"""
+    logger.info(f"Skipping {stage}: {satisfied_by} already cleared the short-circuit gate")
+    response.setdefault("skipped_legs", []).append({
+        "stage": stage,
+        "reason": "short_circuit",
+        "satisfied_by": satisfied_by
+    })
+
+@single_flight.coalesce("resolve_part_name", ignore=("parallel", "on_stage"))
 def resolve_part_name(description, make=None, model=None, year=None, 
                   use_database=True, use_manual_search=True, use_web_search=True, save_results=True,
-                  bypass_cache=False):
+                  bypass_cache=False, parallel=False, on_stage=None, deadline_ms=None):
     """
     Enhanced part resolution with SerpAPI validation.
     Resolves a generic part description to OEM part numbers using:
@@ -227,6 +369,22 @@ def resolve_part_name(description, make=None, model=None, year=None,
         use_web_search (bool, optional): Whether to search on the web. Defaults to True.
         save_results (bool, optional): Whether to save results to database. Defaults to True.
         bypass_cache (bool, optional): Whether to bypass all caching and perform fresh searches. Defaults to False.
+            Cached responses are returned with from_cache=True and cached_at. A query whose wording
+            agrees with an earlier validated resolution of the same make, model and year reuses it
+            once its part number validates again; other similar resolutions are only reported
+            (see similar_resolution).
+        parallel (bool, optional): Run the manual and web legs concurrently, validating each
+            as soon as it returns and prefetching the similar-parts search. Defaults to False.
+        on_stage (callable, optional): Called as on_stage(stage, payload) on the calling thread
+            as soon as each section of the response is ready (database_result, manual_search_result,
+            ai_web_search_result, comparison, similar_parts).
+        deadline_ms (int, optional): Time budget in milliseconds. Every external call gets at most
+            the remaining budget, stages that cannot finish in time are skipped or cut short and
+            listed in dropped_stages. Responses with dropped stages are not cached.
+        
+    Once a leg's result clears the short-circuit gate (RESOLVE_SHORT_CIRCUIT_*), the
+    lower-priority legs are skipped, or cancelled if running in parallel, and listed in
+    skipped_legs.
         
     Returns:
         dict: Enhanced response with separate AI/manual results and assessments
@@ -249,87 +407,164 @@ def resolve_part_name(description, make=None, model=None, year=None,
         }
     }
     
+    # Serve repeat resolutions from the resolve cache (skipped if bypass_cache is True)
+    if not bypass_cache:
+        cached_response = resolution_cache.get(description, make, model, year,
+                                               use_database, use_manual_search, use_web_search)
+        if cached_response is not None:
+            for stage in RESOLVE_STAGES:
+                if cached_response.get(stage) is not None:
+                    _emit_stage(on_stage, stage, cached_response[stage])
+            return cached_response
+    
+    # Every stage and external call below shares this deadline, including worker threads
+    request_deadline = deadline.from_ms(deadline_ms) or deadline.current()
+    deadline_token = deadline.activate(request_deadline)
+    
+    executor = None
     try:
         logger.info(f"Resolving part: {description} for {make} {model} {year}")
-        logger.info(f"Search toggles: DB={use_database}, Manual={use_manual_search}, Web={use_web_search}, Save={save_results}, Bypass Cache={bypass_cache}")
+        logger.info(f"Search toggles: DB={use_database}, Manual={use_manual_search}, Web={use_web_search}, Save={save_results}, Bypass Cache={bypass_cache}, Parallel={parallel}")
         logger.info(f"Response initialized: {response is not None}")
         
         # Check for exact match first (skip if bypass_cache is True)
+        # The lookup itself stays on this thread because it needs the app context
+        exact_match = None
         if use_database and not bypass_cache:
             exact_match = find_exact_match(description, make, model, year)
             if exact_match:
-                logger.info(f"Found exact match in database: {exact_match.oem_part_number}")
-                response["database_result"] = {
-                    "found": True,
-                    "oem_part_number": exact_match.oem_part_number,
-                    "manufacturer": exact_match.manufacturer,
-                    "description": exact_match.description,
-                    "confidence": 1.0,
-                    "alternate_part_numbers": exact_match.get_alternate_part_numbers() if exact_match.alternate_part_numbers else [],
-                    "serpapi_validation": validate_part_with_serpapi(exact_match.oem_part_number, make, model, description, bypass_cache)
-                }
+                logger.info(f"Found database match: {exact_match.oem_part_number} ({getattr(exact_match, 'matched_on', 'description')})")
         elif bypass_cache:
             logger.info("Bypassing database cache due to bypass_cache=True")
         
-        # Execute manual search if requested
-        if use_manual_search:
-            manual_result = find_part_in_manuals(description, make, model, year, bypass_cache)
-            # Check if we got a valid part number (not empty, not placeholder)
-            if (manual_result and 
-                manual_result.get("oem_part_number") and 
-                not manual_result.get("placeholder_rejected", False)):
-                # Validate with SerpAPI
-                validation = validate_part_with_serpapi(manual_result["oem_part_number"], make, model, description, bypass_cache)
-                response["manual_search_result"] = {
-                    "found": True,
-                    "oem_part_number": manual_result["oem_part_number"],
-                    "manufacturer": manual_result.get("manufacturer"),
-                    "description": manual_result.get("description"),
-                    "confidence": manual_result.get("confidence", 0),
-                    "manual_source": manual_result.get("manual_source", "Unknown manual"),
-                    "alternate_part_numbers": manual_result.get("alternate_part_numbers", []),
-                    "serpapi_validation": validation
-                }
-            else:
-                response["manual_search_result"] = {
-                    "found": False,
-                    "error": manual_result.get("error") if manual_result and isinstance(manual_result, dict) else "No manual found",
-                    "confidence": 0
-                }
-        
-        # Execute AI web search if requested (using new dual search approach)
-        if use_web_search:
-            from services.dual_search import find_part_with_dual_search
-            web_result = find_part_with_dual_search(description, make, model, year, bypass_cache)
-            if web_result and web_result.get("oem_part_number"):
-                # Validate with SerpAPI
-                validation = validate_part_with_serpapi(web_result["oem_part_number"], make, model, description, bypass_cache)
-                response["ai_web_search_result"] = {
-                    "found": True,
-                    "oem_part_number": web_result["oem_part_number"],
-                    "manufacturer": web_result.get("manufacturer"),
-                    "description": web_result.get("description"),
-                    "confidence": web_result.get("confidence", 0),
-                    "sources": web_result.get("sources", []),
-                    "alternate_part_numbers": web_result.get("alternate_part_numbers", []),
-                    "serpapi_validation": validation,
-                    # NEW: Dual search specific fields
-                    "selected_method": web_result.get("selected_method"),
-                    "arbitrator_reasoning": web_result.get("arbitrator_reasoning"),
-                    "arbitrator_analysis": web_result.get("arbitrator_analysis"),
-                    "serpapi_count": web_result.get("serpapi_count", 0),
-                    "gpt_web_success": web_result.get("gpt_web_success", False),
-                    "source": "dual_search"
-                }
-            else:
-                response["ai_web_search_result"] = {
-                    "found": False,
-                    "error": web_result.get("error") if web_result and isinstance(web_result, dict) else "No results found",
-                    "confidence": 0,
-                    "serpapi_count": web_result.get("serpapi_count", 0) if web_result else 0,
-                    "gpt_web_success": web_result.get("gpt_web_success", False) if web_result else False,
-                    "source": "dual_search"
+        # Reuse a past resolution of a differently worded query for the same make and model
+        if not exact_match and not bypass_cache and (use_manual_search or use_web_search):
+            prior = resolution_vector_index.find_prior_resolution(description, make, model, year)
+            if prior:
+                response["similar_resolution"] = {
+                    "description": prior["description"],
+                    "year": prior.get("year"),
+                    "similarity": prior["similarity"],
+                    "resolved_at": datetime.utcfromtimestamp(prior["created_at"]).isoformat() + "Z",
+                    "oem_part_number": prior["result"].get("oem_part_number"),
+                    "reused": False
                 }
+            # Only agreeing descriptions of the same year are reused, and only if the part still validates
+            if prior and prior["reusable"] and deadline.fits("database_validation"):
+                # Judge the fit to this description again rather than reuse the prior verdict
+                validation = validate_part_with_serpapi(prior["result"]["oem_part_number"], make, model, description,
+                                                        bypass_cache, reuse_verdict=False)
+                if validation.get("is_valid"):
+                    response["recommended_result"] = dict(prior["result"], serpapi_validation=validation)
+                    response["recommendation_reason"] = (
+                        f"Reused the earlier resolution of '{prior['description']}' "
+                        f"(similarity {prior['similarity']:.2f}, descriptions agree, validated again)"
+                    )
+                    response["similar_resolution"]["reused"] = True
+                    response["similar_parts_triggered"] = False
+                    # Not stored in the resolve cache: a reused answer is not a fresh resolution
+                    return response
+                logger.info(f"Prior resolution {prior['result']['oem_part_number']} no longer validates, resolving normally")
+        
+        if parallel:
+            executor = ThreadPoolExecutor(max_workers=Config.RESOLVE_PARALLEL_WORKERS, thread_name_prefix="resolve")
+            
+            stage_futures = {}
+            cancel_events = {}
+            satisfied_by = None
+            if exact_match:
+                if deadline.fits("database_validation"):
+                    stage_futures[deadline.submit(executor, validate_part_with_serpapi, exact_match.oem_part_number, make, model, description, bypass_cache)] = "database_result"
+                else:
+                    response["database_result"] = _build_database_result(exact_match, _skipped_validation(exact_match.oem_part_number, make, model))
+                    _emit_stage(on_stage, "database_result", response["database_result"])
+                    if _short_circuits(response["database_result"]):
+                        satisfied_by = "database_result"
+            for stage, enabled, leg in (("manual_search_result", use_manual_search, _run_manual_leg),
+                                        ("ai_web_search_result", use_web_search, _run_web_leg)):
+                if not enabled:
+                    continue
+                if satisfied_by:
+                    _skip_leg(response, stage, satisfied_by)
+                elif deadline.fits(stage):
+                    # Legs can be cancelled while they run if a higher-priority leg clears the gate first
+                    future, cancel_events[future] = deadline.submit_cancellable(executor, leg, description, make, model, year, bypass_cache)
+                    stage_futures[future] = stage
+            
+            # Speculatively fetch the similar-parts search results while the legs run
+            similar_future = None
+            preliminary_db_result = _build_database_result(exact_match, None) if exact_match else None
+            similar_budget = Config.DEADLINE_STAGE_MIN_SECONDS.get("similar_parts", 0)
+            if _similar_parts_likely(preliminary_db_result) and deadline.remaining(similar_budget) >= similar_budget:
+                logger.info("Prefetching similar parts search results")
+                similar_future = deadline.submit(executor, _search_similar_parts, description, make, model, year, bypass_cache)
+            
+            def fill_stage(future):
+                stage = stage_futures[future]
+                if stage == "database_result":
+                    response[stage] = _build_database_result(exact_match, future.result())
+                else:
+                    response[stage] = future.result()
+                _emit_stage(on_stage, stage, response[stage])
+            
+            def cancel_leg(future):
+                # A leg that has not started never runs; a running one stops at its next external call
+                future.cancel()
+                if future in cancel_events:
+                    cancel_events[future].set()
+            
+            # Fill in each leg in the order the legs finish, until the deadline. A leg that
+            # clears the short-circuit gate cancels the lower-priority legs still running.
+            pending = set(stage_futures)
+            while pending:
+                done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+                if not done:
+                    for future in pending:
+                        if future.done():
+                            fill_stage(future)
+                        else:
+                            cancel_leg(future)
+                            request_deadline.drop(stage_futures[future], "deadline_exceeded")
+                    break
+                for future in sorted(done, key=lambda finished: LEG_PRIORITY.index(stage_futures[finished])):
+                    fill_stage(future)
+                    stage = stage_futures[future]
+                    if not _short_circuits(response[stage]):
+                        continue
+                    for other in [f for f in pending if LEG_PRIORITY.index(stage_futures[f]) > LEG_PRIORITY.index(stage)]:
+                        pending.discard(other)
+                        cancel_leg(other)
+                        _skip_leg(response, stage_futures[other], stage)
+        else:
+            similar_future = None
+            satisfied_by = None
+            if exact_match:
+                if deadline.fits("database_validation"):
+                    validation = validate_part_with_serpapi(exact_match.oem_part_number, make, model, description, bypass_cache)
+                else:
+                    validation = _skipped_validation(exact_match.oem_part_number, make, model)
+                response["database_result"] = _build_database_result(exact_match, validation)
+                _emit_stage(on_stage, "database_result", response["database_result"])
+                if _short_circuits(response["database_result"]):
+                    satisfied_by = "database_result"
+            
+            # Execute manual search if requested
+            if use_manual_search and satisfied_by:
+                _skip_leg(response, "manual_search_result", satisfied_by)
+            elif use_manual_search and deadline.fits("manual_search_result"):
+                response["manual_search_result"] = _run_manual_leg(description, make, model, year, bypass_cache)
+                _note_cut_short(request_deadline, "manual_search_result", response["manual_search_result"])
+                _emit_stage(on_stage, "manual_search_result", response["manual_search_result"])
+                if _short_circuits(response["manual_search_result"]):
+                    satisfied_by = "manual_search_result"
+            
+            # Execute AI web search if requested (using new dual search approach)
+            if use_web_search and satisfied_by:
+                _skip_leg(response, "ai_web_search_result", satisfied_by)
+            elif use_web_search and deadline.fits("ai_web_search_result"):
+                response["ai_web_search_result"] = _run_web_leg(description, make, model, year, bypass_cache)
+                _note_cut_short(request_deadline, "ai_web_search_result", response["ai_web_search_result"])
+                _emit_stage(on_stage, "ai_web_search_result", response["ai_web_search_result"])
         
         # Add comparison if both methods found results
         manual_result = response.get("manual_search_result") or {} if response else {}
@@ -361,6 +596,7 @@ def resolve_part_name(description, make=None, model=None, year=None,
                 )
             
             response["comparison"] = comparison
+            _emit_stage(on_stage, "comparison", comparison)
         
         # Intelligently select the best result
         all_results = {
@@ -436,14 +672,23 @@ def resolve_part_name(description, make=None, model=None, year=None,
             should_search_similar = True
             logger.info("All search results failed validation or are problematic - searching similar parts")
         
-        # Search similar parts if decision tree indicates we should
-        if should_search_similar:
+        # Search similar parts if decision tree indicates we should (and the deadline allows)
+        if should_search_similar and deadline.fits("similar_parts"):
             try:
+                prefetched_results = None
+                if similar_future:
+                    try:
+                        prefetched_results = similar_future.result()
+                    except Exception as e:
+                        # find_similar_parts runs its own search when nothing was prefetched
+                        logger.warning(f"Similar parts prefetch failed, searching again: {e}")
                 similar_parts = find_similar_parts(description, make, model, year, 
                                                  failed_part_number=best_result.get('oem_part_number') if best_result else None, 
-                                                 max_results=5)
+                                                 max_results=5, bypass_cache=bypass_cache,
+                                                 search_results=prefetched_results)
                 response["similar_parts_triggered"] = True
                 response["similar_parts"] = similar_parts
+                _emit_stage(on_stage, "similar_parts", similar_parts)
                 
                 # NEW: Don't override good results just because similar parts were found
                 if all_results_invalid or should_trigger_similar_parts:
@@ -486,6 +731,17 @@ def resolve_part_name(description, make=None, model=None, year=None,
                     )
                 except Exception as e:
                     logger.error(f"Error saving part match: {e}")
+        
+        # Report what the deadline cut; partial responses are not cached
+        if request_deadline is not None:
+            response["deadline_ms"] = request_deadline.budget_ms
+            if request_deadline.dropped_stages:
+                response["dropped_stages"] = list(request_deadline.dropped_stages)
+        
+        if not response.get("dropped_stages"):
+            resolution_cache.put(response, description, make, model, year,
+                                 use_database, use_manual_search, use_web_search)
+        resolution_vector_index.add_resolution(description, make, model, year, response.get("recommended_result"))
     
         return response
     except Exception as e:
@@ -509,6 +765,11 @@ def resolve_part_name(description, make=None, model=None, year=None,
             },
             "error": str(e)
         }
+    finally:
+        deadline.deactivate(deadline_token)
+        if executor:
+            # Drop a speculative similar-parts prefetch that turned out not to be needed
+            executor.shutdown(wait=False, cancel_futures=True)
 
 def find_part_with_dual_search(description, make=None, model=None, year=None, bypass_cache=False):
     """
@@ -530,7 +791,6 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
     logger.info(f"Searching for part via web: {description} for {make} {model} {year}")
     
     try:
-        import requests
         from config import Config
         
         # Construct search query for finding OEM part numbers
@@ -553,18 +813,9 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            import time
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache for web search: {description}")
-        
         # Make the request
         try:
-            api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-            api_response.raise_for_status()
-            results = api_response.json()
+            results = serpapi_client.search(search_params, family="part_search", bypass_cache=bypass_cache)
         except requests.exceptions.Timeout:
             logger.error("SerpAPI request timed out after 30 seconds")
             return {
@@ -596,7 +847,7 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
         
         # Process organic results
         if "organic_results" in results:
-            for idx, result in enumerate(results.get("organic_results", [])[:5]):
+            for idx, result in enumerate(prompt_budget.compact_results(results.get("organic_results", [])[:5], "find_part_with_dual_search", url_key="link")):
                 search_context += f"Source {idx+1}: {result.get('title', 'Unknown')}\n"
                 search_context += f"URL: {result.get('link', 'No URL')}\n"
                 search_context += f"Description: {result.get('snippet', 'No description')}\n\n"
@@ -658,31 +909,16 @@ def find_part_with_dual_search(description, make=None, model=None, year=None, by
         """
         
         # Generate completion with GPT-4.1-Nano - handle both client versions
-        if USING_NEW_OPENAI_CLIENT:
-            ai_response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts specialist who analyzes search results to find precise OEM part numbers. You carefully extract information from search results and only provide accurate manufacturer part numbers that you find in the provided sources. You MUST ensure the part type matches what was requested - if user asks for a fan, find a fan, not some other component. Using GPT-4.1-Nano for comprehensive analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            # Get the raw response content
-            raw_content = ai_response.choices[0].message.content
-        else:
-            import openai
-            ai_response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts specialist who analyzes search results to find precise OEM part numbers. You carefully extract information from search results and only provide accurate manufacturer part numbers that you find in the provided sources. You MUST ensure the part type matches what was requested - if user asks for a fan, find a fan, not some other component. Using GPT-4.1-Nano for comprehensive analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            # Get the raw response content
-            raw_content = ai_response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are a parts specialist who analyzes search results to find precise OEM part numbers. You carefully extract information from search results and only provide accurate manufacturer part numbers that you find in the provided sources. You MUST ensure the part type matches what was requested - if user asks for a fan, find a fan, not some other component. Using GPT-4.1-Nano for comprehensive analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="find_part_with_dual_search"
+        )
         
         # Log the raw response from GPT
         print("\n========= GPT WEB SEARCH RESPONSE =========")
@@ -757,7 +993,6 @@ def find_part_in_manuals(description, make=None, model=None, year=None, bypass_c
     logger.info(f"Searching manuals for: {description} - {make} {model} {year}")
     
     try:
-        import requests
         from config import Config
         
         # Construct manual search query
@@ -781,18 +1016,9 @@ def find_part_in_manuals(description, make=None, model=None, year=None, bypass_c
             "tbm": "web"  # Include PDFs and documents
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            import time
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache for manual search: {description}")
-        
         # Make the request
         try:
-            api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-            api_response.raise_for_status()
-            results = api_response.json()
+            results = serpapi_client.search(search_params, family="manual_search", bypass_cache=bypass_cache)
         except requests.exceptions.Timeout:
             logger.error("SerpAPI manual search timed out")
             return {"error": "Manual search timeout", "oem_part_number": None}
@@ -806,7 +1032,7 @@ def find_part_in_manuals(description, make=None, model=None, year=None, bypass_c
         
         # Process organic results
         if "organic_results" in results:
-            for idx, result in enumerate(results.get("organic_results", [])[:8]):
+            for idx, result in enumerate(prompt_budget.compact_results(results.get("organic_results", [])[:8], "find_part_in_manuals", url_key="link")):
                 title = result.get('title', 'Unknown')
                 url = result.get('link', 'No URL')
                 snippet = result.get('snippet', 'No description')
@@ -863,29 +1089,16 @@ def find_part_in_manuals(description, make=None, model=None, year=None, bypass_c
         """
         
         # Get GPT manual analysis
-        if USING_NEW_OPENAI_CLIENT:
-            ai_response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a technical manual specialist who extracts precise OEM part numbers from service manuals and technical documentation. You carefully analyze manual content and only extract verified part numbers from official sources. Using GPT-4.1-Nano for comprehensive manual analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message.content
-        else:
-            import openai
-            ai_response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a technical manual specialist who extracts precise OEM part numbers from service manuals and technical documentation. You carefully analyze manual content and only extract verified part numbers from official sources. Using GPT-4.1-Nano for comprehensive manual analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are a technical manual specialist who extracts precise OEM part numbers from service manuals and technical documentation. You carefully analyze manual content and only extract verified part numbers from official sources. Using GPT-4.1-Nano for comprehensive manual analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="find_part_in_manuals"
+        )
         
         # Parse the manual analysis result
         manual_result = json.loads(raw_content)
@@ -920,6 +1133,14 @@ def find_exact_match(description, make=None, model=None, year=None):
     """
     Find exact part matches in the database
     
+    A description that is a single part number is answered from the indexed
+    OEM and alternate part numbers first. Otherwise the full-text index is used
+    when it is available, so every word of the description must appear in the
+    description, generic description, manufacturer or alternate part numbers,
+    and the best-ranked part wins. Other databases fall back to LIKE matching.
+    If neither matches, the most similar stored description above
+    PART_FUZZY_MATCH_THRESHOLD is used.
+    
     Args:
         description (str): Part description to search for
         make (str, optional): Equipment make
@@ -927,36 +1148,50 @@ def find_exact_match(description, make=None, model=None, year=None):
         year (str, optional): Equipment year
         
     Returns:
-        Part: Database Part object if found, None otherwise
+        Part: Database Part object if found (with a match_score attribute), None otherwise
     """
     try:
         with get_app_context():
-            # Try exact description match first
-            query = Part.query.filter(Part.description.ilike(f"%{description}%"))
-            
-            if make:
-                query = query.filter(Part.manufacturer.ilike(f"%{make}%"))
+            if part_crossref.looks_like_part_number(description):
+                matches = part_crossref.lookup_part_number(description, make)
+                if matches:
+                    best = matches[0]
+                    best["part"].matched_on = best["matched_on"]
+                    logger.info(f"Found database part number match: {best['part'].oem_part_number} ({best['matched_on']})")
+                    return best["part"]
             
-            # Try to find exact match
-            exact_match = query.first()
-            
-            if exact_match:
-                logger.info(f"Found exact database match: {exact_match.oem_part_number}")
-                return exact_match
-            
-            # Try fuzzy matching on description
-            fuzzy_query = Part.query.filter(
-                Part.description.ilike(f"%{description.split()[0]}%")
-            )
-            
-            if make:
-                fuzzy_query = fuzzy_query.filter(Part.manufacturer.ilike(f"%{make}%"))
-            
-            fuzzy_match = fuzzy_query.first()
+            if part_search_index.is_available():
+                matches = part_search_index.search_parts(description, make, limit=1)
+                if matches:
+                    best = matches[0]
+                    best["part"].match_score = best["score"]
+                    best["part"].matched_on = "full_text"
+                    best["part"].match_similarity = part_trigram_index.part_similarity(description, best["part"])
+                    logger.info(f"Found full-text database match: {best['part'].oem_part_number} (score {best['score']})")
+                    return best["part"]
+            else:
+                # Try exact description match first
+                query = Part.query.filter(Part.description.ilike(f"%{description}%"))
+                
+                if make:
+                    query = query.filter(Part.manufacturer.ilike(f"%{make}%"))
+                
+                # Try to find exact match
+                exact_match = query.first()
+                
+                if exact_match:
+                    logger.info(f"Found exact database match: {exact_match.oem_part_number}")
+                    return exact_match
             
-            if fuzzy_match:
-                logger.info(f"Found fuzzy database match: {fuzzy_match.oem_part_number}")
-                return fuzzy_match
+            # Try fuzzy matching on description trigrams
+            candidates = part_trigram_index.search(description, make, limit=1)
+            if candidates:
+                fuzzy_match = Part.query.get(candidates[0]["part_id"])
+                if fuzzy_match:
+                    fuzzy_match.match_score = candidates[0]["score"]
+                    fuzzy_match.matched_on = "fuzzy_description"
+                    logger.info(f"Found fuzzy database match: {fuzzy_match.oem_part_number} (similarity {candidates[0]['score']})")
+                    return fuzzy_match
                 
             return None
             
@@ -964,7 +1199,47 @@ def find_exact_match(description, make=None, model=None, year=None):
         logger.error(f"Error in database search: {e}")
         return None
 
-def find_similar_parts(description, make=None, model=None, year=None, failed_part_number=None, max_results=10):
+def _search_similar_parts(description, make=None, model=None, year=None, bypass_cache=False):
+    """
+    Run the SerpAPI search behind find_similar_parts
+    
+    The query does not depend on the failed part number, so it can be started
+    before the other search legs finish.
+    
+    Returns:
+        dict: SerpAPI results, or None if the search failed
+    """
+    from config import Config
+    
+    # Construct similar parts search query
+    search_query = f"{description} compatible alternate OEM part"
+    if make:
+        search_query += f" {make}"
+    if model:
+        search_query += f" {model}"
+    if year:
+        search_query += f" {year}"
+    search_query += " replacement interchange"
+    
+    # Search parameters for SerpAPI
+    search_params = {
+        "api_key": Config.SERPAPI_KEY,
+        "engine": "google",
+        "q": search_query,
+        "num": 12,
+        "gl": "us",
+        "hl": "en"
+    }
+    
+    # Make the request
+    try:
+        return serpapi_client.search(search_params, family="similar_parts", bypass_cache=bypass_cache)
+    except Exception as e:
+        logger.error(f"Error searching similar parts with SerpAPI: {e}")
+        return None
+
+def find_similar_parts(description, make=None, model=None, year=None, failed_part_number=None, max_results=10, bypass_cache=False,
+                       search_results=None):
     """
     Find similar/compatible parts using SerpAPI + GPT-4.1-Nano analysis
     
@@ -975,6 +1250,8 @@ def find_similar_parts(description, make=None, model=None, year=None, failed_par
         year (str, optional): Equipment year
         failed_part_number (str, optional): Part number that failed validation
         max_results (int, optional): Maximum number of results to return
+        bypass_cache (bool, optional): Whether to bypass SerpAPI cache
+        search_results (dict, optional): Prefetched SerpAPI results from _search_similar_parts
         
     Returns:
         list: List of similar parts with compatibility information
@@ -985,36 +1262,10 @@ def find_similar_parts(description, make=None, model=None, year=None, failed_par
     logger.info(f"Searching for similar parts: {description} - {make} {model} {year}")
     
     try:
-        import requests
-        from config import Config
-        
-        # Construct similar parts search query
-        search_query = f"{description} compatible alternate OEM part"
-        if make:
-            search_query += f" {make}"
-        if model:
-            search_query += f" {model}"
-        if year:
-            search_query += f" {year}"
-        search_query += " replacement interchange"
-        
-        # Search parameters for SerpAPI
-        search_params = {
-            "api_key": Config.SERPAPI_KEY,
-            "engine": "google",
-            "q": search_query,
-            "num": 12,
-            "gl": "us",
-            "hl": "en"
-        }
-        
-        # Make the request
-        try:
-            api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-            api_response.raise_for_status()
-            results = api_response.json()
-        except Exception as e:
-            logger.error(f"Error searching similar parts with SerpAPI: {e}")
+        results = search_results
+        if results is None:
+            results = _search_similar_parts(description, make, model, year, bypass_cache)
+        if results is None:
             return []
         
         # Extract search results for GPT analysis
@@ -1023,7 +1274,7 @@ def find_similar_parts(description, make=None, model=None, year=None, failed_par
         
         # Process organic results
         if "organic_results" in results:
-            for idx, result in enumerate(results.get("organic_results", [])[:10]):
+            for idx, result in enumerate(prompt_budget.compact_results(results.get("organic_results", [])[:10], "find_similar_parts", url_key="link")):
                 search_context += f"Source {idx+1}: {result.get('title', 'Unknown')}\n"
                 search_context += f"URL: {result.get('link', 'No URL')}\n"
                 search_context += f"Content: {result.get('snippet', 'No description')}\n\n"
@@ -1073,29 +1324,16 @@ def find_similar_parts(description, make=None, model=None, year=None, failed_par
         """
         
         # Get GPT similar parts analysis
-        if USING_NEW_OPENAI_CLIENT:
-            ai_response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts compatibility specialist who identifies similar and interchangeable parts from search results. You carefully analyze compatibility information and provide accurate part alternatives. Using GPT-4.1-Nano for comprehensive compatibility analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message.content
-        else:
-            import openai
-            ai_response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts compatibility specialist who identifies similar and interchangeable parts from search results. You carefully analyze compatibility information and provide accurate part alternatives. Using GPT-4.1-Nano for comprehensive compatibility analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are a parts compatibility specialist who identifies similar and interchangeable parts from search results. You carefully analyze compatibility information and provide accurate part alternatives. Using GPT-4.1-Nano for comprehensive compatibility analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="find_similar_parts"
+        )
         
         # Parse the similar parts analysis result
         similar_result = json.loads(raw_content)
@@ -1112,16 +1350,24 @@ def find_similar_parts(description, make=None, model=None, year=None, failed_par
         logger.error(f"Error in similar parts search: {e}")
         return []
 
-def validate_part_with_serpapi(part_number, make=None, model=None, original_description=None, bypass_cache=False):
+def validate_part_with_serpapi(part_number, make=None, model=None, original_description=None, bypass_cache=False,
+                               reuse_verdict=True):
     """
     Validate a part number using SerpAPI search and GPT-4.1-Nano analysis
     
+    Completed validations are cached per normalized part number, make and model, so a
+    part validated before for the same equipment needs no external calls. Outcomes older than
+    VALIDATION_REVALIDATE_AFTER are still returned and re-validated in the background.
+    
     Args:
         part_number (str): The part number to validate
         make (str, optional): Equipment make
         model (str, optional): Equipment model  
         original_description (str, optional): Original part description for context
-        bypass_cache (bool, optional): Whether to bypass SerpAPI cache
+        bypass_cache (bool, optional): Whether to bypass the validation and SerpAPI caches
+        reuse_verdict (bool, optional): Whether a cached verdict may be returned. With False the
+            fit to original_description is judged again (SerpAPI results may still come from
+            their cache) and the new verdict is stored. Defaults to True.
         
     Returns:
         dict: Validation result with is_valid, confidence_score, assessment, and part_description
@@ -1129,10 +1375,39 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
     if not part_number:
         return {"is_valid": False, "confidence_score": 0.0, "assessment": "No part number provided"}
     
+    if not bypass_cache and reuse_verdict:
+        cached = validation_cache.get(part_number, make, model)
+        if cached is not None:
+            if cached["stale"]:
+                validation_cache.schedule_revalidation(
+                    part_number, make, lambda: _revalidate(part_number, make, model, original_description), model
+                )
+            return cached["validation"]
+    
+    validation, completed = _run_validation(part_number, make, model, original_description, bypass_cache)
+    if completed:
+        validation_cache.put(part_number, make, validation, model)
+    else:
+        # Timeouts and errors; resolution_cache keeps responses containing them only briefly
+        validation["incomplete"] = True
+    return validation
+
+def _revalidate(part_number, make=None, model=None, original_description=None):
+    """Re-validate a stale cached outcome; None if the validation did not complete"""
+    validation, completed = _run_validation(part_number, make, model, original_description, bypass_cache=True)
+    return validation if completed else None
+
+def _run_validation(part_number, make=None, model=None, original_description=None, bypass_cache=False):
+    """
+    Run the SerpAPI search and GPT analysis of validate_part_with_serpapi
+    
+    Returns:
+        tuple: (validation result, True if the analysis completed rather than
+            failing or timing out)
+    """
     logger.info(f"Validating part number {part_number} for {make} {model}")
     
     try:
-        import requests
         from config import Config
         
         # Construct validation search query
@@ -1154,24 +1429,15 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
             "hl": "en"
         }
         
-        # Add cache-busting if needed
-        if bypass_cache:
-            import time
-            search_params["no_cache"] = "true"
-            search_params["t"] = str(int(time.time()))
-            logger.info(f"Bypassing SerpAPI cache for validation: {part_number}")
-        
         # Make the request
         try:
-            api_response = requests.get("https://serpapi.com/search", params=search_params, timeout=30)
-            api_response.raise_for_status()
-            results = api_response.json()
+            results = serpapi_client.search(search_params, family="part_validation", bypass_cache=bypass_cache)
         except requests.exceptions.Timeout:
             logger.error("SerpAPI validation request timed out")
-            return {"is_valid": False, "confidence_score": 0.0, "assessment": "Validation timeout"}
+            return {"is_valid": False, "confidence_score": 0.0, "assessment": "Validation timeout"}, False
         except Exception as e:
             logger.error(f"Error validating with SerpAPI: {e}")
-            return {"is_valid": False, "confidence_score": 0.0, "assessment": f"Validation error: {str(e)}"}
+            return {"is_valid": False, "confidence_score": 0.0, "assessment": f"Validation error: {str(e)}"}, False
         
         # Extract search results for GPT context
         search_context = ""
@@ -1179,7 +1445,7 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
         
         # Process organic results
         if "organic_results" in results:
-            for idx, result in enumerate(results.get("organic_results", [])[:6]):
+            for idx, result in enumerate(prompt_budget.compact_results(results.get("organic_results", [])[:6], "validate_part_with_serpapi", url_key="link")):
                 search_context += f"Result {idx+1}: {result.get('title', 'Unknown')}\n"
                 search_context += f"URL: {result.get('link', 'No URL')}\n"
                 search_context += f"Content: {result.get('snippet', 'No description')}\n\n"
@@ -1222,29 +1488,16 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
         """
         
         # Get GPT validation analysis
-        if USING_NEW_OPENAI_CLIENT:
-            ai_response = client.chat.completions.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts validation specialist who analyzes search results to verify OEM part numbers. You carefully evaluate evidence from search results and only validate parts with solid proof. Using GPT-4.1-Nano for comprehensive validation analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message.content
-        else:
-            import openai
-            ai_response = openai.ChatCompletion.create(
-                model="gpt-4.1-mini-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You are a parts validation specialist who analyzes search results to verify OEM part numbers. You carefully evaluate evidence from search results and only validate parts with solid proof. Using GPT-4.1-Nano for comprehensive validation analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1
-            )
-            raw_content = ai_response.choices[0].message['content']
+        raw_content = llm_gateway.chat_completion(
+            model="gpt-4.1-mini-2025-04-14",
+            messages=[
+                {"role": "system", "content": "You are a parts validation specialist who analyzes search results to verify OEM part numbers. You carefully evaluate evidence from search results and only validate parts with solid proof. Using GPT-4.1-Nano for comprehensive validation analysis."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            purpose="validate_part_with_serpapi"
+        )
         
         # Parse and return the validation result
         validation_result = json.loads(raw_content)
@@ -1252,7 +1505,7 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
         # Log validation result
         logger.info(f"Part validation for {part_number}: valid={validation_result.get('is_valid')}, confidence={validation_result.get('confidence_score')}")
         
-        return validation_result
+        return validation_result, True
         
     except Exception as e:
         logger.error(f"Error in part validation: {e}")
@@ -1262,7 +1515,7 @@ def validate_part_with_serpapi(part_number, make=None, model=None, original_desc
             "assessment": f"Validation failed: {str(e)}",
             "part_description": "Unknown",
             "sources_count": 0
-        }
+        }, False
 
 def save_part_match(description, oem_part_number, manufacturer, detailed_description="", alternate_part_numbers=None):
     """
@@ -1284,8 +1537,8 @@ def save_part_match(description, oem_part_number, manufacturer, detailed_descrip
     
     try:
         with get_app_context():
-            # Check if this part already exists
-            existing_part = Part.query.filter_by(oem_part_number=oem_part_number).first()
+            # Check if this part already exists, in any spelling of its number
+            existing_part = Part.query.filter_by(normalized_part_number=normalize_part_number(oem_part_number)).first()
             
             if existing_part:
                 logger.info(f"Part {oem_part_number} already exists in database")
@@ -1301,14 +1554,14 @@ def save_part_match(description, oem_part_number, manufacturer, detailed_descrip
             
             # Add alternate part numbers if provided
             if alternate_part_numbers and isinstance(alternate_part_numbers, list):
-                # Store as JSON string
-                import json
-                new_part.alternate_part_numbers = json.dumps(alternate_part_numbers)
+                # Stored as JSON and indexed in part_alternates
+                new_part.set_alternate_part_numbers(alternate_part_numbers)
             
             # Save to database
             db.session.add(new_part)
             db.session.commit()
             
+            part_trigram_index.add_part(new_part)
             logger.info(f"Saved new part to database: {oem_part_number} - {description}")
             return new_part
             
@@ -0,0 +1,142 @@
+import logging
+import re
+from sqlalchemy import text
+from models import db, Part
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "parts_fts"
+FTS_COLUMNS = ("description", "generic_description", "manufacturer", "alternate_part_numbers")
+
+# bm25 column weights, in FTS_COLUMNS order: descriptions matter most
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+_available = None
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+# External-content FTS5 table kept in sync with the parts table by triggers
+INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='parts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON parts BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON parts BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON parts BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+]
+
+def _is_sqlite():
+    return db.engine.dialect.name == "sqlite"
+
+def ensure_index():
+    """
+    Create the full-text index and its triggers if they do not exist yet
+
+    The index is rebuilt from the parts table when it is first created, so
+    existing databases are indexed on the next startup. Must run inside an app context.
+
+    Returns:
+        bool: True if the index is available
+    """
+    global _available
+    if not _is_sqlite():
+        logger.info("Part full-text index requires SQLite - using LIKE lookups")
+        _available = False
+        return False
+
+    try:
+        existed = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+
+        for statement in INDEX_DDL:
+            db.session.execute(text(statement))
+        if not existed:
+            db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            logger.info("Built part full-text index")
+        db.session.commit()
+        _available = True
+    except Exception as e:
+        # Most likely an SQLite build without FTS5
+        db.session.rollback()
+        logger.error(f"Could not create part full-text index: {e}")
+        _available = False
+
+    return _available
+
+def is_available():
+    """Check whether the full-text index can be used (inside an app context)"""
+    global _available
+    if _available is None:
+        try:
+            _available = _is_sqlite() and db.session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first() is not None
+        except Exception as e:
+            logger.error(f"Error checking part full-text index: {e}")
+            _available = False
+    return _available
+
+def build_match_query(description):
+    """
+    Turn a free-text description into an FTS5 query
+
+    Every word must match, as a prefix so plurals and part number stems still hit.
+    Words are quoted so user input cannot inject FTS5 syntax.
+
+    Returns:
+        str: The MATCH expression, or None if the description has no words
+    """
+    tokens = re.findall(r"\w+", (description or "").lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def search_parts(description, make=None, limit=5):
+    """
+    Find parts whose description, manufacturer or alternates match the description
+
+    Args:
+        description (str): Part description to search for
+        make (str, optional): Only return parts whose manufacturer contains this
+        limit (int): Maximum number of matches
+
+    Returns:
+        list: [{"part": Part, "score": float}] best first, higher scores are better
+    """
+    match_query = build_match_query(description)
+    if not match_query:
+        return []
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    sql = (
+        f"SELECT parts.id AS id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} JOIN parts ON parts.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :query"
+    )
+    params = {"query": match_query, "limit": limit}
+    if make:
+        sql += " AND parts.manufacturer LIKE :make"
+        params["make"] = f"%{make}%"
+    sql += " ORDER BY rank LIMIT :limit"
+
+    rows = db.session.execute(text(sql), params).fetchall()
+    if not rows:
+        return []
+
+    parts_by_id = {part.id: part for part in Part.query.filter(Part.id.in_([row.id for row in rows])).all()}
+    # bm25 is lower-is-better and negative for matches; flip it so higher is better
+    return [
+        {"part": parts_by_id[row.id], "score": -row.rank}
+        for row in rows
+        if row.id in parts_by_id
+    ]
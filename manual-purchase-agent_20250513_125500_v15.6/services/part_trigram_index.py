@@ -0,0 +1,187 @@
+import logging
+import re
+import threading
+from collections import Counter, defaultdict
+from config import Config
+from models import Part
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class TrigramIndex:
+    """
+    In-memory trigram index over part descriptions
+
+    Each part contributes its description and generic description as separate
+    documents. A query is scored against every document that shares at least
+    one trigram with it using the Dice coefficient, and a part scores as its
+    best document.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(set)
+        self._documents = {}
+        self._part_documents = defaultdict(set)
+        self._parts = {}
+        self._next_document_id = 0
+
+    @staticmethod
+    def trigrams(value):
+        """Character trigrams of each word, padded like pg_trgm"""
+        words = re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).split()
+        grams = set()
+        for word in words:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return grams
+
+    def add(self, part_id, oem_part_number, manufacturer, texts):
+        """Add or replace a part"""
+        with self._lock:
+            self.remove(part_id)
+            self._parts[part_id] = {
+                "part_id": part_id,
+                "oem_part_number": oem_part_number,
+                "manufacturer": manufacturer or "",
+                "description": texts[0] if texts else ""
+            }
+            seen = set()
+            for text in texts:
+                grams = self.trigrams(text)
+                key = frozenset(grams)
+                if not grams or key in seen:
+                    continue
+                seen.add(key)
+                document_id = self._next_document_id
+                self._next_document_id += 1
+                self._documents[document_id] = (part_id, key)
+                self._part_documents[part_id].add(document_id)
+                for gram in grams:
+                    self._postings[gram].add(document_id)
+
+    def remove(self, part_id):
+        """Remove a part if it is indexed"""
+        with self._lock:
+            for document_id in self._part_documents.pop(part_id, set()):
+                _, grams = self._documents.pop(document_id)
+                for gram in grams:
+                    postings = self._postings[gram]
+                    postings.discard(document_id)
+                    if not postings:
+                        del self._postings[gram]
+            self._parts.pop(part_id, None)
+
+    def search(self, query, make=None, limit=5, threshold=0.5):
+        """
+        Find the parts whose description is most similar to the query
+
+        Returns:
+            list: Part summaries with a similarity score (0-1), best first
+        """
+        query_grams = self.trigrams(query)
+        if not query_grams:
+            return []
+        make = (make or "").lower()
+
+        with self._lock:
+            overlaps = Counter()
+            for gram in query_grams:
+                for document_id in self._postings.get(gram, ()):
+                    overlaps[document_id] += 1
+
+            best_scores = {}
+            for document_id, overlap in overlaps.items():
+                part_id, grams = self._documents[document_id]
+                score = 2.0 * overlap / (len(query_grams) + len(grams))
+                if score >= threshold and score > best_scores.get(part_id, 0.0):
+                    best_scores[part_id] = score
+
+            results = []
+            for part_id, score in best_scores.items():
+                part = self._parts[part_id]
+                if make and make not in part["manufacturer"].lower():
+                    continue
+                results.append(dict(part, score=round(score, 3)))
+
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:limit]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._parts)
+
+_index = None
+_index_lock = threading.Lock()
+
+def _part_texts(part):
+    return [text for text in (part.description, part.generic_description) if text]
+
+def build_index():
+    """
+    Build the process-wide index from the parts table (inside an app context)
+
+    Parts saved through save_part_match or the parts API in this process are
+    added incrementally; a restart picks up changes made by other processes.
+    """
+    global _index
+    index = TrigramIndex()
+    for part in Part.query.yield_per(1000):
+        index.add(part.id, part.oem_part_number, part.manufacturer, _part_texts(part))
+
+    with _index_lock:
+        _index = index
+    logger.info(f"Built part trigram index with {len(index)} parts")
+    return index
+
+def get_index():
+    """Get the process-wide index, building it on first use (inside an app context)"""
+    if _index is None:
+        with _index_lock:
+            building = _index is None
+        if building:
+            build_index()
+    return _index
+
+def add_part(part):
+    """Index a saved part, if the index has been built"""
+    if _index is not None and part is not None and part.id is not None:
+        _index.add(part.id, part.oem_part_number, part.manufacturer, _part_texts(part))
+
+def remove_part(part_id):
+    """Remove a deleted part, if the index has been built"""
+    if _index is not None:
+        _index.remove(part_id)
+
+def search(description, make=None, limit=5, threshold=None):
+    """
+    Find stored parts with descriptions similar to the given one
+
+    Args:
+        description (str): Part description to match
+        make (str, optional): Only return parts whose manufacturer contains this
+        limit (int): Maximum number of candidates
+        threshold (float, optional): Minimum similarity, defaults to PART_FUZZY_MATCH_THRESHOLD
+
+    Returns:
+        list: [{"part_id", "oem_part_number", "manufacturer", "description", "score"}] best first
+    """
+    if threshold is None:
+        threshold = Config.PART_FUZZY_MATCH_THRESHOLD
+    return get_index().search(description, make=make, limit=limit, threshold=threshold)
+
+def part_similarity(description, part):
+    """
+    Trigram similarity (Dice coefficient, 0-1) between a description and a part
+
+    Scored the same way as search, against the part's description and generic
+    description, so it can be used as the confidence of matches found by other means.
+    """
+    query_grams = TrigramIndex.trigrams(description)
+    best = 0.0
+    for text in _part_texts(part):
+        grams = TrigramIndex.trigrams(text)
+        if query_grams and grams:
+            best = max(best, 2.0 * len(query_grams & grams) / (len(query_grams) + len(grams)))
+    return round(best, 3)
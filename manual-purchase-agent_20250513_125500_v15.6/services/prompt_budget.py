@@ -0,0 +1,181 @@
+import logging
+import re
+import threading
+from config import Config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+_stats = {}
+_stats_lock = threading.Lock()
+
+def get_encoding():
+    """
+    Get the shared tiktoken encoding (LLM_TOKENIZER_ENCODING)
+
+    Returns:
+        The encoding, or None if tiktoken or its data is unavailable, in which
+        case token counts are estimated from the text length
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(Config.LLM_TOKENIZER_ENCODING)
+                except Exception as e:
+                    _encoding_failed = True
+                    logger.warning(f"tiktoken unavailable, estimating token counts from text length: {e}")
+    return _encoding
+
+def count_tokens(text):
+    """Number of tokens in a piece of text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages):
+    """Approximate prompt tokens of a chat request, including the per-message overhead"""
+    return sum(count_tokens(message.get("content") if isinstance(message.get("content"), str) else "") + 4
+               for message in messages) + 3
+
+def truncate(text, max_tokens):
+    """
+    Cut a piece of text down to at most max_tokens tokens
+
+    Returns:
+        str: The text, unchanged if it fits, otherwise cut and ending in "..."
+    """
+    if not text or max_tokens is None:
+        return text
+    encoding = get_encoding()
+    if encoding is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]).rstrip() + "..."
+
+def max_tokens_for(purpose):
+    """Response token cap for a call type (LLM_MAX_TOKENS, else LLM_DEFAULT_MAX_TOKENS)"""
+    return Config.LLM_MAX_TOKENS.get(purpose, Config.LLM_DEFAULT_MAX_TOKENS)
+
+def _normalize_url(url):
+    url = (url or "").strip().lower()
+    url = re.sub(r"^https?://(www\.)?", "", url)
+    return url.split("#", 1)[0].rstrip("/")
+
+def _normalize_snippet(snippet):
+    return re.sub(r"\W+", " ", (snippet or "").lower()).strip()
+
+def compact_results(results, purpose, url_key="url", snippet_key="snippet", title_key="title"):
+    """
+    Deduplicate and trim search results so they fit a prompt's budget
+
+    Results are kept in rank order. Results whose URL or snippet repeats an
+    earlier one are dropped, every snippet is cut to LLM_SNIPPET_MAX_TOKENS, and
+    once the results would exceed the purpose's budget in LLM_PROMPT_BUDGETS
+    (tokens for the whole results block) the lower ranked rest is dropped.
+
+    Args:
+        results (list): Result dicts, e.g. SerpAPI organic results
+        purpose (str): LLM call the results are pasted into
+        url_key (str): Key of the result URL
+        snippet_key (str): Key of the result snippet
+        title_key (str): Key of the result title
+
+    Returns:
+        list: Copies of the kept results with trimmed snippets
+    """
+    budget = Config.LLM_PROMPT_BUDGETS.get(purpose, Config.LLM_DEFAULT_PROMPT_BUDGET)
+    seen_urls = set()
+    seen_snippets = set()
+    kept = []
+    used = 0
+    duplicates = 0
+    trimmed = 0
+    over_budget = 0
+
+    for result in results or []:
+        url = _normalize_url(result.get(url_key))
+        snippet = _normalize_snippet(result.get(snippet_key))
+        if (url and url in seen_urls) or (snippet and snippet in seen_snippets):
+            duplicates += 1
+            continue
+
+        compacted = dict(result)
+        if isinstance(result.get(snippet_key), str):
+            compacted[snippet_key] = truncate(result[snippet_key], Config.LLM_SNIPPET_MAX_TOKENS)
+            if compacted[snippet_key] != result[snippet_key]:
+                trimmed += 1
+
+        cost = (count_tokens(str(compacted.get(title_key) or "")) + count_tokens(str(compacted.get(url_key) or ""))
+                + count_tokens(str(compacted.get(snippet_key) or "")) + 10)
+        if kept and used + cost > budget:
+            over_budget += len(results) - len(kept) - duplicates
+            break
+
+        seen_urls.add(url)
+        seen_snippets.add(snippet)
+        kept.append(compacted)
+        used += cost
+
+    _record(purpose, results=len(results or []), kept=len(kept), duplicates=duplicates,
+            trimmed=trimmed, over_budget=over_budget, result_tokens=used)
+    if duplicates or over_budget:
+        logger.info(f"Compacted {len(results)} results for {purpose} to {len(kept)} "
+                    f"({duplicates} duplicates, {over_budget} over the {budget}-token budget)")
+    return kept
+
+def record_call(purpose, prompt_tokens, max_tokens, usage=None, truncated=False):
+    """
+    Record the measured prompt size, the response cap and the tokens the API reports
+
+    Args:
+        purpose (str): LLM call type
+        prompt_tokens (int): Prompt tokens counted before sending
+        max_tokens (int): Response token cap sent with the request
+        usage: The response's usage object, if any
+        truncated (bool): The response stopped at max_tokens
+    """
+    _record(
+        purpose,
+        calls=1,
+        prompt_tokens_measured=prompt_tokens,
+        prompt_tokens_used=getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0) or 0,
+        completion_tokens_used=getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", 0) or 0,
+        max_tokens_requested=max_tokens or 0,
+        truncated=int(truncated)
+    )
+
+def _record(purpose, **counters):
+    with _stats_lock:
+        purpose_stats = _stats.setdefault(purpose, {})
+        for name, value in counters.items():
+            purpose_stats[name] = purpose_stats.get(name, 0) + value
+
+def get_stats():
+    """
+    Get per-purpose prompt sizes, response caps, token usage and result compaction counters
+
+    Returns:
+        dict: Purpose -> counters, with average prompt and completion tokens per call
+    """
+    with _stats_lock:
+        purposes = {name: dict(counters) for name, counters in _stats.items()}
+
+    for counters in purposes.values():
+        calls = counters.get("calls", 0)
+        if calls:
+            counters["avg_prompt_tokens"] = round(counters.get("prompt_tokens_measured", 0) / calls)
+            counters["avg_completion_tokens"] = round(counters.get("completion_tokens_used", 0) / calls)
+    return purposes
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import Config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waited longer than RATE_LIMIT_MAX_WAIT for a request slot"""
+
+class TokenBucket:
+    """
+    Token bucket that queues callers and adapts to rate limit signals
+
+    Callers block in acquire() until a token is available. A 429 halves the
+    current rate and pauses the bucket for the Retry-After period; each success
+    afterwards adds back a small step until the configured rate is reached
+    again (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, name, rate_per_minute, burst):
+        self.name = name
+        self.base_rate = rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate / 16
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "rate_limited": 0, "timeouts": 0}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, max_wait=None):
+        """
+        Take one token, waiting for it if necessary
+
+        Raises:
+            RateLimitTimeout: If no token became available within max_wait seconds
+        """
+        max_wait = Config.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats["acquired"] += 1
+                    if waited:
+                        self.stats["waited"] += 1
+                        self.stats["wait_seconds"] += now - started
+                    return
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+            if time.monotonic() - started + delay > max_wait:
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                raise RateLimitTimeout(f"Timed out waiting for a {self.name} request slot")
+            waited = True
+            time.sleep(min(delay, 1.0))
+
+    def on_rate_limited(self, retry_after=None):
+        """Back off after a 429: halve the rate and pause for Retry-After (or one token interval)"""
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.tokens = 0.0
+            logger.warning(f"{self.name} rate limited - pausing {pause:.1f}s, rate now {self.rate * 60:.0f}/min")
+
+    def on_success(self):
+        """Recover the rate step by step after a successful call"""
+        if self.rate < self.base_rate:
+            with self._lock:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+    def snapshot(self):
+        """Current state and counters of the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "configured_per_minute": round(self.base_rate * 60, 1),
+                "current_per_minute": round(self.rate * 60, 1),
+                "available_tokens": round(self.tokens, 1),
+                "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 1),
+                **{name: round(value, 1) if isinstance(value, float) else value for name, value in self.stats.items()}
+            }
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def get_bucket(provider, model=None):
+    """
+    Get the shared bucket for a provider (and model, for OpenAI)
+
+    Rates come from RATE_LIMIT_SERPAPI_PER_MINUTE and RATE_LIMIT_OPENAI_PER_MINUTE,
+    with per-model overrides in RATE_LIMIT_OPENAI_MODEL_LIMITS.
+    """
+    name = f"{provider}:{model}" if model else provider
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            if provider == "serpapi":
+                rate = Config.RATE_LIMIT_SERPAPI_PER_MINUTE
+            else:
+                rate = Config.RATE_LIMIT_OPENAI_MODEL_LIMITS.get(model, Config.RATE_LIMIT_OPENAI_PER_MINUTE)
+            bucket = TokenBucket(name, rate, burst=rate * Config.RATE_LIMIT_BURST_SECONDS / 60.0)
+            _buckets[name] = bucket
+        return bucket
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (seconds or an HTTP date)
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def get_stats():
+    """
+    Get the state of every bucket
+
+    Returns:
+        dict: Bucket name -> rates, available tokens, pause and counters
+    """
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {name: bucket.snapshot() for name, bucket in buckets.items()}
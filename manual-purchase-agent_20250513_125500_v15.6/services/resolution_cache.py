@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from config import Config
+from services.disk_cache import DiskCache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stored": 0, "negative_stored": 0, "degraded_stored": 0}
+_stats_lock = threading.Lock()
+
+def get_cache():
+    """Get the shared on-disk cache of complete resolve responses"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(Config.CACHE_DIR, "resolve_cache.db"),
+                    table="resolve_responses",
+                    max_entries=Config.RESOLVE_CACHE_MAX_ENTRIES
+                )
+    return _cache
+
+def _normalize(value):
+    if value is None:
+        return ""
+    return " ".join(str(value).lower().split())
+
+def make_cache_key(description, make=None, model=None, year=None,
+                   use_database=True, use_manual_search=True, use_web_search=True):
+    """Build the cache key from the normalized query and the enabled search methods"""
+    payload = json.dumps({
+        "description": _normalize(description),
+        "make": _normalize(make),
+        "model": _normalize(model),
+        "year": _normalize(year),
+        "use_database": bool(use_database),
+        "use_manual_search": bool(use_manual_search),
+        "use_web_search": bool(use_web_search)
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def is_negative(response):
+    """A response is negative when nothing was recommended and no similar parts were found"""
+    return not response.get("recommended_result") and not response.get("similar_parts")
+
+# Sections of a resolve response produced by a search leg
+LEG_STAGES = ("database_result", "manual_search_result", "ai_web_search_result")
+
+def is_degraded(response):
+    """
+    A response is degraded when a leg failed (timeout, API error, cancelled) or a
+    leg's part number could not be validated, so a retry may well do better
+    """
+    for stage in LEG_STAGES:
+        result = response.get(stage)
+        if not isinstance(result, dict):
+            continue
+        if result.get("error"):
+            return True
+        validation = result.get("serpapi_validation") or {}
+        if validation.get("incomplete"):
+            return True
+    return False
+
+def get(description, make=None, model=None, year=None,
+        use_database=True, use_manual_search=True, use_web_search=True):
+    """
+    Look up a cached resolve response
+
+    Returns:
+        dict: The cached response marked with from_cache and cached_at, or None
+    """
+    key = make_cache_key(description, make, model, year, use_database, use_manual_search, use_web_search)
+    entry = get_cache().get_entry(key)
+    if entry is None:
+        _record("misses")
+        return None
+
+    response = entry["value"]
+    _record("negative_hits" if is_negative(response) else "hits")
+    logger.info(f"Resolve cache hit for: {description} ({make} {model} {year})")
+
+    response["from_cache"] = True
+    response["cached_at"] = datetime.utcfromtimestamp(entry["created_at"]).isoformat() + "Z"
+    return response
+
+def put(response, description, make=None, model=None, year=None,
+        use_database=True, use_manual_search=True, use_web_search=True):
+    """
+    Store a resolve response
+
+    Error responses are never cached. "No part found" outcomes are kept for
+    RESOLVE_CACHE_NEGATIVE_TTL so a transient miss is retried soon, and responses
+    with a failed leg or validation only for RESOLVE_CACHE_DEGRADED_TTL.
+    """
+    if not response or response.get("error"):
+        return
+
+    negative = is_negative(response)
+    degraded = is_degraded(response)
+    ttl = Config.RESOLVE_CACHE_NEGATIVE_TTL if negative else Config.RESOLVE_CACHE_TTL
+    if degraded:
+        ttl = min(ttl, Config.RESOLVE_CACHE_DEGRADED_TTL)
+        logger.info(f"Caching degraded resolve response for {ttl}s: {description} ({make} {model} {year})")
+    if ttl <= 0:
+        return
+
+    key = make_cache_key(description, make, model, year, use_database, use_manual_search, use_web_search)
+    get_cache().set(key, response, ttl=ttl)
+    _record("negative_stored" if negative else "stored")
+    if degraded:
+        _record("degraded_stored")
+
+def get_cache_stats():
+    """
+    Get resolve cache counters
+
+    Returns:
+        dict: Hit/miss/store counters, hit rate and cache size
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    hits = stats["hits"] + stats["negative_hits"]
+    lookups = hits + stats["misses"]
+    stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+    stats["entries"] = len(get_cache())
+    return stats
+
+def clear_cache():
+    """Remove all cached resolve responses"""
+    get_cache().clear()
@@ -0,0 +1,404 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fields of the recommended result kept for reuse
+STORED_RESULT_FIELDS = (
+    "oem_part_number", "manufacturer", "description", "alternate_part_numbers",
+    "confidence", "source", "selection_metadata"
+)
+
+def _normalize(value):
+    if value is None:
+        return ""
+    return " ".join(str(value).lower().split())
+
+def _hash(feature):
+    return zlib.crc32(feature.encode("utf-8"))
+
+def scope_key(make=None, model=None):
+    """Integer key for the make and model a resolution applies to"""
+    return _hash(f"{_normalize(make)}|{_normalize(model)}")
+
+def query_key(description, make=None, model=None, year=None):
+    """Key identifying one resolved query"""
+    return "|".join(_normalize(value) for value in (description, make, model, year))
+
+def vectorize(description, dim):
+    """
+    Hash a description into a unit vector
+
+    Features are the words plus the padded character trigrams of each word,
+    so "hi-limit" and "high limit" still share most of their weight. A sign bit
+    from the hash keeps collisions from always adding up.
+
+    Returns:
+        numpy.ndarray: float32 vector of length dim, all zeros for an empty description
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    words = re.sub(r"[^a-z0-9]+", " ", (description or "").lower()).split()
+    for word in words:
+        features = [(f"w:{word}", 1.0)]
+        padded = f" {word} "
+        features.extend((f"c:{padded[i:i + 3]}", 0.5) for i in range(len(padded) - 2))
+        for feature, weight in features:
+            hashed = _hash(feature)
+            vector[hashed % dim] += weight if hashed & 0x80000000 else -weight
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+# Spelling variants folded together before descriptions are compared word by word
+TOKEN_SYNONYMS = {
+    "hi": "high", "lo": "low", "assy": "assembly", "thermo": "thermostat",
+    "temp": "temperature", "elem": "element", "sw": "switch", "sol": "solenoid"
+}
+# Words that do not change which part is meant
+TOKEN_STOPWORDS = {"a", "an", "the", "for", "of", "and", "with", "to", "oem", "part", "genuine", "replacement"}
+# Position, variant and packaging words: a description that adds one names a different part
+TOKEN_QUALIFIERS = {
+    "upper", "lower", "top", "bottom", "left", "right", "front", "rear", "back", "side",
+    "inner", "outer", "inlet", "outlet", "hot", "cold", "high", "low", "primary", "secondary",
+    "main", "auxiliary", "assembly", "kit", "set", "pair", "pack", "housing", "cover", "bracket"
+}
+
+def description_tokens(description):
+    """
+    The set of words of a description, with spelling variants and plurals folded together
+    """
+    tokens = set()
+    for word in re.sub(r"[^a-z0-9]+", " ", (description or "").lower()).split():
+        word = TOKEN_SYNONYMS.get(word, word)
+        if word in TOKEN_STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return tokens
+
+def descriptions_agree(description, other):
+    """
+    Check whether two descriptions name the same part
+
+    Word order, spelling variants and plurals may differ. Beyond that, one
+    description may add words the other lacks ("fryer hi-limit" vs "high limit
+    thermostat fryer") as long as the word sets overlap by at least
+    RESOLVE_VECTOR_MIN_TOKEN_OVERLAP (Jaccard) and none of the added words is a
+    qualifier ("drain valve" vs "drain valve assembly"). If both descriptions
+    have words of their own they differ in a noun ("fan motor" vs "drain motor",
+    "upper" vs "lower heating element") and do not agree.
+    """
+    tokens, other_tokens = description_tokens(description), description_tokens(other)
+    if not tokens or not other_tokens:
+        return False
+    if not (tokens <= other_tokens or other_tokens <= tokens):
+        return False
+    if (tokens ^ other_tokens) & TOKEN_QUALIFIERS:
+        return False
+    return len(tokens & other_tokens) / len(tokens | other_tokens) >= Config.RESOLVE_VECTOR_MIN_TOKEN_OVERLAP
+
+def compact_result(result):
+    """Keep the parts of a recommended result that are worth reusing"""
+    compact = {field: result.get(field) for field in STORED_RESULT_FIELDS if result.get(field) is not None}
+    validation = result.get("serpapi_validation") or {}
+    compact["serpapi_validation"] = {
+        "is_valid": validation.get("is_valid", False),
+        "confidence_score": validation.get("confidence_score", 0.0)
+    }
+    return compact
+
+class ResolutionVectorIndex:
+    """
+    Disk-backed hashing-vector index over past resolutions
+
+    Entries are appended to entries.jsonl as they are added. vectors.npz is a
+    snapshot of the vectors keyed by entry key, written every
+    RESOLVE_VECTOR_SNAPSHOT_EVERY additions; on load only entries missing from
+    the snapshot are vectorized again. Each process keeps its own copy in memory,
+    so entries added by other processes show up after a restart. Appends and
+    compaction take an exclusive lock on the entries file, and compaction works
+    from the file, so entries written by other processes are kept.
+    """
+
+    def __init__(self, directory, dim=256, snapshot_every=200):
+        self.directory = directory
+        self.dim = dim
+        self.snapshot_every = snapshot_every
+        self.entries_path = os.path.join(directory, "entries.jsonl")
+        self.vectors_path = os.path.join(directory, "vectors.npz")
+        self.lock_path = os.path.join(directory, "entries.lock")
+        self._lock = threading.RLock()
+        self._reset()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _reset(self):
+        self._vectors = np.zeros((1024, self.dim), dtype=np.float32)
+        self._scopes = np.zeros(1024, dtype=np.int64)
+        self._entries = []
+        self._rows = {}
+        self._unsaved = 0
+
+    def _append_row(self, entry, vector=None):
+        row = len(self._entries)
+        if row == len(self._scopes):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+            self._scopes = np.concatenate([self._scopes, np.zeros_like(self._scopes)])
+        self._vectors[row] = vectorize(entry["description"], self.dim) if vector is None else vector
+        self._scopes[row] = scope_key(entry["make"], entry["model"])
+        self._entries.append(entry)
+        self._rows[entry["key"]] = row
+
+    def _file_lock(self):
+        """Open the lock file and take an exclusive lock shared by all processes; close it to release"""
+        handle = open(self.lock_path, "a")
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _read_entries(self):
+        """Read entries.jsonl, keeping the last entry of each key; returns (entries, line count)"""
+        entries = {}
+        lines = 0
+        if os.path.exists(self.entries_path):
+            with open(self.entries_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Skipping corrupt line in resolution vector index")
+                        continue
+                    # A later resolution of the same query replaces the earlier one
+                    entries.pop(entry["key"], None)
+                    entries[entry["key"]] = entry
+        return list(entries.values()), lines
+
+    def _load(self):
+        snapshot = {}
+        if os.path.exists(self.vectors_path):
+            try:
+                with np.load(self.vectors_path) as data:
+                    if data["vectors"].ndim == 2 and data["vectors"].shape[1] == self.dim:
+                        snapshot = dict(zip(data["keys"].tolist(), data["vectors"]))
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable vector snapshot: {e}")
+
+        lock = self._file_lock()
+        try:
+            entries, lines = self._read_entries()
+            if lines > 2 * len(entries) + 100:
+                self._compact(entries)
+        finally:
+            lock.close()
+
+        with self._lock:
+            for entry in entries:
+                vector = snapshot.get(entry["key"])
+                if vector is None:
+                    self._unsaved += 1
+                self._append_row(entry, vector)
+
+            if self._unsaved:
+                self.save_snapshot()
+
+        logger.info(f"Loaded resolution vector index with {len(self._entries)} entries")
+
+    def _compact(self, entries):
+        """Rewrite entries.jsonl with one line per key; the caller holds the file lock"""
+        temp_path = self.entries_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.entries_path)
+
+    def save_snapshot(self):
+        """Write the vectors, keyed by entry key, to disk"""
+        with self._lock:
+            size = len(self._entries)
+            temp_path = f"{self.vectors_path}.{os.getpid()}.tmp.npz"
+            np.savez(temp_path,
+                     keys=np.array([entry["key"] for entry in self._entries]),
+                     vectors=self._vectors[:size])
+            os.replace(temp_path, self.vectors_path)
+            self._unsaved = 0
+
+    def add(self, description, make, model, year, result):
+        """Record a resolution, replacing an earlier one for the same query"""
+        entry = {
+            "key": query_key(description, make, model, year),
+            "description": description,
+            "make": make,
+            "model": model,
+            "year": year,
+            "result": result,
+            "created_at": time.time()
+        }
+        with self._lock:
+            lock = self._file_lock()
+            try:
+                with open(self.entries_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            finally:
+                lock.close()
+
+            row = self._rows.get(entry["key"])
+            if row is not None:
+                self._entries[row] = entry
+                return
+
+            self._append_row(entry)
+            self._unsaved += 1
+            if self._unsaved >= self.snapshot_every:
+                self.save_snapshot()
+
+    def search(self, description, make=None, model=None, limit=1, threshold=0.0):
+        """
+        Find past resolutions for the same make and model with similar descriptions
+
+        Returns:
+            list: Entries with a "similarity" (cosine, 0-1) field, best first
+        """
+        query = vectorize(description, self.dim)
+        if not query.any():
+            return []
+
+        with self._lock:
+            size = len(self._entries)
+            rows = np.flatnonzero(self._scopes[:size] == scope_key(make, model))
+            if not len(rows):
+                return []
+            similarities = self._vectors[rows] @ query
+
+            if len(rows) > limit:
+                top = np.argpartition(-similarities, limit)[:limit]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-similarities[top])]
+
+            return [
+                dict(self._entries[rows[i]], similarity=round(float(similarities[i]), 3))
+                for i in top
+                if similarities[i] >= threshold
+            ]
+
+    def clear(self):
+        """Remove every entry, in memory and on disk"""
+        with self._lock:
+            self._reset()
+            for path in (self.entries_path, self.vectors_path, os.path.join(self.directory, "vectors.npy")):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+_index = None
+_index_lock = threading.Lock()
+_stats = {"hits": 0, "candidates": 0, "misses": 0, "added": 0}
+_stats_lock = threading.Lock()
+
+def get_index():
+    """Get the shared resolution vector index"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ResolutionVectorIndex(
+                    os.path.join(Config.CACHE_DIR, "resolution_vectors"),
+                    dim=Config.RESOLVE_VECTOR_DIM,
+                    snapshot_every=Config.RESOLVE_VECTOR_SNAPSHOT_EVERY
+                )
+    return _index
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def find_prior_resolution(description, make=None, model=None, year=None):
+    """
+    Find a past resolution of a differently worded query for the same make and model
+
+    Vector similarity alone does not tell "fan motor" from "drain motor", so a
+    match is only marked reusable when the descriptions name the same part
+    (see descriptions_agree) and the year is the same. Other matches are
+    candidates for reference only.
+
+    Returns:
+        dict: The stored entry with its similarity and a "reusable" flag, or None
+            below RESOLVE_VECTOR_THRESHOLD
+    """
+    if not Config.RESOLVE_VECTOR_INDEX_ENABLED:
+        return None
+
+    try:
+        matches = get_index().search(description, make, model, limit=1,
+                                     threshold=Config.RESOLVE_VECTOR_THRESHOLD)
+    except Exception as e:
+        logger.error(f"Error searching resolution vector index: {e}")
+        return None
+
+    if not matches:
+        _record("misses")
+        return None
+
+    match = matches[0]
+    match["reusable"] = (
+        descriptions_agree(description, match["description"])
+        and _normalize(year) == _normalize(match.get("year"))
+    )
+    _record("hits" if match["reusable"] else "candidates")
+    logger.info(f"Found prior resolution of '{match['description']}' (similarity {match['similarity']}, "
+                f"reusable={match['reusable']})")
+    return match
+
+def add_resolution(description, make, model, year, recommended_result):
+    """Record a validated recommended result so similar queries can reuse it"""
+    if not Config.RESOLVE_VECTOR_INDEX_ENABLED or not recommended_result:
+        return
+    if not recommended_result.get("oem_part_number"):
+        return
+    # Only reuse answers that passed SerpAPI validation
+    if not (recommended_result.get("serpapi_validation") or {}).get("is_valid"):
+        return
+
+    try:
+        get_index().add(description, make, model, year, compact_result(recommended_result))
+        _record("added")
+    except Exception as e:
+        logger.error(f"Error adding to resolution vector index: {e}")
+
+def get_stats():
+    """
+    Get resolution vector index counters
+
+    Returns:
+        dict: Hit (reusable), candidate (similar but not reusable), miss and added counters
+            and the number of entries
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["entries"] = len(get_index()) if Config.RESOLVE_VECTOR_INDEX_ENABLED else 0
+    return stats
+
+def clear_index():
+    """Remove all stored resolutions"""
+    get_index().clear()
@@ -0,0 +1,223 @@
+import ipaddress
+import logging
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+import requests
+from config import Config
+from models import db, ResolveJob
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_app = None
+_workers = []
+_workers_lock = threading.Lock()
+_wakeup = threading.Event()
+
+def validate_callback_url(callback_url):
+    """
+    Check that a callback URL is safe for this server to POST to
+
+    The URL must be http(s), its host must be in RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS
+    (if set), and every address it resolves to must be public, so callbacks
+    cannot reach this machine, the cloud metadata service or the internal network.
+
+    Raises:
+        ValueError: If the URL is not allowed
+    """
+    if not isinstance(callback_url, str):
+        raise ValueError("callback_url must be an http(s) URL")
+    parsed = urlparse(callback_url)
+    host = (parsed.hostname or "").lower()
+    if parsed.scheme not in ("http", "https") or not host:
+        raise ValueError("callback_url must be an http(s) URL")
+
+    allowed_hosts = Config.RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS
+    if allowed_hosts and not any(host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+                                 for allowed in allowed_hosts):
+        raise ValueError(f"callback_url host {host} is not allowed")
+
+    if Config.RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE:
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or None, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"callback_url host {host} does not resolve")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url host {host} resolves to a non-public address")
+
+def submit_job(params, callback_url=None):
+    """
+    Queue a part resolution to run in the background
+
+    Args:
+        params (dict): Keyword arguments for resolve_part_name
+        callback_url (str, optional): URL that receives a POST with the finished job
+
+    Returns:
+        ResolveJob: The queued job
+    """
+    job = ResolveJob(id=uuid.uuid4().hex, status="queued", callback_url=callback_url)
+    job.set_params(params)
+    db.session.add(job)
+    db.session.commit()
+
+    logger.info(f"Queued resolve job {job.id} for: {params.get('description')}")
+    _wakeup.set()
+    return job
+
+def get_job(job_id):
+    """Get a job by id, or None"""
+    return ResolveJob.query.get(job_id)
+
+def start_workers(app, num_workers=None):
+    """
+    Start the background workers for this process (once)
+
+    Jobs live in the database, so queued jobs left behind by a restart are
+    picked up again and jobs stuck in "running" are requeued once they are
+    older than RESOLVE_JOB_STALE_SECONDS.
+
+    Args:
+        app: Flask application used for the workers' app context
+        num_workers (int, optional): Number of worker threads, defaults to RESOLVE_JOB_WORKERS
+    """
+    global _app
+    num_workers = Config.RESOLVE_JOB_WORKERS if num_workers is None else num_workers
+    if num_workers <= 0:
+        logger.info("Resolve job workers disabled")
+        return
+
+    with _workers_lock:
+        if _workers:
+            return
+        _app = app
+        for index in range(num_workers):
+            worker = threading.Thread(target=_worker_loop, name=f"resolve-job-{index}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+    logger.info(f"Started {num_workers} resolve job workers")
+    _wakeup.set()
+
+def requeue_stale_jobs():
+    """
+    Requeue running jobs whose worker has presumably died
+
+    Returns:
+        int: Number of jobs requeued or failed
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.RESOLVE_JOB_STALE_SECONDS)
+    stale_jobs = ResolveJob.query.filter(
+        ResolveJob.status == "running",
+        ResolveJob.started_at < cutoff
+    ).all()
+
+    for job in stale_jobs:
+        if job.attempts >= Config.RESOLVE_JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+            job.error = f"Job abandoned after {job.attempts} attempts"
+            job.completed_at = datetime.utcnow()
+            logger.error(f"Resolve job {job.id} failed after {job.attempts} attempts")
+        else:
+            job.status = "queued"
+            job.started_at = None
+            logger.warning(f"Requeued stale resolve job {job.id}")
+
+    if stale_jobs:
+        db.session.commit()
+    return len(stale_jobs)
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to running
+
+    The conditional UPDATE makes sure that only one worker, in this or any
+    other process sharing the database, gets a given job.
+
+    Returns:
+        ResolveJob: The claimed job, or None if the queue is empty
+    """
+    for _ in range(5):
+        candidate = db.session.query(ResolveJob.id).filter(
+            ResolveJob.status == "queued"
+        ).order_by(ResolveJob.created_at).first()
+        if candidate is None:
+            return None
+
+        claimed = ResolveJob.query.filter(
+            ResolveJob.id == candidate.id,
+            ResolveJob.status == "queued"
+        ).update({
+            "status": "running",
+            "started_at": datetime.utcnow(),
+            "attempts": ResolveJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            return ResolveJob.query.get(candidate.id)
+
+    return None
+
+def run_job(job):
+    """Run a claimed job to completion and record its outcome"""
+    from services.part_resolver import resolve_part_name
+
+    logger.info(f"Running resolve job {job.id} (attempt {job.attempts})")
+    try:
+        result = resolve_part_name(**job.get_params())
+        job.set_result(result)
+        job.status = "failed" if result.get("error") else "completed"
+        job.error = result.get("error")
+    except Exception as e:
+        logger.error(f"Resolve job {job.id} failed: {e}", exc_info=True)
+        db.session.rollback()
+        job.status = "failed"
+        job.error = str(e)
+
+    job.completed_at = datetime.utcnow()
+    db.session.commit()
+    logger.info(f"Resolve job {job.id} finished with status {job.status}")
+
+    if job.callback_url:
+        notify_callback(job)
+
+def notify_callback(job):
+    """POST the finished job, including its result, to the job's callback URL"""
+    payload = job.to_dict()
+    payload["result"] = job.get_result()
+    try:
+        # Checked again at send time in case the host's DNS changed since the job was submitted;
+        # redirects are not followed, since they could lead to an internal address
+        validate_callback_url(job.callback_url)
+        response = requests.post(job.callback_url, json=payload, timeout=Config.RESOLVE_JOB_CALLBACK_TIMEOUT,
+                                 allow_redirects=False)
+        job.callback_status = f"HTTP {response.status_code}"
+    except Exception as e:
+        logger.error(f"Callback for resolve job {job.id} failed: {e}")
+        job.callback_status = f"error: {str(e)[:90]}"
+    db.session.commit()
+
+def _worker_loop():
+    """Claim and run jobs until the process exits"""
+    while True:
+        try:
+            with _app.app_context():
+                requeue_stale_jobs()
+                job = claim_next_job()
+                if job is not None:
+                    run_job(job)
+                    continue
+        except Exception as e:
+            logger.error(f"Resolve job worker error: {e}", exc_info=True)
+
+        # Sleep until a job is submitted or the poll interval passes
+        _wakeup.wait(Config.RESOLVE_JOB_POLL_INTERVAL)
+        _wakeup.clear()
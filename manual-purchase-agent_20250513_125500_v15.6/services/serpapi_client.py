@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from services.disk_cache import DiskCache
+from services import rate_limiter, usage_ledger, deadline
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SERPAPI_URL = "https://serpapi.com/search"
+
+# Parameters that never change the search results and must not split the cache
+IGNORED_CACHE_PARAMS = {"api_key", "no_cache", "t", "async", "output"}
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+def get_session():
+    """Get the process-wide requests session with keep-alive connection pooling"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.SERPAPI_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get_cache():
+    """Get the shared on-disk SerpAPI response cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(Config.CACHE_DIR, "serpapi_cache.db"),
+                    table="serpapi_responses",
+                    max_entries=Config.SERPAPI_CACHE_MAX_ENTRIES
+                )
+    return _cache
+
+def normalize_params(params):
+    """
+    Normalize search parameters so equivalent queries share a cache entry
+
+    Drops credentials and cache-busting parameters, lowercases and collapses
+    whitespace in string values.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if name in IGNORED_CACHE_PARAMS or value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.lower().split())
+        normalized[name] = value
+    return normalized
+
+def make_cache_key(params):
+    """Build the cache key for a set of search parameters"""
+    payload = json.dumps(normalize_params(params), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_family_ttl(family):
+    """Get the cache lifetime in seconds for a search family"""
+    override = os.environ.get(f"SERPAPI_CACHE_TTL_{family.upper()}")
+    if override:
+        return int(override)
+    return Config.SERPAPI_CACHE_TTLS.get(family, Config.SERPAPI_CACHE_DEFAULT_TTL)
+
+def _record(family, counter):
+    with _stats_lock:
+        family_stats = _stats.setdefault(family, {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0})
+        family_stats[counter] += 1
+
+def search(params, family="default", bypass_cache=False, timeout=30):
+    """
+    Run a SerpAPI search through the shared pooled session and response cache
+
+    Args:
+        params (dict): SerpAPI query parameters (api_key is filled in if missing)
+        family (str): Search family, selects the cache TTL and groups the counters
+        bypass_cache (bool): Skip the local cache and ask SerpAPI for fresh results.
+            The fresh response still refreshes the cache entry.
+        timeout (float): Request timeout in seconds, shortened to the time left on the request deadline
+
+    Returns:
+        dict: Parsed SerpAPI JSON response
+
+    Raises:
+        requests.exceptions.RequestException: On network errors or non-2xx responses
+        rate_limiter.RateLimitTimeout: If no request slot became free within RATE_LIMIT_MAX_WAIT
+        deadline.DeadlineExceeded: If the request deadline has passed (cache hits are still served)
+    """
+    key = make_cache_key(params)
+    cache = get_cache()
+
+    if bypass_cache:
+        _record(family, "bypassed")
+        logger.info(f"Bypassing SerpAPI cache for {family} search")
+    else:
+        cached = cache.get(key)
+        if cached is not None:
+            _record(family, "hits")
+            logger.info(f"SerpAPI cache hit for {family} search: {params.get('q', '')}")
+            return cached
+        _record(family, "misses")
+
+    request_params = dict(params)
+    if not request_params.get("api_key"):
+        request_params["api_key"] = Config.SERPAPI_KEY
+    if bypass_cache:
+        request_params["no_cache"] = "true"
+
+    # Wait for a request slot; a 429 slows the shared bucket down and the search is retried
+    bucket = rate_limiter.get_bucket("serpapi")
+    retries = 0
+    while True:
+        response = None
+        # Never wait or run past the request deadline, if there is one
+        request_timeout = deadline.clamp_timeout(timeout)
+        try:
+            bucket.acquire(max_wait=min(Config.RATE_LIMIT_MAX_WAIT, request_timeout))
+            response = get_session().get(SERPAPI_URL, params=request_params, timeout=request_timeout)
+            if response.status_code == 429:
+                bucket.on_rate_limited(rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
+                usage_ledger.record("serpapi", family, rate_limited=True)
+                if retries < Config.RATE_LIMIT_MAX_RETRIES:
+                    retries += 1
+                    continue
+            response.raise_for_status()
+            data = response.json()
+        except Exception:
+            _record(family, "errors")
+            if response is None or response.status_code != 429:
+                usage_ledger.record("serpapi", family, error=True)
+            raise
+        break
+
+    bucket.on_success()
+    usage_ledger.record("serpapi", family)
+
+    # Only cache successful searches so transient SerpAPI errors are retried
+    if "error" not in data:
+        cache.set(key, data, ttl=get_family_ttl(family))
+
+    return data
+
+def get_cache_stats():
+    """
+    Get SerpAPI cache counters
+
+    Returns:
+        dict: Per-family hit/miss/bypass/error counters, totals and cache size
+    """
+    with _stats_lock:
+        families = {name: dict(counters) for name, counters in _stats.items()}
+
+    hits = sum(counters["hits"] for counters in families.values())
+    misses = sum(counters["misses"] for counters in families.values())
+    lookups = hits + misses
+
+    return {
+        "families": families,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "entries": len(get_cache())
+    }
+
+def clear_cache():
+    """Remove all cached SerpAPI responses"""
+    get_cache().clear()
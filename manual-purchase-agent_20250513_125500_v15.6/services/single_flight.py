@@ -0,0 +1,139 @@
+import copy
+import functools
+import inspect
+import json
+import logging
+import threading
+from services import deadline
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+class _Call:
+    """One in-flight computation that duplicate callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+def _normalize(value):
+    """Normalize an argument so equivalent queries produce the same key"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+def make_key(name, signature, args, kwargs, ignore=()):
+    """
+    Build the coalescing key for a call
+
+    Arguments are bound to the function signature first, so positional and
+    keyword spellings of the same call share a key.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {
+        arg_name: _normalize(value)
+        for arg_name, value in bound.arguments.items()
+        if arg_name not in ignore
+    }
+    return name + ":" + json.dumps(arguments, sort_keys=True, default=str)
+
+def _record(name, counter):
+    with _stats_lock:
+        name_stats = _stats.setdefault(name, {"executed": 0, "coalesced": 0})
+        name_stats[counter] += 1
+
+def coalesce(name, ignore=()):
+    """
+    Decorator that collapses concurrent identical calls into one execution
+
+    The first caller runs the function; callers with the same normalized
+    arguments that arrive while it is still running wait for it and receive a
+    deep copy of its result (or the same exception). Nothing is cached once the
+    call finishes.
+
+    Args:
+        name (str): Name used in the key and the counters
+        ignore (tuple): Argument names that do not affect the result
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = make_key(name, signature, args, kwargs, ignore)
+            except (TypeError, ValueError):
+                # Arguments we cannot key on - just run the call
+                return func(*args, **kwargs)
+
+            with _inflight_lock:
+                call = _inflight.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call()
+                    _inflight[key] = call
+                else:
+                    call.waiters += 1
+
+            if not leader:
+                _record(name, "coalesced")
+                logger.info(f"Coalescing duplicate {name} request with the one in flight")
+                # A waiter never waits past its own request deadline
+                if not call.done.wait(deadline.remaining()):
+                    raise deadline.DeadlineExceeded(f"Request deadline exceeded waiting for {name}")
+                if call.error is not None:
+                    raise call.error
+                return copy.deepcopy(call.result)
+
+            _record(name, "executed")
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                # Once the key is removed no new waiter can attach, so the count is final
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+                    waiters = call.waiters
+                if waiters and call.error is None:
+                    # Waiters copy from a snapshot the leader's caller cannot mutate
+                    call.result = copy.deepcopy(result)
+                call.done.set()
+
+        return wrapper
+    return decorator
+
+def get_stats():
+    """
+    Get coalescing counters
+
+    Returns:
+        dict: Per-name executed/coalesced counts, totals and calls currently in flight
+    """
+    with _stats_lock:
+        names = {name: dict(counters) for name, counters in _stats.items()}
+    with _inflight_lock:
+        in_flight = len(_inflight)
+
+    return {
+        "functions": names,
+        "executed": sum(counters["executed"] for counters in names.values()),
+        "coalesced": sum(counters["coalesced"] for counters in names.values()),
+        "in_flight": in_flight
+    }
@@ -1,21 +1,12 @@
 import logging
 import json
-import requests
 from urllib.parse import urlparse
 from config import Config
-
-# Initialize OpenAI client
-try:
-    from openai import OpenAI
-    client = OpenAI(api_key=Config.OPENAI_API_KEY)
-    USING_NEW_OPENAI_CLIENT = True
-except ImportError:
-    import openai
-    openai.api_key = Config.OPENAI_API_KEY
-    USING_NEW_OPENAI_CLIENT = False
+from services import serpapi_client, llm_gateway, single_flight, deadline
 
 logger = logging.getLogger(__name__)
 
+@single_flight.coalesce("search_suppliers_v2")
 def search_suppliers_v2(part_number, make=None, model=None, oem_only=False):
     """
     Clean supplier search starting with raw SERP results
@@ -54,16 +45,17 @@ def search_suppliers_v2(part_number, make=None, model=None, oem_only=False):
     # Step 4: Log filtered results for review
     log_filtered_results(filtered_results)
     
-    # Step 5: AI ranking (simple for now)
-    ranked_results = rank_with_ai(filtered_results, part_number, make, model)
-    logger.info(f"AI ranked results: {len(ranked_results)} selected")
+    # Step 5: Rule-based ranking, with AI ranking only when the top candidates are too close to call
+    ranked_results, ranking_method = rank_results(filtered_results, part_number, make, model)
+    logger.info(f"Ranked results ({ranking_method}): {len(ranked_results)} selected")
     
     return {
         "query": query,
         "raw_count": len(raw_results),
         "filtered_count": len(filtered_results), 
         "final_count": len(ranked_results),
-        "suppliers": ranked_results
+        "suppliers": ranked_results,
+        "ranking_method": ranking_method
     }
 
 def get_serp_results(query):
@@ -78,9 +70,7 @@ def get_serp_results(query):
             "hl": "en"
         }
         
-        response = requests.get("https://serpapi.com/search", params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        data = serpapi_client.search(params, family="supplier_search")
         
         return data.get("organic_results", [])
         
@@ -182,11 +172,108 @@ def log_filtered_results(results):
         logger.info(f"   Part#: {result['has_part_number']}, Commercial: {result['has_commercial']}, Part Context: {result['has_part_context']}, Product Page: {result['is_product_page']}, Major Supplier: {result['is_major_supplier']}")
         logger.info("")
 
+# Major suppliers ranked right after PartsTown (the same list the AI ranking prompt gives)
+PREFERRED_SUPPLIERS = ["amazon.com", "ebay.com", "webstaurantstore.com", "etundra.com", "zoro.com", "grainger.com"]
+LISTING_PAGE_INDICATORS = ["/search", "/category", "/categories", "/browse", "/parts-list", "/catalog"]
+GENERIC_TITLE_INDICATORS = ["parts for", "parts catalog", "parts list", "shop all", "browse"]
+
+def is_listing_page(result):
+    """Search, category and catalog pages rather than a single product"""
+    path = urlparse(result['url']).path.lower().rstrip('/')
+    return any(ind in path for ind in LISTING_PAGE_INDICATORS) or path.endswith('/parts')
+
+def score_result(result, part_number):
+    """
+    Score a filtered result with the rules of the AI ranking prompt
+
+    PartsTown product pages outrank everything, then major suppliers, product
+    detail pages over listing pages, the exact part number in the title or
+    snippet, and commercial indicators.
+
+    Returns:
+        int: The score, higher is better
+    """
+    title = result['title'].lower()
+    product_page = result['is_product_page'] and not is_listing_page(result)
+
+    score = 0
+    if 'partstown.com' in result['domain'] and product_page:
+        score += 100
+    if any(supplier in result['domain'] for supplier in PREFERRED_SUPPLIERS):
+        score += 30
+    if product_page:
+        score += 25
+    elif is_listing_page(result) or any(ind in title for ind in GENERIC_TITLE_INDICATORS):
+        score -= 25
+    if part_number.lower() in title:
+        score += 15
+    elif result['has_part_number']:
+        score += 10
+    if result['has_commercial']:
+        score += 8
+    if result['has_part_context']:
+        score += 2
+    return score
+
+def pre_rank(results, part_number):
+    """
+    Rank results deterministically, keeping the best result per domain
+
+    Ties keep the search engine's order.
+
+    Returns:
+        list: Copies of the best result of each domain with their 'score', best first
+    """
+    best_per_domain = {}
+    for position, result in enumerate(results):
+        score = score_result(result, part_number)
+        current = best_per_domain.get(result['domain'])
+        if current is None or score > current[0]:
+            best_per_domain[result['domain']] = (score, position, result)
+
+    ranked = []
+    for score, position, result in sorted(best_per_domain.values(), key=lambda entry: (-entry[0], entry[1])):
+        result = result.copy()
+        result['score'] = score
+        result['ai_ranking'] = False
+        ranked.append(result)
+    return ranked
+
+def is_close_call(ranked):
+    """The first two candidates are within SUPPLIER_RANK_CLOSE_MARGIN points of each other"""
+    if len(ranked) < 2:
+        return False
+    return ranked[0]['score'] - ranked[1]['score'] < Config.SUPPLIER_RANK_CLOSE_MARGIN
+
+def rank_results(results, part_number, make, model):
+    """
+    Rank filtered results, calling the AI ranking only for close calls
+
+    Returns:
+        tuple: (up to 5 ranked results, ranking method) where the method is
+            "deterministic", "ai", or "deterministic_fallback" when the AI
+            ranking was needed but failed or was skipped
+    """
+    ranked = pre_rank(results, part_number)
+    if not is_close_call(ranked):
+        return ranked[:5], "deterministic"
+
+    logger.info(f"Top candidates too close to call ({ranked[0]['domain']} {ranked[0]['score']} vs "
+                f"{ranked[1]['domain']} {ranked[1]['score']}), asking AI to rank")
+    ai_results = rank_with_ai(ranked, part_number, make, model)
+    if ai_results and ai_results[0].get('ai_ranking'):
+        return ai_results, "ai"
+    return ranked[:5], "deterministic_fallback"
+
 def rank_with_ai(results, part_number, make, model):
     """Use AI to rank and deduplicate supplier results with PartsTown priority"""
     if not results:
         return []
     
+    # Skip the AI call when the request deadline leaves no room for it
+    if not deadline.fits("supplier_ai_ranking"):
+        return fallback_ranking(results)
+    
     logger.info(f"Starting AI ranking for {len(results)} results")
     
     # Prepare results for AI analysis
@@ -239,22 +326,12 @@ Return ONLY a JSON array of the selected result indices in ranked order (best fi
 """
 
     try:
-        if USING_NEW_OPENAI_CLIENT:
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=100
-            )
-            ai_response = response.choices[0].message.content.strip()
-        else:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=100
-            )
-            ai_response = response.choices[0].message.content.strip()
+        ai_response = llm_gateway.chat_completion(
+            model="gpt-4",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+            purpose="rank_with_ai"
+        ).strip()
         
         logger.info(f"AI response: {ai_response}")
         
@@ -265,24 +342,7 @@ Return ONLY a JSON array of the selected result indices in ranked order (best fi
                 raise ValueError("AI response is not a list")
         except Exception as e:
             logger.error(f"Failed to parse AI response: {e}, falling back to simple ranking")
-            # Fallback: simple ranking by domain priority
-            selected_indices = []
-            seen_domains = set()
-            
-            # First, add PartsTown if present
-            for i, result in enumerate(results):
-                if 'partstown.com' in result['domain'] and result['domain'] not in seen_domains:
-                    selected_indices.append(i)
-                    seen_domains.add(result['domain'])
-                    break
-            
-            # Then add others
-            for i, result in enumerate(results):
-                if len(selected_indices) >= 5:
-                    break
-                if result['domain'] not in seen_domains:
-                    selected_indices.append(i)
-                    seen_domains.add(result['domain'])
+            return fallback_ranking(results)
         
         # Build final results using AI-selected indices
         final_results = []
@@ -303,27 +363,36 @@ Return ONLY a JSON array of the selected result indices in ranked order (best fi
         
     except Exception as e:
         logger.error(f"AI ranking failed: {e}, using fallback ranking")
-        # Simple fallback if AI fails
-        seen_domains = set()
-        fallback_results = []
-        
-        # Prioritize PartsTown first
-        for result in results:
-            if 'partstown.com' in result['domain'] and result['domain'] not in seen_domains:
-                result['score'] = 100
-                result['ai_ranking'] = False
-                fallback_results.append(result)
-                seen_domains.add(result['domain'])
-                break
-        
-        # Add others
-        for result in results:
-            if len(fallback_results) >= 5:
-                break
-            if result['domain'] not in seen_domains:
-                result['score'] = 50 - len(fallback_results)
-                result['ai_ranking'] = False
-                fallback_results.append(result)
-                seen_domains.add(result['domain'])
-        
-        return fallback_results[:5]
\ No newline at end of file
+        return fallback_ranking(results)
+
+def fallback_ranking(results):
+    """
+    Simple domain-based ranking used when AI ranking fails or is skipped
+
+    Returns copies of the chosen results, so the scores of the caller's results are left alone.
+    """
+    seen_domains = set()
+    fallback_results = []
+    
+    # Prioritize PartsTown first
+    for result in results:
+        if 'partstown.com' in result['domain'] and result['domain'] not in seen_domains:
+            result = result.copy()
+            result['score'] = 100
+            result['ai_ranking'] = False
+            fallback_results.append(result)
+            seen_domains.add(result['domain'])
+            break
+    
+    # Add others
+    for result in results:
+        if len(fallback_results) >= 5:
+            break
+        if result['domain'] not in seen_domains:
+            result = result.copy()
+            result['score'] = 50 - len(fallback_results)
+            result['ai_ranking'] = False
+            fallback_results.append(result)
+            seen_domains.add(result['domain'])
+    
+    return fallback_results[:5]
\ No newline at end of file
@@ -0,0 +1,140 @@
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from config import Config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+def _ledger_path():
+    return os.path.join(Config.CACHE_DIR, "usage_ledger.db")
+
+def _connect():
+    """Get the ledger connection for the current thread, creating the table on first use"""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(Config.CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(_ledger_path(), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS api_usage ("
+                    "day TEXT NOT NULL, "
+                    "provider TEXT NOT NULL, "
+                    "endpoint TEXT NOT NULL, "
+                    "model TEXT NOT NULL DEFAULT '', "
+                    "calls INTEGER NOT NULL DEFAULT 0, "
+                    "errors INTEGER NOT NULL DEFAULT 0, "
+                    "rate_limited INTEGER NOT NULL DEFAULT 0, "
+                    "input_tokens INTEGER NOT NULL DEFAULT 0, "
+                    "output_tokens INTEGER NOT NULL DEFAULT 0, "
+                    "cost_usd REAL NOT NULL DEFAULT 0, "
+                    "PRIMARY KEY (day, provider, endpoint, model))"
+                )
+                conn.commit()
+                _initialized = True
+    return conn
+
+def estimate_cost(provider, model=None, input_tokens=0, output_tokens=0):
+    """
+    Estimate the cost of one call in USD
+
+    SerpAPI is priced per search (SERPAPI_COST_PER_SEARCH). OpenAI is priced per
+    million input/output tokens from LLM_PRICING, matching the longest model prefix.
+    """
+    if provider == "serpapi":
+        return Config.SERPAPI_COST_PER_SEARCH
+
+    prices = None
+    for prefix in sorted(Config.LLM_PRICING, key=len, reverse=True):
+        if model and model.startswith(prefix):
+            prices = Config.LLM_PRICING[prefix]
+            break
+    if prices is None:
+        return 0.0
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+def record(provider, endpoint, model=None, input_tokens=0, output_tokens=0, error=False, rate_limited=False):
+    """
+    Add one API call to today's totals
+
+    Failures to write are logged and never raised, so accounting cannot break a request.
+
+    Args:
+        provider (str): "serpapi" or "openai"
+        endpoint (str): SerpAPI search family or LLM purpose
+        model (str, optional): Model name for OpenAI calls
+        input_tokens (int): Prompt tokens used
+        output_tokens (int): Completion tokens used
+        error (bool): The call failed
+        rate_limited (bool): The call was rejected with a 429
+    """
+    if not Config.USAGE_LEDGER_ENABLED:
+        return
+
+    input_tokens = input_tokens or 0
+    output_tokens = output_tokens or 0
+    cost = 0.0 if error or rate_limited else estimate_cost(provider, model, input_tokens, output_tokens)
+    try:
+        conn = _connect()
+        conn.execute(
+            "INSERT INTO api_usage (day, provider, endpoint, model, calls, errors, rate_limited, "
+            "input_tokens, output_tokens, cost_usd) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (day, provider, endpoint, model) DO UPDATE SET "
+            "calls = calls + 1, errors = errors + excluded.errors, "
+            "rate_limited = rate_limited + excluded.rate_limited, "
+            "input_tokens = input_tokens + excluded.input_tokens, "
+            "output_tokens = output_tokens + excluded.output_tokens, "
+            "cost_usd = cost_usd + excluded.cost_usd",
+            (datetime.utcnow().strftime("%Y-%m-%d"), provider, endpoint or "default", model or "",
+             int(error), int(rate_limited), input_tokens, output_tokens, cost)
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error recording API usage: {e}")
+
+def get_usage(days=7):
+    """
+    Get usage per day, provider, endpoint and model
+
+    Args:
+        days (int): Number of days to include, counting today
+
+    Returns:
+        dict: Rows, per-day totals and overall totals
+    """
+    since = (datetime.utcnow() - timedelta(days=max(1, days) - 1)).strftime("%Y-%m-%d")
+    conn = _connect()
+    cursor = conn.execute(
+        "SELECT day, provider, endpoint, model, calls, errors, rate_limited, input_tokens, output_tokens, cost_usd "
+        "FROM api_usage WHERE day >= ? ORDER BY day DESC, cost_usd DESC",
+        (since,)
+    )
+    columns = [description[0] for description in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    totals = {"calls": 0, "errors": 0, "rate_limited": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+    by_day = {}
+    for row in rows:
+        row["cost_usd"] = round(row["cost_usd"], 4)
+        day_totals = by_day.setdefault(row["day"], {"calls": 0, "cost_usd": 0.0})
+        day_totals["calls"] += row["calls"]
+        day_totals["cost_usd"] = round(day_totals["cost_usd"] + row["cost_usd"], 4)
+        for name in totals:
+            totals[name] += row[name]
+    totals["cost_usd"] = round(totals["cost_usd"], 4)
+
+    return {"since": since, "rows": rows, "by_day": by_day, "totals": totals}
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from config import Config
+from models.part import normalize_part_number
+from services.disk_cache import DiskCache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "stored": 0, "revalidated": 0, "revalidation_errors": 0, "revalidation_dropped": 0}
+_stats_lock = threading.Lock()
+
+_queue = None
+_pending = set()
+_pending_lock = threading.Lock()
+_worker = None
+
+def get_cache():
+    """Get the shared on-disk cache of part number validation outcomes"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    os.path.join(Config.CACHE_DIR, "validation_cache.db"),
+                    table="part_validations",
+                    max_entries=Config.VALIDATION_CACHE_MAX_ENTRIES
+                )
+    return _cache
+
+def _normalize(value):
+    return " ".join(str(value or "").lower().split())
+
+def make_cache_key(part_number, make=None, model=None):
+    """
+    Build the cache key from the normalized part number, make and model
+
+    The validation judges whether the part fits the equipment, so a verdict for
+    one model is not reused for another. The description is left out: its wording
+    varies too much between requests for the same part to share entries, so a
+    verdict is reused across descriptions of the same make and model. Callers that
+    need the fit to the current description judged again pass reuse_verdict=False
+    to validate_part_with_serpapi.
+
+    Returns:
+        str: The key, or None if the part number has no letters or digits
+    """
+    normalized = normalize_part_number(part_number)
+    if not normalized:
+        return None
+    payload = json.dumps({
+        "part_number": normalized,
+        "make": _normalize(make),
+        "model": _normalize(model)
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+def get(part_number, make=None, model=None):
+    """
+    Look up a cached validation outcome
+
+    Entries older than VALIDATION_REVALIDATE_AFTER are still returned but marked
+    stale, so the caller can schedule a re-validation.
+
+    Returns:
+        dict: {"validation", "stale"} with the validation marked with from_cache
+            and validated_at, or None
+    """
+    key = make_cache_key(part_number, make, model)
+    if key is None:
+        return None
+
+    entry = get_cache().get_entry(key)
+    if entry is None:
+        _record("misses")
+        return None
+
+    stale = time.time() - entry["created_at"] > Config.VALIDATION_REVALIDATE_AFTER
+    _record("stale_hits" if stale else "hits")
+    logger.info(f"Validation cache {'stale ' if stale else ''}hit for {part_number} ({make} {model})")
+
+    validation = entry["value"]
+    validation["from_cache"] = True
+    validation["validated_at"] = datetime.utcfromtimestamp(entry["created_at"]).isoformat() + "Z"
+    return {"validation": validation, "stale": stale}
+
+def put(part_number, make, validation, model=None):
+    """
+    Store a completed validation outcome for VALIDATION_CACHE_TTL
+
+    Only outcomes of a validation that ran to completion should be stored, not
+    timeouts or errors.
+    """
+    key = make_cache_key(part_number, make, model)
+    if key is None or not validation or Config.VALIDATION_CACHE_TTL <= 0:
+        return
+
+    stored = {name: value for name, value in validation.items() if name not in ("from_cache", "validated_at")}
+    get_cache().set(key, stored, ttl=Config.VALIDATION_CACHE_TTL)
+    _record("stored")
+
+def schedule_revalidation(part_number, make, revalidate, model=None):
+    """
+    Queue a stale entry for re-validation by the background worker
+
+    The worker is started on first use. A part number already queued is not
+    queued again, and entries are dropped when the queue is full.
+
+    Args:
+        part_number (str): Part number of the stale entry
+        make (str): Make of the stale entry
+        model (str, optional): Model of the stale entry
+        revalidate (callable): Runs the validation; returns the new outcome, or None
+            if it did not complete (the old entry is then kept)
+    """
+    key = make_cache_key(part_number, make, model)
+    if key is None:
+        return
+
+    _start_worker()
+    with _pending_lock:
+        if key in _pending:
+            return
+        try:
+            _queue.put_nowait((key, part_number, make, model, revalidate))
+        except queue.Full:
+            _record("revalidation_dropped")
+            return
+        _pending.add(key)
+
+def _start_worker():
+    global _queue, _worker
+    if _worker is None:
+        with _pending_lock:
+            if _worker is None:
+                _queue = queue.Queue(maxsize=Config.VALIDATION_REVALIDATE_QUEUE_SIZE)
+                _worker = threading.Thread(target=_worker_loop, name="validation-revalidate", daemon=True)
+                _worker.start()
+                logger.info("Started validation re-validation worker")
+
+def _worker_loop():
+    """Re-validate queued stale entries one at a time until the process exits"""
+    while True:
+        key, part_number, make, model, revalidate = _queue.get()
+        try:
+            validation = revalidate()
+            if validation is not None:
+                put(part_number, make, validation, model)
+                _record("revalidated")
+                logger.info(f"Re-validated {part_number} ({make}): valid={validation.get('is_valid')}")
+        except Exception as e:
+            _record("revalidation_errors")
+            logger.error(f"Error re-validating {part_number}: {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(key)
+
+def get_cache_stats():
+    """
+    Get validation cache counters
+
+    Returns:
+        dict: Hit/miss/store and re-validation counters, hit rate, queue length and cache size
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+
+    hits = stats["hits"] + stats["stale_hits"]
+    lookups = hits + stats["misses"]
+    stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+    stats["revalidation_queue"] = _queue.qsize() if _queue is not None else 0
+    stats["entries"] = len(get_cache())
+    return stats
+
+def clear_cache():
+    """Remove all cached validation outcomes"""
+    get_cache().clear()
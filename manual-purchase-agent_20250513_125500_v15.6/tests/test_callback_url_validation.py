@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import unittest
+from unittest import mock
+from config import Config
+from services.resolve_jobs import validate_callback_url
+
+class TestCallbackURLValidation(unittest.TestCase):
+    """Test that resolve job callback URLs cannot reach internal addresses"""
+
+    def setUp(self):
+        """Run every test without an allowlist and with private addresses rejected"""
+        patcher = mock.patch.multiple(Config, RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS=[],
+                                      RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rejects_internal_addresses(self):
+        """Loopback, link-local (cloud metadata), private and unspecified addresses are rejected"""
+        for url in [
+            "http://127.0.0.1/hook",
+            "http://localhost:5000/hook",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://10.0.0.5/hook",
+            "http://192.168.1.1/hook",
+            "http://172.16.0.1/hook",
+            "http://0.0.0.0/hook",
+            "http://[::1]/hook",
+            "http://2130706433/hook",  # 127.0.0.1 in decimal
+        ]:
+            with self.subTest(url=url):
+                with self.assertRaises(ValueError):
+                    validate_callback_url(url)
+
+    def test_rejects_non_http_urls(self):
+        """Only http(s) URLs with a host are accepted"""
+        for url in ["file:///etc/passwd", "ftp://8.8.8.8/hook", "gopher://8.8.8.8/", "http:///hook", "not-a-url", "", None]:
+            with self.subTest(url=url):
+                with self.assertRaises(ValueError):
+                    validate_callback_url(url)
+
+    def test_accepts_public_address(self):
+        """A URL resolving to a public address is accepted"""
+        self.assertIsNone(validate_callback_url("https://8.8.8.8/hook"))
+
+    def test_allowlist(self):
+        """With an allowlist, only listed hosts (and subdomains of dotted entries) are accepted"""
+        with mock.patch.multiple(Config, RESOLVE_JOB_CALLBACK_ALLOWED_HOSTS=["hooks.partner.com", ".example.com"],
+                                 RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE=True):
+            self.assertIsNone(validate_callback_url("https://hooks.partner.com/resolve"))
+            self.assertIsNone(validate_callback_url("https://api.example.com/resolve"))
+            for url in ["https://partner.com/resolve", "https://evil.com/resolve", "https://example.com.evil.com/resolve"]:
+                with self.subTest(url=url):
+                    with self.assertRaises(ValueError):
+                        validate_callback_url(url)
+
+    def test_allow_private_for_development(self):
+        """RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE lets local callbacks through"""
+        with mock.patch.object(Config, "RESOLVE_JOB_CALLBACK_ALLOW_PRIVATE", True):
+            self.assertIsNone(validate_callback_url("http://localhost:5000/hook"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from config import Config
+from services import deadline
+
+class TestDeadline(unittest.TestCase):
+    """Test the request deadline shared by resolve stages and external calls"""
+
+    def test_from_ms(self):
+        """deadline_ms builds a deadline; missing means none, non-positive or non-numeric is an error"""
+        self.assertIsNone(deadline.from_ms(None))
+        self.assertIsNone(deadline.from_ms(""))
+        self.assertAlmostEqual(deadline.from_ms("2000").remaining(), 2.0, delta=0.1)
+        for value in (0, -5, "soon", [1]):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    deadline.from_ms(value)
+
+    def test_clamp_without_deadline(self):
+        """Without a deadline timeouts are left alone"""
+        self.assertEqual(deadline.clamp_timeout(30), 30)
+        self.assertIsNone(deadline.clamp_timeout(None))
+
+    def test_clamp_to_remaining(self):
+        """Timeouts are shortened to the time left, and None becomes the time left"""
+        with deadline.scope(deadline.from_ms(1000)):
+            self.assertLessEqual(deadline.clamp_timeout(30), 1.0)
+            self.assertEqual(deadline.clamp_timeout(0.2), 0.2)
+            self.assertLessEqual(deadline.clamp_timeout(None), 1.0)
+        self.assertEqual(deadline.clamp_timeout(30), 30)
+
+    def test_clamp_after_expiry(self):
+        """A call attempted after the deadline raises DeadlineExceeded"""
+        with deadline.scope(deadline.from_ms(1)):
+            time.sleep(0.01)
+            with self.assertRaises(deadline.DeadlineExceeded):
+                deadline.clamp_timeout(30)
+
+    def test_fits_records_dropped_stages(self):
+        """A stage that needs more than the time left does not fit and is recorded"""
+        request_deadline = deadline.from_ms(1000)
+        with mock.patch.object(Config, "DEADLINE_STAGE_MIN_SECONDS", {"similar_parts": 5, "database_validation": 0.5}):
+            with deadline.scope(request_deadline):
+                self.assertTrue(deadline.fits("database_validation"))
+                self.assertFalse(deadline.fits("similar_parts"))
+            self.assertTrue(deadline.fits("similar_parts"))
+        self.assertEqual([dropped["stage"] for dropped in request_deadline.dropped_stages], ["similar_parts"])
+        self.assertEqual(request_deadline.dropped_stages[0]["reason"], "insufficient_budget")
+
+    def test_submit_carries_deadline(self):
+        """Work submitted to a pool runs under the caller's deadline"""
+        request_deadline = deadline.from_ms(5000)
+        with ThreadPoolExecutor(max_workers=1) as executor, deadline.scope(request_deadline):
+            self.assertIs(deadline.submit(executor, deadline.current).result(), request_deadline)
+            self.assertIsNone(executor.submit(deadline.current).result())
+
+    def test_cancelled_stage_stops_at_next_call(self):
+        """Once its cancel event is set, a stage's next external call raises StageCancelled"""
+        def stage(started, release):
+            deadline.clamp_timeout(10)
+            started.set()
+            release.wait(5)
+            deadline.clamp_timeout(10)
+
+        started, release = threading.Event(), threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future, cancel_event = deadline.submit_cancellable(executor, stage, started, release)
+            self.assertTrue(started.wait(5))
+            cancel_event.set()
+            release.set()
+            with self.assertRaises(deadline.StageCancelled):
+                future.result(5)
+
+if __name__ == "__main__":
+    unittest.main()
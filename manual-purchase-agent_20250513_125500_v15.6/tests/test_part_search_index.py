@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import sqlite3
+import unittest
+from types import SimpleNamespace
+from services.part_search_index import build_match_query
+from services.part_trigram_index import part_similarity
+
+class TestBuildMatchQuery(unittest.TestCase):
+    """Test how descriptions become FTS5 queries"""
+
+    def setUp(self):
+        """An in-memory FTS5 table with the same tokenizer as parts_fts"""
+        self.db = sqlite3.connect(":memory:")
+        self.addCleanup(self.db.close)
+        self.db.execute("CREATE VIRTUAL TABLE parts_fts USING fts5(description, tokenize='unicode61 remove_diacritics 2')")
+        self.db.executemany("INSERT INTO parts_fts(rowid, description) VALUES (?, ?)", [
+            (1, "High limit thermostat, fryers"),
+            (2, "Drain valve assembly"),
+            (3, "Fan motor"),
+        ])
+
+    def matches(self, description):
+        rows = self.db.execute("SELECT rowid FROM parts_fts WHERE parts_fts MATCH ? ORDER BY rank",
+                               (build_match_query(description),)).fetchall()
+        return [row[0] for row in rows]
+
+    def test_every_word_as_a_prefix(self):
+        """Every word must match, as a quoted prefix"""
+        self.assertEqual(build_match_query("Fryer  Hi-Limit"), '"fryer"* "hi"* "limit"*')
+        self.assertEqual(self.matches("fryer high limit"), [1])
+        self.assertEqual(self.matches("thermostat fryer"), [1])
+        self.assertEqual(self.matches("drain motor"), [])
+
+    def test_no_words(self):
+        """A description without words gives no query"""
+        self.assertIsNone(build_match_query(""))
+        self.assertIsNone(build_match_query(None))
+        self.assertIsNone(build_match_query(" -- / "))
+
+    def test_fts_syntax_is_not_injected(self):
+        """FTS5 operators and quotes in the description are matched as words, not parsed"""
+        for description in ['fan OR drain', 'NEAR(fan motor)', 'fan" OR "drain', 'description:fan', 'fan*', 'fan -motor']:
+            with self.subTest(description=description):
+                self.matches(description)
+        self.assertEqual(self.matches("fan OR drain"), [])
+
+class TestPartSimilarity(unittest.TestCase):
+    """Test the confidence reported for full-text matches"""
+
+    def test_similarity(self):
+        """Similarity is 1 for the same description, lower for a different one, and uses the best text"""
+        part = SimpleNamespace(description="High limit thermostat", generic_description="Fryer hi-limit")
+        self.assertEqual(part_similarity("high limit thermostat", part), 1.0)
+        self.assertEqual(part_similarity("FRYER HI-LIMIT", part), 1.0)
+        self.assertLess(part_similarity("limit switch", part), 0.7)
+        self.assertEqual(part_similarity("", part), 0.0)
+        self.assertEqual(part_similarity("fan", SimpleNamespace(description=None, generic_description=None)), 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import unittest
+from services.part_trigram_index import TrigramIndex
+
+class TestTrigramIndex(unittest.TestCase):
+    """Test fuzzy description matching of stored parts"""
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add(1, "WS01F01092", "Pitco", ["Fryer high limit thermostat", "Hi-limit"])
+        self.index.add(2, "60125601", "Pitco", ["Drain valve assembly"])
+        self.index.add(3, "8261359", "Frymaster", ["Fryer high limit thermostat"])
+
+    def test_trigrams(self):
+        """Trigrams are taken per word, lowercased and padded"""
+        self.assertEqual(TrigramIndex.trigrams("Hi!"), {"  h", " hi", "hi "})
+        self.assertEqual(TrigramIndex.trigrams(""), set())
+
+    def test_scores(self):
+        """The same description scores 1, typos score high, and results are best first"""
+        results = self.index.search("fryer high limit thermostat", threshold=0.3)
+        self.assertEqual([result["part_id"] for result in results[:2]], [1, 3])
+        self.assertEqual(results[0]["score"], 1.0)
+        typo = self.index.search("fryer hihg limit thermostat", threshold=0.5)
+        self.assertGreater(typo[0]["score"], 0.7)
+        self.assertEqual(self.index.search("drain valve assy", threshold=0.5)[0]["part_id"], 2)
+
+    def test_best_document_per_part(self):
+        """A part scores as its best matching description"""
+        results = self.index.search("hi-limit", threshold=0.5)
+        self.assertEqual(results[0]["part_id"], 1)
+        self.assertEqual(results[0]["score"], 1.0)
+
+    def test_threshold_and_make(self):
+        """Results below the threshold or from another manufacturer are dropped"""
+        self.assertEqual(self.index.search("conveyor belt", threshold=0.5), [])
+        results = self.index.search("fryer high limit thermostat", make="frymaster", threshold=0.5)
+        self.assertEqual([result["part_id"] for result in results], [3])
+
+    def test_replace_and_remove(self):
+        """Adding a part again replaces its descriptions; removing it drops it"""
+        self.index.add(2, "60125601", "Pitco", ["Fan motor"])
+        self.assertEqual(self.index.search("drain valve assembly", threshold=0.5), [])
+        self.assertEqual(self.index.search("fan motor", threshold=0.5)[0]["part_id"], 2)
+        self.index.remove(2)
+        self.assertEqual(self.index.search("fan motor", threshold=0.5), [])
+        self.assertEqual(len(self.index), 2)
+
+if __name__ == "__main__":
+    unittest.main()
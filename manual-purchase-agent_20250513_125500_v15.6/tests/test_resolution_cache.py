@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from config import Config
+from services import resolution_cache
+from services.disk_cache import DiskCache
+
+FOUND = {"recommended_result": {"oem_part_number": "WS01F01092"}, "similar_parts": []}
+NOT_FOUND = {"recommended_result": None, "similar_parts": []}
+
+class TestResolutionCacheKey(unittest.TestCase):
+    """Test the resolve cache key"""
+
+    def test_equivalent_queries_share_a_key(self):
+        """Case and whitespace do not change the key"""
+        self.assertEqual(
+            resolution_cache.make_cache_key("Fryer  Hi-Limit", "Pitco", "SG14", 2019),
+            resolution_cache.make_cache_key(" fryer hi-limit ", "PITCO", "sg14", "2019")
+        )
+
+    def test_query_and_methods_change_the_key(self):
+        """Any query field or enabled search method gives a different key"""
+        base = resolution_cache.make_cache_key("fryer hi-limit", "Pitco", "SG14", "2019")
+        for other in [
+            resolution_cache.make_cache_key("fryer thermostat", "Pitco", "SG14", "2019"),
+            resolution_cache.make_cache_key("fryer hi-limit", "Frymaster", "SG14", "2019"),
+            resolution_cache.make_cache_key("fryer hi-limit", "Pitco", "SG18", "2019"),
+            resolution_cache.make_cache_key("fryer hi-limit", "Pitco", "SG14", "2020"),
+            resolution_cache.make_cache_key("fryer hi-limit", "Pitco", "SG14", "2019", use_web_search=False),
+        ]:
+            self.assertNotEqual(base, other)
+
+class TestResolutionCacheTTL(unittest.TestCase):
+    """Test how long resolve responses are kept"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        patchers = [
+            mock.patch.object(resolution_cache, "_cache", DiskCache(os.path.join(self.directory, "resolve.db"), table="resolve_responses")),
+            mock.patch.multiple(Config, RESOLVE_CACHE_TTL=7 * 24 * 3600, RESOLVE_CACHE_NEGATIVE_TTL=3600,
+                                RESOLVE_CACHE_DEGRADED_TTL=600),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stored_ttl(self, response):
+        """Store a response and return the TTL it was stored with, or None if it was not stored"""
+        resolution_cache.put(response, "fryer hi-limit", "Pitco", "SG14")
+        key = resolution_cache.make_cache_key("fryer hi-limit", "Pitco", "SG14")
+        entry = resolution_cache.get_cache().get_entry(key)
+        resolution_cache.get_cache().delete(key)
+        return None if entry is None else round(entry["expires_at"] - entry["created_at"])
+
+    def test_ttl_selection(self):
+        """Found, not found and degraded responses get their own TTLs; errors are not stored"""
+        failed_leg = {"manual_search_result": {"found": False, "error": "timeout"}}
+        unvalidated = {"database_result": {"found": True, "serpapi_validation": {"is_valid": False, "incomplete": True}}}
+        self.assertEqual(self.stored_ttl(dict(FOUND)), 7 * 24 * 3600)
+        self.assertEqual(self.stored_ttl(dict(NOT_FOUND)), 3600)
+        self.assertEqual(self.stored_ttl(dict(FOUND, **failed_leg)), 600)
+        self.assertEqual(self.stored_ttl(dict(FOUND, **unvalidated)), 600)
+        self.assertIsNone(self.stored_ttl(dict(FOUND, error="SerpAPI unavailable")))
+
+    def test_degraded_ttl_never_extends(self):
+        """A degraded TTL longer than the normal one does not extend it"""
+        with mock.patch.object(Config, "RESOLVE_CACHE_DEGRADED_TTL", 7200):
+            self.assertEqual(self.stored_ttl(dict(NOT_FOUND, manual_search_result={"error": "timeout"})), 3600)
+
+    def test_round_trip(self):
+        """A stored response comes back marked as cached"""
+        resolution_cache.put(dict(FOUND), "Fryer Hi-Limit", "Pitco", "SG14")
+        cached = resolution_cache.get("fryer hi-limit", "pitco", "sg14")
+        self.assertEqual(cached["recommended_result"], FOUND["recommended_result"])
+        self.assertTrue(cached["from_cache"])
+        self.assertTrue(cached["cached_at"].endswith("Z"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from config import Config
+from services import resolution_vector_index
+from services.resolution_vector_index import ResolutionVectorIndex, descriptions_agree
+
+RESULT = {"oem_part_number": "WS01-F01092", "serpapi_validation": {"is_valid": True, "confidence_score": 0.9}}
+
+class TestDescriptionsAgree(unittest.TestCase):
+    """Test the token overlap rule that decides whether a prior resolution is reused"""
+
+    def setUp(self):
+        patcher = mock.patch.object(Config, "RESOLVE_VECTOR_MIN_TOKEN_OVERLAP", 0.6)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rewordings_agree(self):
+        """Word order, spelling variants, plurals and filler words do not matter"""
+        self.assertTrue(descriptions_agree("high limit thermostat fryer", "Fryer hi-limit thermostat"))
+        self.assertTrue(descriptions_agree("door gaskets", "the door gasket"))
+        self.assertTrue(descriptions_agree("oven door gasket", "door gasket"))
+
+    def test_different_nouns_disagree(self):
+        """Descriptions that each have a word of their own name different parts"""
+        self.assertFalse(descriptions_agree("fan motor", "drain motor"))
+        self.assertFalse(descriptions_agree("upper heating element", "lower heating element"))
+
+    def test_added_qualifier_disagrees(self):
+        """Adding a position, variant or packaging word names a different part"""
+        self.assertFalse(descriptions_agree("drain valve", "drain valve assembly"))
+        self.assertFalse(descriptions_agree("heating element", "upper heating element"))
+
+    def test_overlap_threshold(self):
+        """A description that only shares a small part of the other's words does not agree"""
+        self.assertFalse(descriptions_agree("motor", "convection oven fan blower motor"))
+        with mock.patch.object(Config, "RESOLVE_VECTOR_MIN_TOKEN_OVERLAP", 0.1):
+            self.assertTrue(descriptions_agree("motor", "convection oven fan blower motor"))
+
+    def test_empty_descriptions(self):
+        """Empty or filler-only descriptions never agree"""
+        self.assertFalse(descriptions_agree("", "door gasket"))
+        self.assertFalse(descriptions_agree("the oem part", "the oem part"))
+
+class TestResolutionVectorIndex(unittest.TestCase):
+    """Test the disk-backed resolution vector index"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_search_is_scoped_to_make_and_model(self):
+        """Only resolutions for the same make and model are returned, best first"""
+        index = ResolutionVectorIndex(self.directory, dim=256)
+        index.add("fryer high limit thermostat", "Pitco", "SG14", None, RESULT)
+        index.add("fryer drain valve", "Pitco", "SG14", None, RESULT)
+        index.add("fryer high limit thermostat", "Frymaster", "H55", None, RESULT)
+
+        matches = index.search("fryer hi-limit thermostat", "pitco", "sg14", limit=2)
+        self.assertEqual([match["description"] for match in matches],
+                         ["fryer high limit thermostat", "fryer drain valve"])
+        self.assertGreater(matches[0]["similarity"], matches[1]["similarity"])
+        self.assertEqual(index.search("fryer high limit thermostat", "Pitco", "Other"), [])
+        self.assertEqual(index.search("fryer drain valve", "Pitco", "SG14", threshold=1.01), [])
+        self.assertEqual(index.search("", "Pitco", "SG14"), [])
+
+    def test_same_query_replaces_entry(self):
+        """A later resolution of the same query replaces the earlier one"""
+        index = ResolutionVectorIndex(self.directory, dim=256)
+        index.add("door gasket", "Vulcan", "VC4", "2019", RESULT)
+        index.add("Door Gasket", "vulcan", "vc4", "2019", dict(RESULT, oem_part_number="00-123456"))
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.search("door gasket", "Vulcan", "VC4")[0]["result"]["oem_part_number"], "00-123456")
+        self.assertEqual(len(ResolutionVectorIndex(self.directory, dim=256)), 1)
+
+    def test_reload_matches_snapshot_and_other_processes(self):
+        """Reloading keeps entries from every writer and lines vectors up with their entries"""
+        first = ResolutionVectorIndex(self.directory, dim=256, snapshot_every=1)
+        second = ResolutionVectorIndex(self.directory, dim=256, snapshot_every=1000)
+        first.add("door gasket", "Vulcan", "VC4", None, RESULT)
+        second.add("convection fan motor", "Vulcan", "VC4", None, RESULT)
+        first.add("drain valve", "Vulcan", "VC4", None, RESULT)
+
+        reloaded = ResolutionVectorIndex(self.directory, dim=256)
+        self.assertEqual(len(reloaded), 3)
+        for description in ("door gasket", "convection fan motor", "drain valve"):
+            with self.subTest(description=description):
+                match = reloaded.search(description, "Vulcan", "VC4")[0]
+                self.assertEqual(match["description"], description)
+                self.assertAlmostEqual(match["similarity"], 1.0, places=2)
+
+    def test_load_compacts_duplicate_lines(self):
+        """A log that is mostly superseded lines is rewritten with one line per key on load"""
+        index = ResolutionVectorIndex(self.directory, dim=256)
+        for _ in range(120):
+            index.add("door gasket", "Vulcan", "VC4", None, RESULT)
+        index.add("drain valve", "Vulcan", "VC4", None, RESULT)
+
+        reloaded = ResolutionVectorIndex(self.directory, dim=256)
+        self.assertEqual(len(reloaded), 2)
+        with open(reloaded.entries_path, encoding="utf-8") as f:
+            descriptions = [json.loads(line)["description"] for line in f]
+        self.assertEqual(sorted(descriptions), ["door gasket", "drain valve"])
+
+    def test_clear(self):
+        """Clearing removes entries in memory and on disk"""
+        index = ResolutionVectorIndex(self.directory, dim=256, snapshot_every=1)
+        index.add("door gasket", "Vulcan", "VC4", None, RESULT)
+        index.clear()
+
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.search("door gasket", "Vulcan", "VC4"), [])
+        self.assertEqual(len(ResolutionVectorIndex(self.directory, dim=256)), 0)
+
+class TestFindPriorResolution(unittest.TestCase):
+    """Test when a prior resolution is marked reusable"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        index = ResolutionVectorIndex(self.directory, dim=256)
+        index.add("fryer high limit thermostat", "Pitco", "SG14", "2018", RESULT)
+        for patcher in (
+            mock.patch.object(resolution_vector_index, "_index", index),
+            mock.patch.multiple(Config, RESOLVE_VECTOR_INDEX_ENABLED=True, RESOLVE_VECTOR_THRESHOLD=0.5,
+                                RESOLVE_VECTOR_MIN_TOKEN_OVERLAP=0.6)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rewording_is_reusable(self):
+        """A reworded description for the same year reuses the prior resolution"""
+        match = resolution_vector_index.find_prior_resolution("Fryer hi-limit thermostat", "Pitco", "SG14", "2018")
+        self.assertTrue(match["reusable"])
+        self.assertEqual(match["result"]["oem_part_number"], "WS01-F01092")
+
+    def test_other_year_is_only_a_candidate(self):
+        """A match for a different year is returned but not reusable"""
+        match = resolution_vector_index.find_prior_resolution("fryer high limit thermostat", "Pitco", "SG14", "2020")
+        self.assertFalse(match["reusable"])
+
+    def test_disabled(self):
+        """Nothing is looked up when the index is disabled"""
+        with mock.patch.object(Config, "RESOLVE_VECTOR_INDEX_ENABLED", False):
+            self.assertIsNone(resolution_vector_index.find_prior_resolution("fryer high limit thermostat",
+                                                                            "Pitco", "SG14", "2018"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from config import Config
+from services.part_resolver import _short_circuits, _build_database_result
+
+VALID = {"is_valid": True, "confidence_score": 0.9}
+
+def leg_result(**overrides):
+    """A found leg result that clears the short-circuit gate unless overridden"""
+    result = {
+        "found": True,
+        "oem_part_number": "WS01F01092",
+        "confidence": 0.95,
+        "alternate_part_numbers": ["WS01F01092A"],
+        "serpapi_validation": dict(VALID)
+    }
+    result.update(overrides)
+    return result
+
+def database_part(matched_on=None, match_score=None, match_similarity=None):
+    """A stored part as returned by find_exact_match"""
+    part = SimpleNamespace(
+        oem_part_number="WS01F01092",
+        manufacturer="Whirlpool",
+        description="Fryer high limit thermostat",
+        alternate_part_numbers='["WS01F01092A"]',
+        get_alternate_part_numbers=lambda: ["WS01F01092A"]
+    )
+    for name, value in (("matched_on", matched_on), ("match_score", match_score), ("match_similarity", match_similarity)):
+        if value is not None:
+            setattr(part, name, value)
+    return part
+
+class TestShortCircuitGate(unittest.TestCase):
+    """Test which leg results let the lower-priority resolve legs be skipped"""
+
+    def setUp(self):
+        """Run every test with the default gate settings"""
+        patcher = mock.patch.multiple(Config, RESOLVE_SHORT_CIRCUIT_ENABLED=True,
+                                      RESOLVE_SHORT_CIRCUIT_MIN_CONFIDENCE=0.85,
+                                      RESOLVE_SHORT_CIRCUIT_MIN_VALIDATION=0.8,
+                                      RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_confident_validated_result_short_circuits(self):
+        """A confident, validated result with alternates and a real part number clears the gate"""
+        self.assertTrue(_short_circuits(leg_result()))
+
+    def test_rejected_results(self):
+        """Each missing condition keeps the other legs running"""
+        for name, result in [
+            ("not found", leg_result(found=False)),
+            ("empty", None),
+            ("low confidence", leg_result(confidence=0.6)),
+            ("not validated", leg_result(serpapi_validation={"is_valid": False, "confidence_score": 0.9})),
+            ("weak validation", leg_result(serpapi_validation={"is_valid": True, "confidence_score": 0.5})),
+            ("validation skipped", leg_result(serpapi_validation=None)),
+            ("no alternates", leg_result(alternate_part_numbers=[])),
+            ("placeholder part number", leg_result(oem_part_number="N/A")),
+        ]:
+            with self.subTest(name):
+                self.assertFalse(_short_circuits(result))
+
+    def test_disabled(self):
+        """RESOLVE_SHORT_CIRCUIT_ENABLED turns the gate off"""
+        with mock.patch.object(Config, "RESOLVE_SHORT_CIRCUIT_ENABLED", False):
+            self.assertFalse(_short_circuits(leg_result()))
+
+    def test_alternates_optional(self):
+        """Without RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES a result without alternates can clear the gate"""
+        with mock.patch.object(Config, "RESOLVE_SHORT_CIRCUIT_REQUIRE_ALTERNATES", False):
+            self.assertTrue(_short_circuits(leg_result(alternate_part_numbers=[])))
+
+    def test_literal_database_matches_short_circuit(self):
+        """Database matches on the description or a part number clear the gate"""
+        for matched_on in (None, "oem_part_number", "alternate_part_number"):
+            with self.subTest(matched_on=matched_on):
+                self.assertTrue(_short_circuits(_build_database_result(database_part(matched_on), dict(VALID))))
+
+    def test_approximate_database_matches_never_short_circuit(self):
+        """Full-text and fuzzy database matches never clear the gate, even with a high score"""
+        fuzzy = _build_database_result(database_part("fuzzy_description", match_score=0.99), dict(VALID))
+        full_text = _build_database_result(database_part("full_text", match_score=12.5, match_similarity=0.99), dict(VALID))
+        self.assertFalse(_short_circuits(fuzzy))
+        self.assertFalse(_short_circuits(full_text))
+
+if __name__ == "__main__":
+    unittest.main()
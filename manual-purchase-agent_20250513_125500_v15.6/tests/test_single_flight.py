@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from services import deadline
+from services.single_flight import coalesce
+
+class TestCoalesce(unittest.TestCase):
+    """Test that concurrent identical calls run once"""
+
+    def make_slow_call(self, name, ignore=()):
+        """A coalesced function that blocks until released and counts its executions"""
+        self.calls = 0
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+        @coalesce(name, ignore=ignore)
+        def lookup(description, make=None, bypass_cache=False):
+            self.calls += 1
+            self.started.set()
+            self.release.wait(5)
+            return {"description": description, "alternates": []}
+
+        return lookup
+
+    def run_concurrently(self, call, argument_sets):
+        """Start the first call, then the others while it is in flight, and return all results"""
+        with ThreadPoolExecutor(max_workers=len(argument_sets)) as executor:
+            first = executor.submit(call, *argument_sets[0][0], **argument_sets[0][1])
+            self.assertTrue(self.started.wait(5))
+            others = [executor.submit(call, *args, **kwargs) for args, kwargs in argument_sets[1:]]
+            time.sleep(0.1)
+            self.release.set()
+            return [future.result(5) for future in [first] + others]
+
+    def test_identical_calls_run_once(self):
+        """Calls with the same normalized arguments, positional or keyword, share one execution"""
+        lookup = self.make_slow_call("test_identical")
+        results = self.run_concurrently(lookup, [
+            (("Fryer Hi-Limit", "Pitco"), {}),
+            (("fryer  hi-limit",), {"make": "PITCO"}),
+            ((), {"description": "FRYER HI-LIMIT", "make": "pitco"}),
+        ])
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    def test_waiters_get_copies(self):
+        """Each caller gets its own copy of the result"""
+        lookup = self.make_slow_call("test_copies")
+        results = self.run_concurrently(lookup, [(("gasket",), {}), (("gasket",), {})])
+        results[0]["alternates"].append("mutated")
+        self.assertEqual(results[1]["alternates"], [])
+
+    def test_different_arguments_run_separately(self):
+        """Calls that differ in an argument are not coalesced unless it is ignored"""
+        lookup = self.make_slow_call("test_different")
+        self.release.set()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda make: lookup("gasket", make), ["Pitco", "Frymaster"]))
+        self.assertEqual(self.calls, 2)
+
+        ignoring = self.make_slow_call("test_ignore", ignore=("bypass_cache",))
+        self.run_concurrently(ignoring, [(("gasket",), {"bypass_cache": False}), (("gasket",), {"bypass_cache": True})])
+        self.assertEqual(self.calls, 1)
+
+    def test_errors_are_shared(self):
+        """Waiters receive the leader's exception, and a later call runs again"""
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @coalesce("test_errors")
+        def failing(description):
+            calls.append(description)
+            started.set()
+            release.wait(5)
+            raise RuntimeError("SerpAPI unavailable")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(failing, "gasket")
+            self.assertTrue(started.wait(5))
+            second = executor.submit(failing, "gasket")
+            time.sleep(0.1)
+            release.set()
+            for future in (first, second):
+                with self.assertRaises(RuntimeError):
+                    future.result(5)
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(RuntimeError):
+            failing("gasket")
+        self.assertEqual(len(calls), 2)
+
+    def test_waiter_respects_its_deadline(self):
+        """A waiter gives up when its own request deadline runs out"""
+        lookup = self.make_slow_call("test_deadline")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(lookup, "gasket")
+            self.assertTrue(self.started.wait(5))
+            with deadline.scope(deadline.from_ms(50)):
+                with self.assertRaises(deadline.DeadlineExceeded):
+                    lookup("gasket")
+            self.release.set()
+            leader.result(5)
+
+if __name__ == "__main__":
+    unittest.main()
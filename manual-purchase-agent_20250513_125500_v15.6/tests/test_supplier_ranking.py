@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+import unittest
+from unittest import mock
+from config import Config
+from services import llm_gateway
+from services.supplier_finder_v2 import pre_rank, is_close_call, rank_results
+
+PART_NUMBER = "WS01F01092"
+
+def supplier_result(domain, path="/product/ws01f01092", title=f"{PART_NUMBER} Fryer Thermostat", **flags):
+    """A filtered search result as produced by filter_raw_results"""
+    result = {
+        "domain": domain,
+        "url": f"https://www.{domain}{path}",
+        "title": title,
+        "snippet": "In stock, buy now",
+        "has_part_number": True,
+        "is_product_page": True,
+        "has_commercial": True,
+        "has_part_context": True,
+        "is_major_supplier": False
+    }
+    result.update(flags)
+    return result
+
+class TestPreRank(unittest.TestCase):
+    """Test the deterministic supplier ranking"""
+
+    def test_partstown_product_page_first(self):
+        """A PartsTown product page outranks major suppliers and other product pages"""
+        ranked = pre_rank([supplier_result("example-parts.com"), supplier_result("amazon.com"), supplier_result("partstown.com")], PART_NUMBER)
+        self.assertEqual([result["domain"] for result in ranked], ["partstown.com", "amazon.com", "example-parts.com"])
+
+    def test_listing_pages_rank_below_product_pages(self):
+        """Search and category pages rank below product pages of the same kind of site"""
+        ranked = pre_rank([
+            supplier_result("listing-parts.com", path="/search?q=ws01f01092", title="Parts for Pitco"),
+            supplier_result("product-parts.com")
+        ], PART_NUMBER)
+        self.assertEqual(ranked[0]["domain"], "product-parts.com")
+
+    def test_best_result_per_domain(self):
+        """Only the best result of each domain is kept, as a copy with its score"""
+        listing = supplier_result("amazon.com", path="/s/search", title="Shop all fryer parts", is_product_page=False)
+        product = supplier_result("amazon.com")
+        ranked = pre_rank([listing, product], PART_NUMBER)
+        self.assertEqual(len(ranked), 1)
+        self.assertEqual(ranked[0]["url"], product["url"])
+        self.assertNotIn("score", product)
+        self.assertFalse(ranked[0]["ai_ranking"])
+
+    def test_ties_keep_search_order(self):
+        """Results with equal scores keep the search engine's order"""
+        ranked = pre_rank([supplier_result("b-parts.com"), supplier_result("a-parts.com")], PART_NUMBER)
+        self.assertEqual([result["domain"] for result in ranked], ["b-parts.com", "a-parts.com"])
+
+class TestCloseCall(unittest.TestCase):
+    """Test when the AI ranking is asked to break a tie"""
+
+    def test_margin(self):
+        """Only a top two within SUPPLIER_RANK_CLOSE_MARGIN points is a close call"""
+        with mock.patch.object(Config, "SUPPLIER_RANK_CLOSE_MARGIN", 10):
+            self.assertTrue(is_close_call([{"score": 60}, {"score": 55}]))
+            self.assertFalse(is_close_call([{"score": 60}, {"score": 50}]))
+            self.assertFalse(is_close_call([{"score": 60}]))
+            self.assertFalse(is_close_call([]))
+
+    def test_clear_winner_skips_ai(self):
+        """A clear winner is ranked without calling the LLM"""
+        with mock.patch.object(llm_gateway, "chat_completion") as chat_completion:
+            ranked, method = rank_results([supplier_result("partstown.com"), supplier_result("example-parts.com")], PART_NUMBER, "Pitco", "SG14")
+        chat_completion.assert_not_called()
+        self.assertEqual(method, "deterministic")
+        self.assertEqual(ranked[0]["domain"], "partstown.com")
+
+    def test_failed_ai_ranking_keeps_deterministic_scores(self):
+        """When the AI ranking fails the deterministic list is returned with its own scores"""
+        results = [supplier_result("b-parts.com"), supplier_result("a-parts.com")]
+        expected = pre_rank(results, PART_NUMBER)
+        with mock.patch.object(llm_gateway, "chat_completion", side_effect=RuntimeError("rate limited")):
+            ranked, method = rank_results(results, PART_NUMBER, "Pitco", "SG14")
+        self.assertEqual(method, "deterministic_fallback")
+        self.assertEqual([(result["domain"], result["score"]) for result in ranked],
+                         [(result["domain"], result["score"]) for result in expected])
+        self.assertTrue(all(result["ai_ranking"] is False for result in ranked))
+
+if __name__ == "__main__":
+    unittest.main()